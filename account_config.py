@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AccountConfigCache:
+    """거래소/코인별로 이미 적용한 마진 모드와 레버리지를 기록하는 캐시
+
+    원하는 설정이 이미 적용되어 있으면 set_margin_mode/set_leverage 호출을
+    생략합니다. 적용에 실패한 설정은 retry_interval 초 동안 다시 시도하지 않아
+    주문마다 같은 요청과 오류 로그가 반복되지 않게 합니다. 주문 오류나 재연결
+    후에는 invalidate() 로 다시 적용하게 합니다.
+    """
+
+    MEXC_OPEN_TYPES = {'isolated': 1, 'cross': 2}
+    MEXC_POSITION_TYPES = (1, 2)  # 롱, 숏 (포지션 방향별로 레버리지가 따로 설정됨)
+
+    def __init__(self, exchanges: Dict[str, object], retry_interval: float = 300.0):
+        self.exchanges = exchanges
+        self.retry_interval = retry_interval
+        self._applied: Dict[Tuple[str, str], Tuple[str, int]] = {}
+        self._failed: Dict[Tuple[str, str], Tuple[Tuple[str, int], float]] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def ensure(self, exchange: str, symbol: str, margin_mode: str = 'cross', leverage: int = 1) -> bool:
+        """설정이 다를 때만 마진 모드와 레버리지를 적용합니다. symbol 은 거래소 형식입니다."""
+        key = (exchange, symbol)
+        desired = (margin_mode, leverage)
+        if self._applied.get(key) == desired:
+            return True
+
+        with self._key_lock(key):
+            if self._applied.get(key) == desired:
+                return True
+
+            failed = self._failed.get(key)
+            if failed and failed[0] == desired and time.time() - failed[1] < self.retry_interval:
+                return False
+
+            client = self.exchanges[exchange]
+            try:
+                if exchange == 'mexc':
+                    # MEXC 는 마진 모드(openType)를 레버리지와 함께 포지션 방향별로 설정
+                    for position_type in self.MEXC_POSITION_TYPES:
+                        client.set_leverage(leverage, symbol, {
+                            'openType': self.MEXC_OPEN_TYPES[margin_mode],
+                            'positionType': position_type
+                        })
+                elif exchange == 'gateio':
+                    # Gate.io 는 별도 마진 모드 API 가 없고 레버리지 요청으로 cross/isolated 를 정함
+                    client.set_leverage(leverage, symbol, {'marginMode': margin_mode})
+                elif exchange == 'bitget':
+                    # Bitget uses different parameter names
+                    params = {
+                        'marginCoin': 'USDT',
+                        'marginMode': margin_mode
+                    }
+                    client.set_margin_mode(margin_mode, symbol, params)
+                    client.set_leverage(leverage, symbol)
+                else:
+                    client.set_leverage(leverage, symbol)
+
+                self._applied[key] = desired
+                self._failed.pop(key, None)
+                logger.info(f"Set {margin_mode} mode and leverage {leverage}x for {symbol} on {exchange}")
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to set margin mode or leverage on {exchange}: {e} "
+                             f"(next attempt in {self.retry_interval:.0f}s)")
+                self._applied.pop(key, None)
+                self._failed[key] = (desired, time.time())
+                return False
+
+    def invalidate(self, exchange: Optional[str] = None, symbol: Optional[str] = None):
+        """기록된 설정을 지워 다음 주문 전에 다시 적용되도록 합니다."""
+        with self._lock:
+            for key in list(self._applied):
+                if (exchange is None or key[0] == exchange) and (symbol is None or key[1] == symbol):
+                    del self._applied[key]
+
+    def get_applied(self) -> Dict[str, Dict[str, object]]:
+        """현재 기록된 설정을 반환합니다."""
+        return {
+            f"{exchange}:{symbol}": {'margin_mode': mode, 'leverage': leverage}
+            for (exchange, symbol), (mode, leverage) in list(self._applied.items())
+        }
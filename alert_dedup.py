@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ('up', 'down')
+
+
+class AlertDedupStore:
+    """(거래소 쌍, 코인, 방향) 별 가격차 에피소드를 추적해 알림을 한 번만 보내는 저장소
+
+    갭이 임계값을 넘으면 에피소드가 시작되고 알림을 한 번 보냅니다. 이후 갭이
+    임계값 x release_ratio 안쪽(해제 구간)으로 돌아올 때까지는 같은 에피소드로
+    보고 알림을 억제합니다. ttl 동안 갱신이 없는 항목은 제거하고, 항목 수는
+    max_entries 를 넘지 않으므로 오래 실행해도 메모리가 일정합니다.
+    """
+
+    def __init__(self, ttl: float = 1800.0, release_ratio: float = 0.5, max_entries: int = 512):
+        self.ttl = ttl
+        self.release_ratio = release_ratio
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str, str], Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.totals = {'alerts': 0, 'suppressed': 0, 'episodes_closed': 0, 'evicted': 0}
+
+    def observe(self, pair: str, symbol: str, gap: float, direction: Optional[str] = None,
+                threshold: float = 0.0) -> bool:
+        """갭 관측값을 반영하고, 알림을 보내야 하면 True 를 반환합니다.
+
+        direction 은 임계값을 넘었을 때 'up'/'down', 넘지 않았으면 None 입니다.
+        threshold 는 넘은 임계값으로, 해제 구간 계산에 사용합니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+
+            if direction is None:
+                self._release(pair, symbol, gap, now)
+                return False
+
+            # 반대 방향 에피소드는 종료
+            opposite = DIRECTIONS[1] if direction == DIRECTIONS[0] else DIRECTIONS[0]
+            self._close((pair, symbol, opposite))
+
+            key = (pair, symbol, direction)
+            entry = self._entries.get(key)
+            if entry and entry['active']:
+                entry['suppressed'] += 1
+                entry['last_seen'] = now
+                if abs(gap) > abs(entry['peak_gap']):
+                    entry['peak_gap'] = gap
+                self._entries.move_to_end(key)
+                self.totals['suppressed'] += 1
+                return False
+
+            if entry is None:
+                entry = {'alerts': 0, 'suppressed': 0}
+                self._entries[key] = entry
+            entry.update({
+                'active': True,
+                'started_at': now,
+                'last_seen': now,
+                'peak_gap': gap,
+                'release_level': threshold * self.release_ratio
+            })
+            entry['alerts'] += 1
+            self._entries.move_to_end(key)
+            self.totals['alerts'] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.totals['evicted'] += 1
+            return True
+
+    def _release(self, pair: str, symbol: str, gap: float, now: float):
+        """임계값 아래 관측값으로 해제 구간에 들어온 에피소드를 종료합니다."""
+        for direction in DIRECTIONS:
+            key = (pair, symbol, direction)
+            entry = self._entries.get(key)
+            if not entry or not entry['active']:
+                continue
+            released = gap < entry['release_level'] if direction == 'up' else gap > entry['release_level']
+            if released:
+                self._close(key)
+            else:
+                entry['last_seen'] = now  # 아직 같은 에피소드 (히스테리시스 구간)
+                self._entries.move_to_end(key)
+
+    def _close(self, key: Tuple[str, str, str]):
+        entry = self._entries.get(key)
+        if entry and entry['active']:
+            entry['active'] = False
+            self.totals['episodes_closed'] += 1
+            logger.debug(f"Gap episode closed for {key} after {entry['suppressed']} suppressed alerts")
+
+    def _evict(self, now: float):
+        """ttl 동안 갱신되지 않은 항목을 제거합니다 (last_seen 순으로 정렬되어 있음)."""
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry['last_seen'] < self.ttl:
+                break
+            del self._entries[key]
+            self.totals['evicted'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """에피소드별 알림/억제 건수와 전체 합계를 반환합니다."""
+        with self._lock:
+            self._evict(time.time())
+            entries: List[Dict[str, Any]] = [
+                {
+                    'pair': pair,
+                    'symbol': symbol,
+                    'direction': direction,
+                    'active': entry['active'],
+                    'alerts': entry['alerts'],
+                    'suppressed': entry['suppressed'],
+                    'peak_gap': entry['peak_gap'],
+                    'started_at': entry['started_at'],
+                    'last_seen': entry['last_seen']
+                }
+                for (pair, symbol, direction), entry in self._entries.items()
+            ]
+            return {**self.totals, 'entries': entries, 'size': len(entries)}
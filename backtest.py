@@ -0,0 +1,457 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from depth import order_sizing
+from price_monitor import (DEFAULT_TRADING_THRESHOLDS, SAFETY_MARGIN, TRADE_COOLDOWN,
+                           entry_signal, entry_min_edge)
+from tick_store import TickStore, stream_key
+from trading import TradingExecutor
+
+logger = logging.getLogger(__name__)
+
+# 백테스트 파라미터 기본값 (진입 조건/수량 계산은 PriceGapMonitor 와 같은 값)
+DEFAULT_PARAMS = {
+    **DEFAULT_TRADING_THRESHOLDS,
+    'safety_margin': SAFETY_MARGIN,
+    'cooldown': TRADE_COOLDOWN,
+    'exit_gap': 0.0,      # 가격차가 이 값(%) 안쪽으로 돌아오면 청산
+    'max_hold': 3600.0    # 최대 보유 시간 (초), 지나면 강제 청산
+}
+
+# 거래소별 주문 지연 기본값 (ms)
+DEFAULT_LATENCY_MS = {
+    'mexc': 40.0,
+    'gateio': 60.0,
+    'bitget': 30.0
+}
+
+STREAM_COLUMNS = ('ts', 'last', 'bid_px', 'bid_sz', 'ask_px', 'ask_sz')
+JITTER_SAMPLES = 4096
+
+
+class PairDataset:
+    """두 거래소의 기록된 호가/시세 스트림을 하나의 시간축으로 맞춘 백테스트 입력
+
+    ts 는 두 스트림의 모든 갱신 시각이며, idx1/idx2 는 각 시각에 유효한
+    (가장 최근) 스트림 행 번호입니다. 호가 배열은 복사하지 않고 행 번호로만
+    참조하므로 TickStore 의 memmap 이나 save() 한 파일을 그대로 사용합니다.
+    """
+
+    def __init__(self, exchange1: str, exchange2: str, symbol: str,
+                 stream1: Dict[str, np.ndarray], stream2: Dict[str, np.ndarray],
+                 ts: Optional[np.ndarray] = None, idx1: Optional[np.ndarray] = None,
+                 idx2: Optional[np.ndarray] = None, gap: Optional[np.ndarray] = None):
+        self.exchange1 = exchange1
+        self.exchange2 = exchange2
+        self.symbol = symbol
+        self.stream1 = stream1
+        self.stream2 = stream2
+
+        if ts is None:
+            ts, idx1, idx2 = self._align(stream1['ts'], stream2['ts'])
+        self.ts = ts
+        self.idx1 = idx1
+        self.idx2 = idx2
+
+        if gap is None:
+            price1 = stream1['last'][idx1]
+            price2 = stream2['last'][idx2]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                gap = np.where(price2 > 0, (price1 - price2) / price2 * 100, 0.0)
+        self.gap = gap
+
+    @staticmethod
+    def _align(ts1: np.ndarray, ts2: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """두 스트림의 갱신 시각을 합치고 시각별 최근 행 번호를 구합니다 (양쪽 모두 있는 구간만)."""
+        ts = np.union1d(ts1, ts2)
+        idx1 = np.searchsorted(ts1, ts, side='right') - 1
+        idx2 = np.searchsorted(ts2, ts, side='right') - 1
+        valid = (idx1 >= 0) & (idx2 >= 0)
+        return ts[valid], idx1[valid], idx2[valid]
+
+    @classmethod
+    def from_store(cls, store: TickStore, exchange1: str, exchange2: str, symbol: str,
+                   start: float, end: float) -> 'PairDataset':
+        """TickStore 의 'book' 스트림에서 [start, end) 구간을 읽어옵니다."""
+        stream1 = store.read('book', stream_key(exchange1, symbol), start, end)
+        stream2 = store.read('book', stream_key(exchange2, symbol), start, end)
+        return cls(exchange1, exchange2, symbol, stream1, stream2)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def book(self, leg: int, row: int) -> Dict[str, np.ndarray]:
+        """leg(1/2) 스트림의 row 번째 호가창을 {'bids': (n, 2), 'asks': (n, 2)} 로 반환합니다."""
+        stream = self.stream1 if leg == 1 else self.stream2
+        return book_levels(stream, row)
+
+    def save(self, path: str):
+        """컬럼별 .npy 파일로 저장합니다. load(mmap=True) 로 여러 프로세스가 공유할 수 있습니다."""
+        os.makedirs(path, exist_ok=True)
+        arrays = {'ts': self.ts, 'idx1': self.idx1, 'idx2': self.idx2, 'gap': self.gap}
+        for leg, stream in ((1, self.stream1), (2, self.stream2)):
+            for name in STREAM_COLUMNS:
+                arrays[f"s{leg}_{name}"] = stream[name]
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'exchange1': self.exchange1, 'exchange2': self.exchange2, 'symbol': self.symbol,
+                       'rows': len(self)}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'PairDataset':
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        mode = 'r' if mmap else None
+
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+
+        streams = [{name: array(f"s{leg}_{name}") for name in STREAM_COLUMNS} for leg in (1, 2)]
+        return cls(meta['exchange1'], meta['exchange2'], meta['symbol'], streams[0], streams[1],
+                   array('ts'), array('idx1'), array('idx2'), array('gap'))
+
+
+def book_levels(stream: Dict[str, np.ndarray], row: int) -> Dict[str, np.ndarray]:
+    """기록된 호가 행을 (가격, 수량) 배열로 바꿉니다. 0 으로 채운 빈 단계는 제외합니다."""
+    book = {}
+    for side, prefix in (('bids', 'bid'), ('asks', 'ask')):
+        sizes = stream[f'{prefix}_sz'][row]
+        levels = np.column_stack((stream[f'{prefix}_px'][row], sizes))
+        book[side] = levels[sizes > 0]
+    return book
+
+
+class SimulatedExchange:
+    """기록된 호가창에 대해 시장가(IOC) 주문을 체결하는 모의 거래소
+
+    주문은 latency_ms(+ jitter_ms 범위의 임의 지연) 뒤의 호가창에 체결되며,
+    기록된 단계의 수량(x depth_share)을 넘는 부분은 체결되지 않습니다 (부분 체결).
+    force=True 이면 남은 수량을 마지막 단계 가격으로 강제 청산한 것으로 봅니다.
+    주문/체결 수량은 기록된 호가와 같은 계약 수이며, 가격과 수수료는 코인 수
+    (계약 수 x contract_size) 기준입니다.
+    """
+
+    def __init__(self, name: str, stream: Dict[str, np.ndarray], fee: float = 0.0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, depth_share: float = 1.0, seed: int = 0,
+                 contract_size: float = 1.0):
+        self.name = name
+        self.stream = stream
+        self.contract_size = contract_size
+        self.ts = stream['ts']
+        self.fee = fee
+        self.latency_ms = latency_ms
+        self.depth_share = depth_share
+        # 같은 시각의 주문은 항상 같은 지연을 받도록 미리 뽑아 둔 값을 순환 사용
+        self._jitter = np.random.default_rng(seed).uniform(0, jitter_ms, JITTER_SAMPLES) if jitter_ms else None
+
+    def delay(self, key: int) -> float:
+        """주문 지연 (초)"""
+        jitter = self._jitter[key % JITTER_SAMPLES] if self._jitter is not None else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+    def market_order(self, sent_at: float, side: str, size: float, key: int = 0,
+                     latency: bool = True, force: bool = False) -> Dict[str, Any]:
+        """sent_at 에 보낸 시장가 주문의 체결 결과를 반환합니다."""
+        filled_at = sent_at + (self.delay(key) if latency else 0.0)
+        row = max(int(np.searchsorted(self.ts, filled_at, side='right')) - 1, 0)
+        prefix = 'ask' if side == 'buy' else 'bid'
+        prices = self.stream[f'{prefix}_px'][row]
+        available = self.stream[f'{prefix}_sz'][row] * self.depth_share
+
+        taken = np.diff(np.minimum(np.cumsum(available), size), prepend=0.0)
+        filled = float(taken.sum())
+        cost = float(np.dot(prices, taken))
+        if force and filled < size:
+            levels = prices[available > 0]
+            worst = float(levels[-1]) if len(levels) else float(self.stream['last'][row])
+            cost += (size - filled) * worst
+            filled = size
+
+        return {
+            'exchange': self.name,
+            'side': side,
+            'requested': size,
+            'filled': filled,
+            'price': cost / filled if filled else 0.0,
+            'fee': cost * self.contract_size * self.fee,
+            'filled_at': filled_at
+        }
+
+
+class Backtester:
+    """기록된 가격차로 PriceGapMonitor 의 진입 조건과 수량 계산을 재현하는 백테스트 엔진
+
+    진입 신호는 entry_signal 을 전체 가격차 배열에 한 번에 적용해 구하고,
+    재진입 대기시간(cooldown)은 신호 시각에 대한 이진 탐색으로 건너뜁니다.
+    신호마다 실거래와 같은 order_sizing(=TradingExecutor.calculate_depth_sizing)으로
+    safety_margin 과 lot_size(코인) 를 반영한 거래소별 계약 수를 정해 두 거래소에
+    동시에 시장가 주문을 보낸 뒤,
+    가격차가 exit_gap 안쪽으로 돌아오거나 max_hold 가 지나면 반대 주문으로
+    청산합니다. 같은 데이터로 여러 파라미터를 돌릴 때는 신호/청산 위치와
+    진입 체결 결과를 캐시해서 재사용합니다.
+    """
+
+    def __init__(self, dataset: PairDataset, fees: Optional[Dict[str, float]] = None,
+                 latency_ms: Optional[Dict[str, float]] = None, jitter_ms: float = 0.0,
+                 depth_share: float = 1.0, seed: int = 0, contract_sizes: Optional[Dict[str, float]] = None,
+                 lot_size: float = 0.0):
+        self.dataset = dataset
+        fees = fees if fees is not None else TradingExecutor.TAKER_FEES
+        latency_ms = latency_ms if latency_ms is not None else DEFAULT_LATENCY_MS
+        contract_sizes = contract_sizes or {}
+        self.lot_size = lot_size
+        self.exchanges = {
+            leg: SimulatedExchange(name, stream, fees.get(name, 0.0), latency_ms.get(name, 0.0),
+                                   jitter_ms, depth_share, seed + leg, contract_sizes.get(name, 1.0))
+            for leg, name, stream in ((1, dataset.exchange1, dataset.stream1),
+                                      (2, dataset.exchange2, dataset.stream2))
+        }
+        self._signals: Dict[Tuple[float, float], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._exits: Dict[Tuple[int, float], np.ndarray] = {}
+        self._entries: Dict[Tuple[int, float, float], Optional[Dict[str, Any]]] = {}
+
+    # ---- 신호/청산 위치 (파라미터 값별 캐시) ----
+
+    def _signal_rows(self, entry_long: float, entry_short: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        key = (entry_long, entry_short)
+        if key not in self._signals:
+            signal = entry_signal(self.dataset.gap, {'entry_long': entry_long, 'entry_short': entry_short})
+            rows = np.flatnonzero(signal)
+            self._signals[key] = (rows, self.dataset.ts[rows], signal[rows])
+        return self._signals[key]
+
+    def _exit_row(self, row: int, direction: int, exit_gap: float, max_hold: float) -> int:
+        """row 이후 처음으로 가격차가 exit_gap 안쪽으로 돌아온 행 (없으면 max_hold 또는 마지막 행)"""
+        key = (direction, exit_gap)
+        exits = self._exits.get(key)
+        if exits is None:
+            gap = self.dataset.gap
+            exits = np.flatnonzero(gap <= exit_gap if direction > 0 else gap >= -exit_gap)
+            self._exits[key] = exits
+
+        ts = self.dataset.ts
+        deadline = min(int(np.searchsorted(ts, ts[row] + max_hold, side='left')), len(ts) - 1)
+        position = int(np.searchsorted(exits, row + 1))
+        if position < len(exits):
+            return min(int(exits[position]), deadline)
+        return deadline
+
+    # ---- 주문 시뮬레이션 ----
+
+    def _enter(self, row: int, min_edge: float, safety_margin: float) -> Optional[Dict[str, Any]]:
+        """신호 시점의 호가로 수량을 정하고 두 거래소에 진입 주문을 냅니다."""
+        key = (row, min_edge, safety_margin)
+        if key in self._entries:
+            return self._entries[key]
+
+        data = self.dataset
+        gap = float(data.gap[row])
+        exchange1, exchange2 = self.exchanges[1], self.exchanges[2]
+        sizing = order_sizing(data.book(1, int(data.idx1[row])), data.book(2, int(data.idx2[row])), gap,
+                              min_edge, exchange1.fee, exchange2.fee, exchange1.contract_size,
+                              exchange2.contract_size, safety_margin, self.lot_size)
+        entry = None
+        if sizing['order_size'] > 0:
+            amounts = {1: sizing['amount1'], 2: sizing['amount2']}
+            sent_at = float(data.ts[row])
+            buy_leg = sizing['buy_leg']
+            sides = {buy_leg: 'buy', 3 - buy_leg: 'sell'}
+            entry = {
+                'row': row,
+                'gap': gap,
+                'size': sizing['order_size'],
+                'expected_edge_pct': sizing['edge_pct'],
+                'sides': sides,
+                'fills': {leg: self.exchanges[leg].market_order(sent_at, side, amounts[leg], row)
+                          for leg, side in sides.items()},
+                # 지연 없이 신호 시점 호가에 바로 체결됐을 때 (시간차 영향 비교용)
+                'ideal': {leg: self.exchanges[leg].market_order(sent_at, side, amounts[leg], row, latency=False)
+                          for leg, side in sides.items()}
+            }
+        if len(self._entries) > 200000:
+            self._entries.clear()
+        self._entries[key] = entry
+        return entry
+
+    def _close(self, entry: Dict[str, Any], row: int, fills_key: str) -> Tuple[float, float, Dict[int, Any]]:
+        """진입 체결 수량을 반대 방향으로 청산하고 (순손익, 수수료, 청산 체결) 을 반환합니다."""
+        sent_at = float(self.dataset.ts[row])
+        latency = fills_key == 'fills'
+        pnl = 0.0
+        fees = 0.0
+        exits = {}
+        for leg, fill in entry[fills_key].items():
+            if not fill['filled']:
+                continue
+            side = 'sell' if fill['side'] == 'buy' else 'buy'
+            close = self.exchanges[leg].market_order(sent_at, side, fill['filled'], row, latency, force=True)
+            direction = 1 if fill['side'] == 'buy' else -1
+            pnl += direction * fill['filled'] * self.exchanges[leg].contract_size * (close['price'] - fill['price'])
+            fees += fill['fee'] + close['fee']
+            exits[leg] = close
+        return pnl - fees, fees, exits
+
+    # ---- 실행 ----
+
+    def run(self, params: Optional[Dict[str, Any]] = None, record_trades: bool = True) -> Dict[str, Any]:
+        """한 파라미터 조합으로 전체 구간을 재생하고 요약(과 거래 목록)을 반환합니다."""
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        thresholds = {'entry_long': params['entry_long'], 'entry_short': params['entry_short']}
+        rows, signal_ts, directions = self._signal_rows(params['entry_long'], params['entry_short'])
+
+        trades: List[Dict[str, Any]] = []
+        signals = 0
+        position = 0
+        next_allowed = -np.inf
+        while True:
+            # 재진입 대기시간 안의 신호는 건너뜀 (PriceGapMonitor._submit_trade 와 같은 규칙)
+            position = int(np.searchsorted(signal_ts, next_allowed, side='left'))
+            if position >= len(rows):
+                break
+            row = int(rows[position])
+            signals += 1
+            next_allowed = signal_ts[position] + params['cooldown']
+
+            gap = float(self.dataset.gap[row])
+            entry = self._enter(row, entry_min_edge(gap, thresholds), params['safety_margin'])
+            if entry is None:
+                continue
+
+            exit_row = self._exit_row(row, int(directions[position]), params['exit_gap'], params['max_hold'])
+            pnl, fees, exits = self._close(entry, exit_row, 'fills')
+            ideal_pnl, _, _ = self._close(entry, exit_row, 'ideal')
+            fills = entry['fills']
+            coins = {leg: fill['filled'] * self.exchanges[leg].contract_size for leg, fill in fills.items()}
+            trades.append({
+                'entry_ts': float(self.dataset.ts[row]),
+                'exit_ts': float(self.dataset.ts[exit_row]),
+                'entry_gap': gap,
+                'exit_gap': float(self.dataset.gap[exit_row]),
+                'size': entry['size'],
+                'notional': sum(coins[leg] * fill['price'] for leg, fill in fills.items()) / 2,
+                'expected_edge_pct': entry['expected_edge_pct'],
+                'filled': {leg: fill['filled'] for leg, fill in fills.items()},
+                'partial': any(fill['filled'] < fill['requested'] for fill in fills.values()),
+                'unhedged': abs(coins[1] - coins[2]),
+                'skew_ms': float(abs(fills[1]['filled_at'] - fills[2]['filled_at']) * 1000),
+                'fees': fees,
+                'pnl': pnl,
+                'skew_cost': ideal_pnl - pnl
+            })
+
+        summary = summarize(trades, signals)
+        summary['params'] = params
+        if record_trades:
+            summary['trade_log'] = trades
+        return summary
+
+    def sweep(self, grid: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """여러 파라미터 조합을 차례로 실행하고 요약 목록을 반환합니다 (거래 목록 제외)."""
+        results = []
+        for params in grid:
+            started = time.perf_counter()
+            summary = self.run(params, record_trades=False)
+            summary['elapsed_ms'] = (time.perf_counter() - started) * 1000
+            results.append(summary)
+        return results
+
+
+def summarize(trades: List[Dict[str, Any]], signals: int = 0) -> Dict[str, Any]:
+    """거래 목록의 손익, 승률, 양쪽 주문 시간차 영향을 요약합니다."""
+    pnl = np.array([trade['pnl'] for trade in trades])
+    equity = np.cumsum(pnl)
+    drawdown = float(np.max(np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity])) if len(pnl) else 0.0
+    count = len(trades)
+
+    def average(name: str) -> float:
+        return float(np.mean([trade[name] for trade in trades])) if count else 0.0
+
+    return {
+        'signals': signals,
+        'trades': count,
+        'skipped': signals - count,  # 수수료 반영 후 기대 수익이 없어 수량이 0 인 신호
+        'pnl': float(pnl.sum()),
+        'fees': float(sum(trade['fees'] for trade in trades)),
+        'hit_rate': float((pnl > 0).mean()) if count else 0.0,
+        'avg_pnl': float(pnl.mean()) if count else 0.0,
+        'max_drawdown': drawdown,
+        'notional': float(sum(trade['notional'] for trade in trades)),
+        'partial_fills': sum(1 for trade in trades if trade['partial']),
+        'unhedged': float(sum(trade['unhedged'] for trade in trades)),
+        'avg_skew_ms': average('skew_ms'),
+        'skew_cost': float(sum(trade['skew_cost'] for trade in trades)),
+        'avg_hold_s': float(np.mean([trade['exit_ts'] - trade['entry_ts'] for trade in trades])) if count else 0.0
+    }
+
+
+def parameter_grid(**axes: List[Any]) -> List[Dict[str, Any]]:
+    """축별 값 목록의 모든 조합을 파라미터 dict 목록으로 만듭니다.
+
+    예: parameter_grid(entry_long=[0.03, 0.05], entry_short=[-0.04, -0.06])
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def parse_time(value: str) -> float:
+    """유닉스 시각 또는 ISO 날짜/시각 (UTC) 문자열을 초 단위로 바꿉니다."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='Replay recorded order books through the price gap strategy')
+    parser.add_argument('--pair', default='mexc-bitget', help='거래소 쌍 (예: mexc-bitget)')
+    parser.add_argument('--symbol', default='XRP/USDT')
+    parser.add_argument('--start', required=True, help='시작 시각 (유닉스 시각 또는 ISO, UTC)')
+    parser.add_argument('--end', required=True, help='종료 시각 (유닉스 시각 또는 ISO, UTC)')
+    parser.add_argument('--store', default=None, help='TickStore 경로 (기본: TICK_STORE_DIR)')
+    parser.add_argument('--entry-long', type=float, default=DEFAULT_PARAMS['entry_long'])
+    parser.add_argument('--entry-short', type=float, default=DEFAULT_PARAMS['entry_short'])
+    parser.add_argument('--exit-gap', type=float, default=DEFAULT_PARAMS['exit_gap'])
+    parser.add_argument('--safety-margin', type=float, default=DEFAULT_PARAMS['safety_margin'])
+    parser.add_argument('--cooldown', type=float, default=DEFAULT_PARAMS['cooldown'])
+    parser.add_argument('--max-hold', type=float, default=DEFAULT_PARAMS['max_hold'])
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--depth-share', type=float, default=1.0, help='체결에 쓸 수 있는 호가 수량 비율')
+    parser.add_argument('--contract-size1', type=float, default=1.0, help='거래소1 계약 1개의 코인 수')
+    parser.add_argument('--contract-size2', type=float, default=1.0, help='거래소2 계약 1개의 코인 수')
+    parser.add_argument('--lot-size', type=float, default=0.0, help='주문 수량 단위 (코인, 0 이면 내림 없음)')
+    parser.add_argument('--trades', action='store_true', help='거래 목록도 출력')
+    args = parser.parse_args()
+
+    exchange1, exchange2 = args.pair.split('-')
+    dataset = PairDataset.from_store(TickStore(args.store), exchange1, exchange2, args.symbol,
+                                     parse_time(args.start), parse_time(args.end))
+    logger.info(f"Loaded {len(dataset)} aligned rows for {args.pair} {args.symbol}")
+
+    backtester = Backtester(dataset, jitter_ms=args.jitter_ms, depth_share=args.depth_share,
+                            contract_sizes={exchange1: args.contract_size1, exchange2: args.contract_size2},
+                            lot_size=args.lot_size)
+    result = backtester.run({
+        'entry_long': args.entry_long,
+        'entry_short': args.entry_short,
+        'exit_gap': args.exit_gap,
+        'safety_margin': args.safety_margin,
+        'cooldown': args.cooldown,
+        'max_hold': args.max_hold
+    }, record_trades=args.trades)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
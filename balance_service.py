@@ -0,0 +1,271 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+KST = pytz.timezone('Asia/Seoul')
+
+# 월간 손익 계산 시 월초 이전부터 다시 계산하는 기간 (이월된 포지션의 평균 단가용)
+PNL_LOOKBACK_DAYS = 31
+
+
+class FillStore:
+    """체결 기록 저장소
+
+    <root>/<YYYY-MM-DD>.jsonl 파일(UTC 날짜)에 체결 하나를 한 줄로 이어 붙입니다.
+    체결 수는 주문 수와 같아서 적으므로 읽을 때는 해당 날짜 파일을 모두 읽습니다.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.environ.get('FILL_STORE_DIR', 'data/fills')
+        self._lock = threading.Lock()
+
+    def record(self, fill: Dict[str, Any]):
+        day = datetime.fromtimestamp(fill['ts'], timezone.utc).strftime('%Y-%m-%d')
+        line = json.dumps(fill, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, f"{day}.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def read(self, start: float, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """[start, end) 구간의 체결을 시각 순으로 반환합니다."""
+        end = end or time.time() + 1
+        fills = []
+        day = datetime.fromtimestamp(start, timezone.utc).date()
+        last_day = datetime.fromtimestamp(end, timezone.utc).date()
+        while day <= last_day:
+            path = os.path.join(self.root, f"{day.isoformat()}.jsonl")
+            day += timedelta(days=1)
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        fill = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 도중 중단된 줄
+                    if start <= fill['ts'] < end:
+                        fills.append(fill)
+        fills.sort(key=lambda fill: fill['ts'])
+        return fills
+
+
+def fill_fee(fill: Dict[str, Any], fees: Optional[Dict[str, float]] = None) -> float:
+    """체결 수수료 (USDT). 주문 응답에 없으면 fees(시장가 수수료율)로 추정합니다."""
+    if fill.get('fee') is not None:
+        return float(fill['fee'])
+    notional = fill['amount'] * fill.get('contract_size', 1.0) * (fill.get('price') or 0.0)
+    return notional * (fees or {}).get(fill['exchange'], 0.0)
+
+
+def realized_pnl(fills: List[Dict[str, Any]], since: Dict[str, float],
+                 fees: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, float]]:
+    """체결 기록으로 거래소별 실현 손익(수수료 차감, USDT)을 기간별로 계산합니다.
+
+    (거래소, 코인) 별 포지션을 평균 단가로 추적하며, 포지션을 줄이는 체결에서
+    손익이 실현됩니다. since 는 {기간 이름: 시작 시각} 이고 시작 시각 이후의
+    체결만 해당 기간에 더합니다.
+    """
+    positions: Dict[Tuple[str, str], List[float]] = {}  # (거래소, 코인) -> [수량(코인, 롱 +), 평균 단가]
+    totals: Dict[str, Dict[str, float]] = {}
+
+    for fill in fills:
+        pnl = -fill_fee(fill, fees)
+        price = fill.get('price')
+        if price:
+            quantity = fill['amount'] * fill.get('contract_size', 1.0) * (1 if fill['side'] == 'buy' else -1)
+            position = positions.setdefault((fill['exchange'], fill['symbol']), [0.0, 0.0])
+            held, average = position
+            if held and (held > 0) != (quantity > 0):
+                closed = min(abs(quantity), abs(held))
+                pnl += closed * (price - average) * (1 if held > 0 else -1)
+                position[0] = held + quantity
+                if abs(quantity) > abs(held):
+                    position[1] = price  # 반대 방향으로 넘어간 수량은 새 포지션
+                elif abs(position[0]) < 1e-12:
+                    position[0] = 0.0
+            elif not fill.get('reduce_only'):
+                position[0] = held + quantity
+                position[1] = (held * average + quantity * price) / position[0]
+
+        exchange_totals = totals.setdefault(fill['exchange'], {name: 0.0 for name in since})
+        for name, start in since.items():
+            if fill['ts'] >= start:
+                exchange_totals[name] += pnl
+    return totals
+
+
+def pnl_periods(now: Optional[float] = None) -> Dict[str, float]:
+    """한국 시간 기준 오늘 0시와 이번 달 1일 0시의 유닉스 시각"""
+    current = datetime.fromtimestamp(now or time.time(), KST)
+    day_start = current.replace(hour=0, minute=0, second=0, microsecond=0)
+    return {'daily': day_start.timestamp(), 'monthly': day_start.replace(day=1).timestamp()}
+
+
+class BalanceService:
+    """거래소 잔액과 실현 손익을 캐시하는 서비스
+
+    세 거래소 잔액을 병렬로 조회해 ttl 초 동안 재사용합니다. ttl 이 지난 뒤의
+    요청에는 이전 값을 바로 돌려주고 백그라운드에서 한 번만 다시 조회합니다
+    (stale-while-revalidate). 주문이 체결되면 체결을 FillStore 에 기록하고 캐시를
+    즉시 만료시켜 다시 조회합니다. 일간/월간 수익률은 기록된 체결로 계산합니다.
+    조회에 실패한 거래소는 마지막으로 성공한 값을 stale=True 로 표시해 유지하고,
+    캐시를 만료 상태로 두어 다음 요청에서 다시 조회합니다.
+    """
+
+    def __init__(self, trading_executor, fills: Optional[FillStore] = None, ttl: float = 15.0):
+        self.trading = trading_executor
+        self.fills = fills or FillStore()
+        self.ttl = ttl
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0  # 0 이면 만료 (무효화)
+        self._snapshot_at = 0.0
+        self._generation = 0  # invalidate() 마다 증가
+        self._pending_fills: deque = deque()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self.stats = {'refreshes': 0, 'hits': 0, 'stale_hits': 0, 'invalidations': 0, 'fills_recorded': 0,
+                      'failed_fetches': 0}
+
+        trading_executor.add_fill_listener(self.on_fill)
+
+    def get(self) -> Tuple[Dict[str, Any], float, bool]:
+        """(잔액, 조회 후 지난 초, 만료 여부) 를 반환합니다. 캐시가 없을 때만 조회를 기다립니다."""
+        with self._lock:
+            snapshot = self._snapshot
+            age = time.time() - self._snapshot_at
+            stale = time.time() - self._fetched_at > self.ttl
+            if snapshot is not None:
+                self.stats['stale_hits' if stale else 'hits'] += 1
+        if snapshot is None:
+            return self.refresh(), 0.0, False
+        if stale:
+            self._refresh_in_background()
+        return snapshot, age, stale
+
+    def invalidate(self):
+        """캐시를 만료시키고 백그라운드에서 다시 조회합니다."""
+        with self._lock:
+            self._fetched_at = 0.0
+            self._generation += 1
+            self.stats['invalidations'] += 1
+        self._refresh_in_background()
+
+    def on_fill(self, fill: Dict[str, Any]):
+        """TradingExecutor 체결 알림 (주문 스레드에서 호출되므로 기록과 조회는 백그라운드에서 처리)"""
+        self._pending_fills.append(fill)
+        self.invalidate()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name='balance-refresh', daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Balance refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+                expired = self._fetched_at == 0.0
+            if expired:
+                self._refresh_in_background()  # 조회 중에 들어온 체결/무효화
+
+    def refresh(self) -> Dict[str, Any]:
+        """대기 중인 체결을 기록하고 잔액과 손익을 다시 계산합니다. 동시에 한 번만 실행됩니다."""
+        requested_at = time.time()
+        with self._refresh_lock:
+            with self._lock:
+                # 기다리는 동안 다른 스레드가 새로 조회했으면 그 결과를 사용
+                if self._snapshot is not None and self._fetched_at >= requested_at:
+                    return self._snapshot
+                generation = self._generation
+
+            self._record_pending_fills()
+            balances = self.trading.fetch_balance()
+            failed = self._keep_last_good(balances)
+            self._apply_pnl(balances)
+
+            with self._lock:
+                self._snapshot = balances
+                self._snapshot_at = time.time()
+                # 조회 중에 무효화됐거나 실패한 거래소가 있으면 만료 상태로 두어 다시 조회
+                self._fetched_at = time.time() if generation == self._generation and not failed else 0.0
+                self.stats['refreshes'] += 1
+                self.stats['failed_fetches'] += len(failed)
+            return balances
+
+    def _keep_last_good(self, balances: Dict[str, Any]) -> List[str]:
+        """조회에 실패한 거래소 잔액을 이전 스냅샷 값으로 바꾸고, 실패한 거래소 이름 목록을 반환합니다."""
+        with self._lock:
+            previous = self._snapshot or {}
+        failed = []
+        for name, balance in balances.items():
+            if 'error' not in balance:
+                continue
+            failed.append(name)
+            last = previous.get(name)
+            if last is not None and 'error' not in last:
+                balances[name] = {**last, 'stale': True, 'error': balance['error']}
+        return failed
+
+    def _record_pending_fills(self):
+        while self._pending_fills:
+            fill = self._pending_fills.popleft()
+            try:
+                if fill['price'] is None and fill.get('order_id'):
+                    # 시장가 주문 응답에 체결가가 없는 거래소 (Bitget 등)
+                    order = self.trading.fetch_order(fill['exchange'], fill['symbol'], fill['order_id'])
+                    price = order.get('average') or order.get('price')
+                    fee = (order.get('fee') or {}).get('cost')
+                    fill['price'] = float(price) if price else None
+                    if fee is not None:
+                        fill['fee'] = float(fee)
+                    if order.get('filled'):
+                        fill['amount'] = float(order['filled'])
+            except Exception as e:
+                logger.error(f"Failed to resolve fill price for {fill['exchange']} {fill['order_id']}: {e}")
+            try:
+                self.fills.record(fill)
+                self.stats['fills_recorded'] += 1
+            except Exception as e:
+                logger.error(f"Failed to record fill for {fill['exchange']} {fill['symbol']}: {e}")
+
+    def _apply_pnl(self, balances: Dict[str, Any]):
+        """잔액에 일간/월간 실현 손익(USDT)과 수익률(%, 기간 시작 잔액 대비)을 추가합니다."""
+        periods = pnl_periods()
+        try:
+            fills = self.fills.read(periods['monthly'] - PNL_LOOKBACK_DAYS * 86400)
+            totals = realized_pnl(fills, periods, self.trading.TAKER_FEES)
+        except Exception as e:
+            logger.error(f"Failed to compute PnL from fills: {e}")
+            totals = {}
+
+        for exchange, name in self.trading.EXCHANGE_NAMES.items():
+            balance = balances.get(name)
+            if balance is None:
+                continue
+            for period in ('daily', 'monthly'):
+                pnl = totals.get(exchange, {}).get(period, 0.0)
+                start_equity = balance['USDT'] - pnl
+                balance[f'{period}PnL'] = pnl / start_equity * 100 if start_equity > 0 else 0.0
+                balance[f'{period}PnLUSDT'] = pnl
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            age = time.time() - self._snapshot_at if self._snapshot is not None else None
+        return {**self.stats, 'age': age, 'ttl': self.ttl, 'pending_fills': len(self._pending_fills)}
@@ -0,0 +1,139 @@
+import logging
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _levels(levels: Any) -> np.ndarray:
+    """[[price, amount, ...], ...] 형태의 호가를 (n, 2) float 배열로 변환합니다."""
+    array = np.asarray(levels, dtype=np.float64)
+    if array.ndim != 2 or array.shape[0] == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    return array[:, :2]
+
+
+def walk_depth(buy_asks: Sequence, sell_bids: Sequence, min_edge_pct: float = 0.0,
+               buy_fee: float = 0.0, sell_fee: float = 0.0) -> Dict[str, float]:
+    """두 거래소 호가창을 여러 단계까지 따라가며 최대 거래 수량을 계산합니다.
+
+    buy_asks 에서 매수하고 sell_bids 에서 매도할 때, 수수료를 뺀 양쪽 체결
+    평균가(VWAP)의 차이가 min_edge_pct(%) 이상으로 유지되는 최대 수량을
+    찾습니다. 누적 체결 금액은 수량에 대해 구간별 선형이므로, 양쪽 누적 수량의
+    경계점에서 조건을 한 번에 계산한 뒤 마지막 구간 안의 정확한 수량을 식으로
+    구합니다.
+
+    반환값: size(수량), notional(매수 금액, USDT), buy_vwap, sell_vwap,
+    edge_pct(수수료 반영 후 기대 수익률 %)
+    """
+    result = {'size': 0.0, 'notional': 0.0, 'buy_vwap': 0.0, 'sell_vwap': 0.0, 'edge_pct': 0.0}
+
+    asks = _levels(buy_asks)
+    bids = _levels(sell_bids)
+    if not len(asks) or not len(bids):
+        return result
+
+    target = min_edge_pct / 100
+    buy_factor = 1 + buy_fee + target
+    sell_factor = 1 - sell_fee
+
+    # 첫 단위 수량부터 조건을 만족하지 못하면 거래 불가
+    if bids[0, 0] * sell_factor < asks[0, 0] * buy_factor:
+        return result
+
+    ask_qty = np.concatenate(([0.0], np.cumsum(asks[:, 1])))
+    ask_cost = np.concatenate(([0.0], np.cumsum(asks[:, 0] * asks[:, 1])))
+    bid_qty = np.concatenate(([0.0], np.cumsum(bids[:, 1])))
+    bid_cost = np.concatenate(([0.0], np.cumsum(bids[:, 0] * bids[:, 1])))
+
+    # 양쪽 호가 단계의 경계 수량 (두 호가창 중 얕은 쪽까지만)
+    max_qty = min(ask_qty[-1], bid_qty[-1])
+    breakpoints = np.union1d(ask_qty, bid_qty)
+    breakpoints = breakpoints[breakpoints <= max_qty]
+
+    buy_costs = np.interp(breakpoints, ask_qty, ask_cost)
+    sell_costs = np.interp(breakpoints, bid_qty, bid_cost)
+    surplus = sell_costs * sell_factor - buy_costs * buy_factor
+
+    # surplus 는 수량이 늘수록 감소하므로 마지막으로 0 이상인 경계점을 찾음
+    valid = np.nonzero(surplus >= 0)[0]
+    k = int(valid[-1])
+    size = float(breakpoints[k])
+    buy_cost = float(buy_costs[k])
+    sell_cost = float(sell_costs[k])
+
+    if k + 1 < len(breakpoints):
+        # 다음 구간 안에서 surplus 가 0 이 되는 지점 (구간 내 한계가격은 일정)
+        step = breakpoints[k + 1] - breakpoints[k]
+        buy_price = (buy_costs[k + 1] - buy_costs[k]) / step
+        sell_price = (sell_costs[k + 1] - sell_costs[k]) / step
+        slope = sell_price * sell_factor - buy_price * buy_factor
+        extra = step if slope >= 0 else min(step, -surplus[k] / slope)
+        size += float(extra)
+        buy_cost += float(buy_price * extra)
+        sell_cost += float(sell_price * extra)
+
+    if size <= 0:
+        return result
+
+    buy_vwap = buy_cost / size
+    sell_vwap = sell_cost / size
+    result.update({
+        'size': size,
+        'notional': buy_cost,
+        'buy_vwap': buy_vwap,
+        'sell_vwap': sell_vwap,
+        'edge_pct': (sell_vwap * sell_factor - buy_vwap * (1 + buy_fee)) / buy_vwap * 100
+    })
+    return result
+
+
+def pair_sizing(orderbook1: Any, orderbook2: Any, gap: float = 0.0, min_edge_pct: float = 0.0,
+                fee1: float = 0.0, fee2: float = 0.0) -> Dict[str, Any]:
+    """거래소1/거래소2 호가창과 가격차 방향으로 차익거래 수량을 계산합니다.
+
+    gap 이 0 이상이면 거래소1 이 비싸므로 거래소2 에서 매수/거래소1 에서 매도,
+    음수면 반대입니다. orderbook 은 ['bids'], ['asks'] 로 호가를 꺼낼 수 있으면
+    되므로 OrderBook 과 기록된 호가 배열(dict) 모두 사용할 수 있습니다.
+    반환값은 walk_depth 결과에 매수 쪽 거래소 번호(buy_leg: 1 또는 2)를 더한 것입니다.
+    """
+    if gap >= 0:
+        sizing = walk_depth(orderbook2['asks'], orderbook1['bids'], min_edge_pct, fee2, fee1)
+        sizing['buy_leg'] = 2
+    else:
+        sizing = walk_depth(orderbook1['asks'], orderbook2['bids'], min_edge_pct, fee1, fee2)
+        sizing['buy_leg'] = 1
+    return sizing
+
+
+def _in_coins(orderbook: Any, contract_size: float) -> Dict[str, np.ndarray]:
+    """호가 수량(계약 수)을 코인 수로 바꾼 호가창을 반환합니다."""
+    scale = np.array([1.0, contract_size])
+    return {'bids': _levels(orderbook['bids']) * scale, 'asks': _levels(orderbook['asks']) * scale}
+
+
+def order_sizing(orderbook1: Any, orderbook2: Any, gap: float = 0.0, min_edge_pct: float = 0.0,
+                 fee1: float = 0.0, fee2: float = 0.0, contract_size1: float = 1.0, contract_size2: float = 1.0,
+                 safety_margin: float = 1.0, lot_size: float = 0.0) -> Dict[str, Any]:
+    """차익거래 주문 수량을 거래소별 계약 수로 계산합니다 (실거래와 백테스트 공용).
+
+    호가 수량은 거래소마다 계약 단위가 다르므로 contract_size 로 코인 수로 바꿔
+    pair_sizing 으로 계산한 뒤, safety_margin 비율만 사용하고 lot_size(코인)
+    단위로 내림합니다. 반환값은 pair_sizing 결과에 order_size(코인),
+    order_notional(USDT), amount1/amount2(거래소별 주문 계약 수)를 더한 것입니다.
+    """
+    sizing = pair_sizing(_in_coins(orderbook1, contract_size1), _in_coins(orderbook2, contract_size2),
+                         gap, min_edge_pct, fee1, fee2)
+    size = sizing['size'] * safety_margin
+    if lot_size > 0:
+        # 부동소수 오차로 한 단위가 깎이지 않도록 작은 여유를 둠
+        size = np.floor(size / lot_size + 1e-9) * lot_size
+    size = float(size)
+    sizing.update({
+        'order_size': size,
+        'order_notional': size * sizing['buy_vwap'],
+        'amount1': size / contract_size1,
+        'amount2': size / contract_size2
+    })
+    return sizing
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class FakeTelegramServer:
+    """텔레그램 Bot API 의 getMe/sendMessage 만 흉내 내는 로컬 테스트 서버
+
+    TELEGRAM_API_BASE_URL 을 base_url() 값으로 설정하면 TelegramNotifier 가
+    실제 텔레그램 대신 이 서버로 발송합니다. 받은 메시지는 messages 에 기록되고,
+    latency 로 응답 지연을, rate_limit_next 로 429(Retry-After) 응답을 흉내 냅니다.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.messages: List[Dict[str, Any]] = []
+        self.rate_limit_next = 0
+        self.retry_after = 1
+        self._message_id = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._url = ''
+
+        self.app = web.Application()
+        self.app.router.add_route('*', '/bot{token}/{method}', self._handle)
+
+    def base_url(self) -> str:
+        """python-telegram-bot Bot(base_url=...) 에 넘길 주소"""
+        return f"{self._url}/bot"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        if request.content_type == 'application/json':
+            payload = await request.json()
+        else:
+            payload = dict(await request.post())
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == 'getMe':
+            return self._ok({'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'})
+
+        if method == 'sendMessage':
+            if self.rate_limit_next > 0:
+                self.rate_limit_next -= 1
+                return web.json_response({
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f"Too Many Requests: retry after {self.retry_after}",
+                    'parameters': {'retry_after': self.retry_after}
+                }, status=429)
+
+            self._message_id += 1
+            self.messages.append({'received_at': time.time(), **payload})
+            return self._ok({
+                'message_id': self._message_id,
+                'date': int(time.time()),
+                'chat': {'id': int(payload.get('chat_id', 0)), 'type': 'private'},
+                'text': payload.get('text', '')
+            })
+
+        return web.json_response({'ok': False, 'error_code': 404, 'description': 'Not Found'}, status=404)
+
+    @staticmethod
+    def _ok(result: Dict[str, Any]) -> web.Response:
+        return web.json_response({'ok': True, 'result': result})
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8081) -> str:
+        """서버를 시작하고 주소를 반환합니다. port=0 이면 빈 포트를 사용합니다."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self._url = f"http://{host}:{port}"
+        logger.info(f"Fake Telegram server listening on {self._url}")
+        return self._url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    def start_in_thread(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """별도 스레드에서 서버를 실행하고 base_url() 을 반환합니다."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start(host, port))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='fake-telegram', daemon=True)
+        self._thread.start()
+        ready.wait(timeout=10)
+        return self.base_url()
+
+    def stop_thread(self):
+        """start_in_thread 로 시작한 서버를 중지합니다."""
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='Local fake Telegram Bot API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help='응답 지연 (초)')
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(args.latency)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start(args.host, args.port))
+    print(f"TELEGRAM_API_BASE_URL={server.base_url()}")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        loop.run_until_complete(server.stop())
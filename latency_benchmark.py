@@ -0,0 +1,581 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+import numpy as np
+
+from orderbook import OrderBook
+
+logger = logging.getLogger(__name__)
+
+# 결과에 남기는 지연시간 백분위
+PERCENTILES = (50, 90, 99)
+
+# 기준 결과와 비교하는 구간별 항목 (클수록 나쁨)
+COMPARED_METRICS = ('p50', 'p99')
+
+# p99 를 비교하는 최소 표본 수 (적으면 p99 가 최댓값과 같아 흔들림)
+MIN_P99_SAMPLES = 100
+
+# 한 틱(과 그 틱이 일으킨 주문)이 끝나기를 기다리는 최대 시간 (초)
+TICK_TIMEOUT = 10.0
+
+# 할당 추적 결과에 남기는 할당 위치 수
+TOP_ALLOCATION_SITES = 10
+
+
+class Tick:
+    """한 거래소 호가 갱신 (합성 또는 기록된 값)"""
+
+    __slots__ = ('exchange', 'symbol', 'orderbook', 'ticker', 'signal')
+
+    def __init__(self, exchange: str, symbol: str, orderbook: OrderBook, ticker: Dict[str, Any],
+                 signal: bool = False):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.orderbook = orderbook
+        self.ticker = ticker
+        self.signal = signal  # 진입 임계값을 넘도록 만든 틱 (합성 틱만)
+
+
+def _book(symbol: str, mid: float, tick_size: float, depth: int, level_notional: float,
+          rng: random.Random) -> OrderBook:
+    bids = [[mid - tick_size * (level + 0.5), 0.0] for level in range(depth)]
+    asks = [[mid + tick_size * (level + 0.5), 0.0] for level in range(depth)]
+    for level in bids + asks:
+        level[1] = level_notional * rng.uniform(0.5, 1.5) / level[0]
+    book = OrderBook(symbol, capacity=depth)
+    book.apply_snapshot(bids, asks, timestamp=int(time.time() * 1000))
+    return book
+
+
+def synthetic_ticks(count: int, exchange1: str, exchange2: str, symbol: str,
+                    thresholds: Dict[str, float], signal_ratio: float = 0.1, price: float = 0.5,
+                    depth: int = 20, level_notional: float = 20.0, seed: Optional[int] = None) -> Iterator[Tick]:
+    """합성 호가 갱신을 만듭니다.
+
+    대부분 exchange1 호가가 바뀌고, signal_ratio 비율의 틱은 수수료와 스프레드를
+    빼고도 진입 임계값을 넘는 가격차를 만들어 주문까지 이어지게 합니다 (롱/숏
+    번갈아 진입해 포지션이 쌓이지 않음). 기준 거래소(exchange2) 호가는 직전
+    틱이 진입 신호가 아닐 때만 바꾸어 같은 가격차로 다시 진입하지 않게 합니다.
+    """
+    rng = random.Random(seed)
+    tick_size = price * 1e-4
+    mid2 = price
+    direction = 1
+    last_signal = False
+    yield Tick(exchange2, symbol, _book(symbol, mid2, tick_size, depth, level_notional, rng), {'last': mid2})
+
+    for index in range(count - 1):
+        if index % 4 == 3 and not last_signal:
+            mid2 *= 1 + rng.gauss(0, 1e-5)
+            yield Tick(exchange2, symbol, _book(symbol, mid2, tick_size, depth, level_notional, rng),
+                       {'last': mid2})
+            continue
+
+        last_signal = rng.random() < signal_ratio
+        if last_signal:
+            # 임계값 + 양쪽 수수료/스프레드 여유 (calculate_tradable_amount 가 0 보다 크도록)
+            threshold = thresholds['entry_long'] if direction > 0 else abs(thresholds['entry_short'])
+            gap = direction * (threshold + 0.15 + rng.uniform(0, 0.1))
+            direction = -direction
+        else:
+            gap = rng.uniform(thresholds['entry_short'], thresholds['entry_long']) * 0.8
+        mid1 = mid2 * (1 + gap / 100)
+        yield Tick(exchange1, symbol, _book(symbol, mid1, tick_size, depth, level_notional, rng),
+                   {'last': mid1}, last_signal)
+
+
+def recorded_ticks(dataset, limit: Optional[int] = None) -> Iterator[Tick]:
+    """PairDataset 의 행을 시각 순으로 바뀐 거래소의 호가 갱신으로 바꿉니다."""
+    from backtest import book_levels
+
+    previous = {1: -1, 2: -1}
+    rows = len(dataset) if limit is None else min(len(dataset), limit)
+    for row in range(rows):
+        for leg, exchange, stream, indices in ((2, dataset.exchange2, dataset.stream2, dataset.idx2),
+                                               (1, dataset.exchange1, dataset.stream1, dataset.idx1)):
+            index = int(indices[row])
+            if index == previous[leg]:
+                continue
+            previous[leg] = index
+            levels = book_levels(stream, index)
+            book = OrderBook(dataset.symbol, capacity=max(len(levels['bids']), len(levels['asks']), 1))
+            book.apply_snapshot(levels['bids'], levels['asks'], timestamp=int(stream['ts'][index] * 1000))
+            yield Tick(exchange, dataset.symbol, book, {'last': float(stream['last'][index])})
+
+
+def summarize_samples(samples: List[float]) -> Dict[str, float]:
+    """지연시간(ms) 목록의 개수, 평균, 백분위, 최댓값"""
+    values = np.asarray(samples, dtype=np.float64)
+    summary = {'count': int(len(values)), 'mean': float(values.mean())}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{percentile}'] = float(value)
+    summary['max'] = float(values.max())
+    return summary
+
+
+class StageRecorder:
+    """감지/주문 경로의 메서드를 감싸 구간별 지연시간과 할당량을 기록합니다.
+
+    ExchangeMetrics.install 처럼 인스턴스 속성으로 메서드를 바꾸므로 코드를
+    수정하지 않고 실제 경로(감지 스레드, 주문 풀)를 그대로 측정합니다. 틱
+    주입 시각은 process_exchange_data 입력 딕셔너리에 실어 주문 스레드까지
+    전달합니다.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.allocations: Dict[str, List[int]] = {}
+        self.injected_ns: Dict[str, int] = {}
+        # signals: 진입 신호, trades: 주문 수량 계산까지 간 거래, orders_*: 양쪽 주문 결과
+        self.counts = {'signals': 0, 'trades': 0, 'orders_filled': 0, 'orders_failed': 0}
+        self.processed = threading.Event()
+        self.trade_done = threading.Event()
+        self.trade_submitted = False
+        self.orders_sent = False
+        self._monitor = None
+        self._triggered = 0
+        self._local = threading.local()
+
+    def record(self, stage: str, started_ns: int, ended_ns: Optional[int] = None):
+        ended_ns = ended_ns or time.perf_counter_ns()
+        self.samples.setdefault(stage, []).append((ended_ns - started_ns) / 1e6)
+
+    def reset(self):
+        self.samples = {}
+        self.allocations = {}
+        self.counts = dict.fromkeys(self.counts, 0)
+
+    def wrap(self, obj, name: str, stage: Optional[str] = None, before=None, after=None,
+             per_exchange: bool = False):
+        """obj.name 을 실행 시간(과 추적 중이면 순 할당 바이트)을 기록하는 함수로 바꿉니다.
+
+        per_exchange 면 첫 번째 인자(거래소)를 붙인 '<stage>.<거래소>' 구간으로 기록합니다.
+        """
+        method = getattr(obj, name)
+        stage = stage or name
+
+        def timed(*args, **kwargs):
+            if before:
+                before(*args)
+            tracing = tracemalloc.is_tracing()
+            allocated = tracemalloc.get_traced_memory()[0] if tracing else 0
+            started = time.perf_counter_ns()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                ended = time.perf_counter_ns()
+                name = f"{stage}.{args[0]}" if per_exchange else stage
+                if tracing:
+                    self.allocations.setdefault(name, []).append(tracemalloc.get_traced_memory()[0] - allocated)
+                self.record(name, started, ended)
+            if after:
+                after(result, *args)
+            return result
+
+        setattr(obj, name, timed)
+
+    def install(self, monitor, trading):
+        """PriceGapMonitor 와 TradingExecutor 의 틱 -> 주문 경로를 계측합니다."""
+        self._monitor = monitor
+        self.wrap(monitor, '_build_pair_data', 'build_pair_data', before=self._on_build, after=self._on_built)
+        self.wrap(monitor, 'process_exchange_data', after=self._on_processed)
+        self.wrap(monitor, 'check_price_gap')
+        self.wrap(monitor, '_submit_trade', 'submit_trade', before=self._on_signal, after=self._on_submitted)
+        self.wrap(monitor, 'execute_arbitrage_trades', 'arbitrage_trade',
+                  before=self._on_trade_start, after=self._on_trade_done)
+        self.wrap(trading, 'calculate_tradable_amount')
+        self.wrap(trading, 'execute_simultaneous_orders', after=self._on_orders)
+        # 다리별 주문 시간 = 계좌 설정 확인 + 요청 한도 대기 + 왕복(round_trip)
+        self.wrap(trading, 'execute_order', after=self._on_order, per_exchange=True)
+        self.wrap(trading.account_config, 'ensure', 'account_config', per_exchange=True)
+        self.wrap(trading.rate_limiter, 'acquire', 'rate_limit', per_exchange=True)
+
+    # ---- 경로 콜백 ----
+
+    def _on_build(self, symbol, *args):
+        # 틱 주입부터 감지 스레드가 깨어나 처리를 시작할 때까지 (리스너, 이벤트 대기)
+        injected = self.injected_ns.get(symbol)
+        if injected:
+            self.record('dispatch', injected)
+
+    def _on_built(self, pair, symbol, *args):
+        if pair:
+            pair[0]['bench_tick_ns'] = self.injected_ns.get(symbol)
+        else:
+            self.processed.set()  # 한쪽 거래소 시세가 아직 없음
+
+    def _on_processed(self, _result, data1, *args):
+        if data1.get('bench_tick_ns'):
+            self.record('tick_to_decision', data1['bench_tick_ns'])
+        self.processed.set()
+
+    def _on_signal(self, data1, *args):
+        self.counts['signals'] += 1
+        self._triggered = self._monitor.stats['trades_triggered']
+        data1['bench_signal_ns'] = time.perf_counter_ns()
+
+    def _on_submitted(self, *args):
+        # 진행 중인 거래가 있으면 _submit_trade 가 주문 없이 반환함
+        self.trade_submitted = self._monitor.stats['trades_triggered'] > self._triggered
+
+    def _on_trade_start(self, mexc_data, *args):
+        self.counts['trades'] += 1
+        # 감지 스레드 -> 주문 실행 스레드 전달 시간
+        self.record('trade_handoff', mexc_data['bench_signal_ns'])
+        self._local.tick_ns = mexc_data.get('bench_tick_ns')
+
+    def _on_trade_done(self, *args):
+        self.trade_done.set()
+
+    def _on_order(self, result, exchange, *args):
+        if result:
+            self.samples.setdefault(f'round_trip.{exchange}', []).append(result['times']['round_trip_ms'])
+
+    def _on_orders(self, result, *args):
+        success, _message, _report = result
+        self.orders_sent = True
+        self.counts['orders_filled' if success else 'orders_failed'] += 1
+        if success and getattr(self._local, 'tick_ns', None):
+            self.record('tick_to_ack', self._local.tick_ns)
+
+
+class LatencyBenchmark:
+    """틱 도착부터 양쪽 차익거래 주문 응답까지의 경로를 로컬 가상 거래소로 측정합니다.
+
+    PriceGapMonitor 의 실제 감지 스레드와 TradingExecutor 의 주문 풀을 그대로
+    사용하고, 시세 캐시(MarketDataCache.update)에 호가를 넣는 것부터 시작합니다.
+    rate 가 0 이면 틱마다 처리(와 주문)가 끝나기를 기다리고(닫힌 루프), 0 보다
+    크면 초당 rate 틱을 기다리지 않고 넣어 처리량과 합쳐진(coalesced) 틱 수를 봅니다.
+    닫힌 루프에서는 주문 후 trade_interval 초를 쉬어 거래소 주문 한도(RateLimitScheduler)
+    대기가 주문 지연시간에 섞이지 않게 합니다 (대기 시간은 rate_limit 구간으로 따로 기록).
+    """
+
+    def __init__(self, monitor, market_data, recorder: StageRecorder, trade_interval: float = 0.25):
+        self.monitor = monitor
+        self.market_data = market_data
+        self.recorder = recorder
+        self.trade_interval = trade_interval
+
+    def inject(self, tick: Tick) -> bool:
+        recorder = self.recorder
+        recorder.processed.clear()
+        recorder.trade_done.clear()
+        recorder.trade_submitted = False
+        recorder.orders_sent = False
+        recorder.injected_ns[tick.symbol] = time.perf_counter_ns()
+        return self.market_data.update(tick.exchange, tick.symbol, tick.orderbook, tick.ticker)
+
+    def wait(self, timeout: float = TICK_TIMEOUT) -> bool:
+        """주입한 틱의 감지 처리와 (진입했다면) 주문 완료를 기다립니다."""
+        recorder = self.recorder
+        if not recorder.processed.wait(timeout):
+            return False
+        if recorder.trade_submitted and not recorder.trade_done.wait(timeout):
+            return False
+        self.wait_idle(timeout)
+        return True
+
+    def wait_idle(self, timeout: float = TICK_TIMEOUT):
+        """진행 중인 주문이 끝날 때까지 기다립니다."""
+        deadline = time.monotonic() + timeout
+        while self.monitor.trades_in_flight and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def run(self, ticks: List[Tick], rate: float = 0.0) -> Dict[str, Any]:
+        """틱을 넣고 (틱 수, 처리된 틱 수, 걸린 시간, 주문 후 쉰 시간) 을 반환합니다."""
+        processed_before = self.monitor.stats['ticks_processed']
+        timeouts = 0
+        idle = 0.0
+        interval = 1.0 / rate if rate > 0 else 0.0
+        started = time.perf_counter()
+        for index, tick in enumerate(ticks):
+            if interval:
+                delay = started + index * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.inject(tick)
+            elif self.inject(tick):
+                if not self.wait():
+                    timeouts += 1
+                elif self.recorder.orders_sent and self.trade_interval:
+                    time.sleep(self.trade_interval)
+                    idle += self.trade_interval
+        self.wait_idle()
+        duration = time.perf_counter() - started
+        return {
+            'ticks': len(ticks),
+            'processed': self.monitor.stats['ticks_processed'] - processed_before,
+            'timeouts': timeouts,
+            'duration_s': duration,
+            'idle_s': idle
+        }
+
+    def measure_allocations(self, ticks: List[Tick]) -> Dict[str, Any]:
+        """tracemalloc 으로 틱당 최대 메모리와 구간별 순 할당량(KB)을 잽니다 (닫힌 루프)."""
+        peaks = []
+        tracemalloc.start()
+        try:
+            start_snapshot = tracemalloc.take_snapshot()
+            for tick in ticks:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                if self.inject(tick):
+                    self.wait()
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            self.wait_idle()
+            end_snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        # 측정 동안 해제되지 않고 늘어난 메모리의 할당 위치 (누수 확인용)
+        growth = end_snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                             tracemalloc.Filter(False, __file__)]) \
+            .compare_to(start_snapshot, 'lineno')
+        return {
+            'ticks': len(ticks),
+            'peak_kb': summarize_samples([peak / 1024 for peak in peaks]) if peaks else {},
+            'stages_kb': {stage: float(np.mean(values)) / 1024
+                          for stage, values in sorted(self.recorder.allocations.items())},
+            'retained_kb': sum(stat.size_diff for stat in growth) / 1024,
+            'top_sites': [
+                {'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'size_kb': stat.size_diff / 1024, 'count': stat.count_diff}
+                for stat in growth[:TOP_ALLOCATION_SITES]
+            ]
+        }
+
+
+def compare_results(result: Dict[str, Any], baseline: Dict[str, Any], tolerance_pct: float = 20.0,
+                    min_delta_ms: float = 0.5) -> Dict[str, Any]:
+    """기준 결과와 비교해 구간별 변화율과 성능 저하 목록을 반환합니다.
+
+    구간 지연시간(p50/p99)은 tolerance_pct 이상 늘고 차이가 min_delta_ms 보다
+    클 때 (p99 는 표본이 MIN_P99_SAMPLES 이상일 때만), 처리량은 tolerance_pct
+    이상 줄었을 때, 틱당 최대 메모리(p50)는 tolerance_pct 이상 늘었을 때 성능
+    저하로 봅니다.
+    """
+    changes: Dict[str, Any] = {}
+    regressions = []
+
+    def check(name: str, current: float, base: float, higher_is_worse: bool = True, min_delta: float = 0.0):
+        if not base:
+            return
+        change = (current - base) / base * 100
+        worse = change > tolerance_pct if higher_is_worse else change < -tolerance_pct
+        regression = worse and abs(current - base) > min_delta
+        changes[name] = {'baseline': base, 'current': current, 'change_pct': change, 'regression': regression}
+        if regression:
+            regressions.append(name)
+
+    for stage, summary in result['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric == 'p99' and min(summary['count'], base.get('count', 0)) < MIN_P99_SAMPLES:
+                continue
+            check(f"{stage}.{metric}", summary[metric], base.get(metric), min_delta=min_delta_ms)
+
+    check('throughput.ticks_per_s', result['throughput']['ticks_per_s'],
+          baseline.get('throughput', {}).get('ticks_per_s'), higher_is_worse=False)
+    base_peak = baseline.get('allocations', {}).get('peak_kb', {}).get('p50')
+    current_peak = result.get('allocations', {}).get('peak_kb', {}).get('p50')
+    if current_peak is not None:
+        check('allocations.peak_kb.p50', current_peak, base_peak)
+
+    # 틱 종류/거래소 쌍/주문 경로가 다르면 비교 결과를 믿기 어려움
+    mismatched = [key for key in ('source', 'config') if result.get(key) != baseline.get(key)]
+    return {'tolerance_pct': tolerance_pct, 'min_delta_ms': min_delta_ms, 'mismatched': mismatched,
+            'changes': changes, 'regressions': regressions}
+
+
+def start_mock_exchange(symbol: str, latency: float = 0.0, jitter: float = 0.0,
+                        seed: Optional[int] = None) -> Tuple[subprocess.Popen, str]:
+    """가상 거래소를 별도 프로세스로 띄우고 (프로세스, 주소) 를 반환합니다.
+
+    같은 프로세스에서 실행하면 서버의 호가 갱신/요청 처리가 GIL 을 나눠 써서
+    측정 대상 경로의 지연시간에 섞이므로 프로세스를 분리합니다.
+    """
+    command = [sys.executable, '-u', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                  'mock_exchange_server.py'),
+               '--port', '0', '--symbols', symbol, '--latency', str(latency), '--jitter', str(jitter)]
+    if seed is not None:
+        command += ['--seed', str(seed)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in process.stdout:
+        if line.startswith('MOCK_EXCHANGE_URL='):
+            return process, line.strip().split('=', 1)[1]
+    process.kill()
+    raise RuntimeError('Mock exchange server exited before reporting its address')
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """가상 거래소와 감지/주문 경로를 준비하고 측정 결과를 반환합니다."""
+    process = None
+    exchange_url = args.exchange_url
+    if not exchange_url:
+        process, exchange_url = start_mock_exchange(args.symbol, args.exchange_latency, args.exchange_jitter,
+                                                    args.seed)
+        logger.info(f"Started mock exchange at {exchange_url}")
+
+    # 실제 거래소/텔레그램으로 요청이 나가지 않도록 환경변수를 먼저 정함
+    os.environ['MOCK_EXCHANGE_URL'] = exchange_url
+    os.environ['ORDER_GATEWAY_ENABLED'] = '1' if args.gateway else '0'
+    os.environ.pop('TELEGRAM_BOT_TOKEN', None)
+    os.environ['TRADING_SYMBOLS'] = args.symbol
+
+    from market_data import MarketDataCache
+    from price_monitor import PriceGapMonitor
+    from trading import TradingExecutor
+
+    monitor = None
+    try:
+        trading = TradingExecutor()
+        for exchange in (args.exchange1, args.exchange2):
+            if not trading.wait_ready(exchange, timeout=30):
+                raise RuntimeError(f"{exchange} did not initialize against {exchange_url}")
+        market_data = MarketDataCache(trading, symbols=[args.symbol], exchanges=[args.exchange1, args.exchange2])
+        monitor = PriceGapMonitor(market_data, trading)
+        monitor.exchange_pairs = [(args.exchange1, args.exchange2)]
+        monitor.trade_cooldown = 0
+
+        if args.dataset:
+            from backtest import PairDataset
+            dataset = PairDataset.load(args.dataset)
+            ticks = list(recorded_ticks(dataset, args.warmup + args.ticks))
+            source = {'type': 'recorded', 'dataset': args.dataset, 'pair': f"{dataset.exchange1}-{dataset.exchange2}"}
+        else:
+            ticks = list(synthetic_ticks(args.warmup + args.ticks, args.exchange1, args.exchange2, args.symbol,
+                                         monitor.trading_thresholds, args.signal_ratio, args.price, args.depth,
+                                         args.level_notional, args.seed))
+            source = {'type': 'synthetic', 'signal_ratio': args.signal_ratio, 'price': args.price,
+                      'depth': args.depth}
+
+        recorder = StageRecorder()
+        recorder.install(monitor, trading)
+        benchmark = LatencyBenchmark(monitor, market_data, recorder, args.trade_interval)
+        monitor.running = True
+        monitor._start_worker()
+
+        warmup = ticks[:args.warmup]
+        measured = ticks[args.warmup:]
+        logger.info(f"Warming up with {len(warmup)} ticks, measuring {len(measured)} ticks")
+        benchmark.run(warmup)
+        recorder.reset()
+
+        gc_before = [stats['collections'] for stats in gc.get_stats()]
+        run = benchmark.run(measured, args.rate)
+        gc_after = [stats['collections'] for stats in gc.get_stats()]
+
+        stages = {stage: summarize_samples(samples) for stage, samples in sorted(recorder.samples.items())}
+        counts = dict(recorder.counts)
+        allocations = {}
+        if args.alloc_ticks:
+            recorder.reset()
+            allocations = benchmark.measure_allocations(measured[:args.alloc_ticks])
+        allocations['gc_collections'] = [after - before for before, after in zip(gc_before, gc_after)]
+
+        busy = run['duration_s'] - run['idle_s']
+        return {
+            'source': source,
+            'config': {
+                'symbol': args.symbol,
+                'pair': f"{args.exchange1}-{args.exchange2}",
+                'ticks': len(measured),
+                'warmup': len(warmup),
+                'rate': args.rate,
+                'trade_interval': args.trade_interval,
+                'gateway': args.gateway,
+                'exchange_latency_s': args.exchange_latency if process else None,
+                'seed': args.seed
+            },
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count()
+            },
+            'counts': {**counts, 'processed': run['processed'], 'timeouts': run['timeouts'],
+                       'coalesced': run['ticks'] - run['processed']},
+            # 주문 후 쉰 시간을 뺀 처리 시간 기준
+            'throughput': {
+                'duration_s': run['duration_s'],
+                'idle_s': run['idle_s'],
+                'ticks_per_s': run['ticks'] / busy if busy > 0 else 0.0,
+                'trades_per_s': counts['trades'] / busy if busy > 0 else 0.0
+            },
+            'stages': stages,
+            'allocations': allocations
+        }
+    finally:
+        if monitor is not None:
+            monitor.running = False
+            monitor._wakeup.set()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=5)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='Benchmark the tick-to-order latency of the arbitrage path')
+    parser.add_argument('--symbol', default='XRP/USDT')
+    parser.add_argument('--exchange1', default='mexc', help='가격차를 감시하는 거래소')
+    parser.add_argument('--exchange2', default='bitget', help='기준 거래소')
+    parser.add_argument('--ticks', type=int, default=2000, help='측정할 틱 수')
+    parser.add_argument('--warmup', type=int, default=100, help='측정 전에 버리는 틱 수')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='초당 주입할 틱 수 (0 이면 틱마다 처리가 끝나기를 기다림)')
+    parser.add_argument('--trade-interval', type=float, default=0.25,
+                        help='닫힌 루프에서 주문 후 쉬는 시간 (초, 거래소 주문 한도 안쪽으로 유지)')
+    parser.add_argument('--dataset', default=None, help='기록된 틱으로 측정할 PairDataset 경로 (PairDataset.save)')
+    parser.add_argument('--signal-ratio', type=float, default=0.1, help='합성 틱 중 진입 신호 비율')
+    parser.add_argument('--price', type=float, default=0.5, help='합성 틱 기준 가격')
+    parser.add_argument('--depth', type=int, default=20, help='합성 호가 단계 수')
+    parser.add_argument('--level-notional', type=float, default=20.0, help='합성 호가 단계당 금액 (USDT)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--gateway', action='store_true', help='ccxt 대신 주문 게이트웨이로 주문')
+    parser.add_argument('--exchange-url', default=None, help='이미 실행 중인 가상 거래소 주소 (생략하면 새로 띄움)')
+    parser.add_argument('--exchange-latency', type=float, default=0.0, help='가상 거래소 응답 지연 (초)')
+    parser.add_argument('--exchange-jitter', type=float, default=0.0, help='가상 거래소 응답 지연 지터 (초)')
+    parser.add_argument('--alloc-ticks', type=int, default=200, help='할당 측정에 쓸 틱 수 (0 이면 생략)')
+    parser.add_argument('--output', default=None, help='결과 JSON 을 저장할 파일')
+    parser.add_argument('--baseline', default=None, help='비교할 기준 결과 JSON')
+    parser.add_argument('--save-baseline', default=None, help='결과를 기준 결과로 저장할 파일')
+    parser.add_argument('--tolerance', type=float, default=20.0, help='성능 저하로 볼 변화율 (%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='무시할 지연시간 차이 (ms)')
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            result['comparison'] = compare_results(result, json.load(f), args.tolerance, args.min_delta_ms)
+        if result['comparison']['mismatched']:
+            logger.warning(f"Baseline {args.baseline} was recorded with a different "
+                           f"{' and '.join(result['comparison']['mismatched'])}")
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+    print(output)
+
+    if result.get('comparison', {}).get('regressions'):
+        logger.error(f"Latency regressions against {args.baseline}: "
+                     f"{', '.join(result['comparison']['regressions'])}")
+        sys.exit(1)
@@ -4,9 +4,14 @@ import threading
 import time
 from datetime import datetime
 import pytz
-from flask import Flask, render_template, jsonify, request
-from trading import TradingExecutor
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
+from trading import get_trading_executor
 from price_monitor import PriceGapMonitor
+from market_data import MarketDataCache, DEFAULT_EXCHANGES, DEFAULT_SYMBOLS, build_orderbook_rows
+from market_stream import MarketStream
+from price_stream import PriceStreamHub
+from tick_store import TickStore, stream_key
+from balance_service import BalanceService
 
 # Configure detailed logging
 logging.basicConfig(
@@ -22,6 +27,11 @@ app.secret_key = os.environ.get("SESSION_SECRET")
 # Global variables
 trading_executor = None
 price_monitor = None
+market_data = None
+market_stream = None
+price_stream = None
+tick_store = None
+balance_service = None
 is_initialized = False
 initialization_status = "Starting..."
 initialization_details = []
@@ -33,9 +43,33 @@ def get_current_time():
     """현재 한국 시간을 반환합니다."""
     return datetime.now(KST)
 
+def select_monitor_symbols(executor) -> list:
+    """MONITOR_SYMBOLS 설정으로 감시할 코인 목록을 정합니다.
+
+    비어 있으면 기본 코인, 'all' 이면 초기화된 모든 거래소에 상장된 USDT 무기한
+    선물 중 Bitget 24시간 거래대금 상위 MAX_MONITOR_SYMBOLS 개, 그 외에는
+    쉼표로 구분한 코인 목록입니다.
+    """
+    setting = os.environ.get('MONITOR_SYMBOLS', '').strip()
+    if not setting:
+        return list(DEFAULT_SYMBOLS)
+    if setting.lower() != 'all':
+        return [symbol.strip().upper() for symbol in setting.split(',') if symbol.strip()]
+
+    for exchange in DEFAULT_EXCHANGES:
+        executor.wait_ready(exchange, timeout=30)
+    exchanges = [exchange for exchange in DEFAULT_EXCHANGES if executor.is_ready(exchange)]
+    candidates = executor.universe.symbols(exchanges)
+    tickers = executor.fetch_all_tickers(candidates, ['bitget'], timeout=10)['bitget']
+    volumes = {symbol: float(ticker.get('quoteVolume') or 0) for symbol, ticker in tickers.items()}
+    symbols = executor.universe.select(exchanges, int(os.environ.get('MAX_MONITOR_SYMBOLS', '200')),
+                                       DEFAULT_SYMBOLS, volumes)
+    logger.info(f"Monitoring {len(symbols)} of {len(candidates)} common USDT perpetuals on {', '.join(exchanges)}")
+    return symbols
+
 def initialize_components():
     """시스템 컴포넌트 초기화"""
-    global trading_executor, price_monitor, is_initialized, initialization_status, initialization_details
+    global trading_executor, price_monitor, market_data, market_stream, price_stream, tick_store, balance_service, is_initialized, initialization_status, initialization_details
     logger.info("Starting initialization process...")
 
     try:
@@ -46,19 +80,63 @@ def initialize_components():
         initialization_details.append("거래소 연결 중...")
         try:
             global trading_executor
-            trading_executor = TradingExecutor()
-            initialization_details.append("✅ 거래소 연결 완료")
+            trading_executor = get_trading_executor()
+            initialization_details.append(f"✅ 거래소 연결 완료: {', '.join(trading_executor.initialized_exchanges)}")
         except Exception as e:
             logger.error(f"Trading executor initialization failed: {e}")
             initialization_status = f"거래 실행기 초기화 실패: {str(e)}"
             return
 
+        # 잔액 캐시 (체결 시 무효화, 체결 기록으로 수익률 계산)
+        balance_service = BalanceService(
+            trading_executor,
+            ttl=float(os.environ.get('BALANCE_CACHE_TTL', '15'))
+        )
+
+        # 시세 스냅샷 캐시 시작 (WebSocket 스트림 또는 REST 폴링)
+        symbols = select_monitor_symbols(trading_executor)
+        market_data = MarketDataCache(
+            trading_executor,
+            symbols=symbols,
+            refresh_interval=float(os.environ.get('MARKET_DATA_REFRESH_INTERVAL', '0.5')),
+            max_staleness=float(os.environ.get('MARKET_DATA_MAX_STALENESS', '5'))
+        )
+        if os.environ.get('MARKET_STREAM_ENABLED') == '1':
+            # 리플레이 서버와 가상 거래소는 같은 /ws, /rest 경로를 사용
+            replay_url = os.environ.get('MARKET_STREAM_REPLAY_URL') or os.environ.get('MOCK_EXCHANGE_URL')
+            market_stream = MarketStream(
+                symbols=symbols,
+                market_data=market_data,
+                universe=trading_executor.universe,
+                urls=MarketStream.replay_urls(replay_url) if replay_url else None,
+                record_path=os.environ.get('MARKET_STREAM_RECORD_PATH')
+            )
+            market_stream.start()
+            initialization_details.append("✅ 실시간 시세 스트림 시작")
+        else:
+            market_data.start()
+            initialization_details.append(f"✅ 시세 캐시 시작 ({len(symbols)}개 코인)")
+
+        # 시세/가격차 이력 저장 (백테스트용, TICK_STORE_ENABLED=1 일 때만)
+        if os.environ.get('TICK_STORE_ENABLED', '0') == '1':
+            tick_store = TickStore()
+            tick_store.attach(market_data)
+            tick_store.start()
+            initialization_details.append("✅ 시세 이력 저장 시작")
+
+        # 대시보드 푸시 스트림 (/api/stream)
+        price_stream = PriceStreamHub(
+            market_data,
+            interval=float(os.environ.get('PRICE_STREAM_INTERVAL', '0.25'))
+        )
+        price_stream.start()
+
         # 3. Price Monitor 초기화
         initialization_status = "가격 모니터링 시스템 초기화 중..."
         initialization_details.append("가격 모니터링 시스템 초기화 중...")
         try:
             global price_monitor
-            price_monitor = PriceGapMonitor()
+            price_monitor = PriceGapMonitor(market_data=market_data, trading=trading_executor)
             initialization_details.append("✅ 가격 모니터링 시스템 초기화 완료")
         except Exception as e:
             logger.error(f"Price monitor initialization failed: {e}")
@@ -90,13 +168,44 @@ def orderbook_page():
     """상세 호가창 페이지"""
     return render_template('orderbook.html')
 
+@app.route('/metrics')
+def metrics_page():
+    """거래소 API 지연시간 대시보드 페이지"""
+    return render_template('metrics.html')
+
 @app.route('/api/status')
 def get_status():
     """Get initialization status"""
     return jsonify({
         'initialized': is_initialized,
         'status': initialization_status,
-        'details': initialization_details
+        'details': initialization_details,
+        'exchanges': trading_executor.get_readiness() if trading_executor else {},
+        'market_data': market_data.get_status() if market_data else [],
+        'stream': price_stream.get_status() if price_stream else {},
+        'tick_store': tick_store.get_status() if tick_store else {},
+        'balance': balance_service.get_status() if balance_service else {},
+        'rate_limits': trading_executor.rate_limiter.get_metrics() if trading_executor else {}
+    })
+
+@app.route('/api/metrics')
+def api_metrics():
+    """거래소 API 호출 메트릭 (Prometheus text 형식)"""
+    if not trading_executor:
+        return Response('', mimetype='text/plain; version=0.0.4')
+    return Response(trading_executor.metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/summary')
+def api_metrics_summary():
+    """최근 window 초 동안의 거래소/엔드포인트별 지연시간 요약 (대시보드용)"""
+    if not trading_executor:
+        return jsonify({'error': 'System initializing, please wait...'}), 503
+
+    window = request.args.get('window', type=float)
+    return jsonify({
+        'window': window or trading_executor.metrics.window,
+        'endpoints': trading_executor.metrics.summary(window),
+        'rate_limits': trading_executor.rate_limiter.get_metrics()
     })
 
 @app.route('/api/current_time')
@@ -120,43 +229,18 @@ def api_get_orderbook():
         }), 503
 
     try:
-        symbols = ['XRP/USDT', 'DOGE/USDT']
         results = []
+        symbols = request.args.get('symbols')
+        symbols = [symbol.strip().upper() for symbol in symbols.split(',')] if symbols else DEFAULT_SYMBOLS
 
         for symbol in symbols:
             try:
-                # MEXC-Bitget pair
-                mexc_orderbook = trading_executor.fetch_order_book('mexc', symbol, limit=3)
-                mexc_ticker = trading_executor.fetch_ticker('mexc', symbol)
-                bitget_orderbook = trading_executor.fetch_order_book('bitget', symbol, limit=3)
-                bitget_ticker = trading_executor.fetch_ticker('bitget', symbol)
-
-                # Gate.io-Bitget pair
-                gateio_orderbook = trading_executor.fetch_order_book('gateio', symbol, limit=3)
-                gateio_ticker = trading_executor.fetch_ticker('gateio', symbol)
-
-                # MEXC-Bitget 가격 차이 계산
-                mexc_price = float(mexc_ticker['last'])
-                bitget_price = float(bitget_ticker['last'])
-                mexc_bitget_gap = ((mexc_price - bitget_price) / bitget_price) * 100
-                mexc_bitget_usdt = mexc_price - bitget_price
-
-                # Gate.io-Bitget 가격 차이 계산
-                gateio_price = float(gateio_ticker['last'])
-                gateio_bitget_gap = ((gateio_price - bitget_price) / bitget_price) * 100
-                gateio_bitget_usdt = gateio_price - bitget_price
-
-                results.extend([
-                    format_orderbook_data('MEXC Futures', symbol, mexc_orderbook, mexc_ticker['last'], mexc_bitget_gap, mexc_bitget_usdt),
-                    format_orderbook_data('Gate.io Futures', symbol, gateio_orderbook, gateio_ticker['last'], gateio_bitget_gap, gateio_bitget_usdt),
-                    format_orderbook_data('Bitget Futures', symbol, bitget_orderbook, bitget_ticker['last'], 0, 0),
-                ])
-
+                results.extend(build_orderbook_rows(market_data, symbol))
             except Exception as e:
-                logger.error(f"Error fetching data for {symbol}: {e}")
+                logger.error(f"Error formatting data for {symbol}: {e}")
 
         if not results:
-            return jsonify({'error': 'Failed to fetch data'}), 500
+            return jsonify({'error': 'No fresh market data available'}), 503
 
         return jsonify(results)
 
@@ -164,6 +248,79 @@ def api_get_orderbook():
         logger.error(f"Error in get_orderbook: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/symbols')
+def api_get_symbols():
+    """감시 중인 코인 목록과 거래소별 USDT 무기한 선물 인덱스 상태를 반환합니다."""
+    if not trading_executor:
+        return jsonify({'error': 'System initializing, please wait...'}), 503
+
+    return jsonify({
+        'symbols': market_data.symbols if market_data else [],
+        'universe': trading_executor.universe.get_status(),
+        'schedule': market_data.get_schedule_status() if market_data and not market_stream else {}
+    })
+
+@app.route('/api/stream')
+def api_stream():
+    """호가/시간 변경분을 Server-Sent Events 로 푸시합니다."""
+    if not is_initialized or not price_stream:
+        return jsonify({
+            'error': 'System initializing, please wait...',
+            'status': initialization_status,
+            'details': initialization_details
+        }), 503
+
+    client = price_stream.subscribe()
+    if client is None:
+        return jsonify({'error': 'Too many stream clients'}), 503
+
+    def generate():
+        try:
+            yield 'retry: 2000\n\n'
+            while not client.closed:
+                frames = client.drain(timeout=15)
+                # 15초 동안 변경이 없으면 연결 유지용 주석 전송
+                yield ''.join(frames) if frames else ': keepalive\n\n'
+        finally:
+            price_stream.unsubscribe(client)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/history')
+def api_get_history():
+    """저장된 시세/가격차 이력을 interval 초 단위로 요약해서 반환합니다.
+
+    source 가 거래소 쌍(예: mexc-bitget)이면 가격차, 거래소 이름이면 체결가 이력입니다.
+    start/end 는 초 단위 타임스탬프이며 기본값은 최근 1시간입니다.
+    """
+    if not tick_store:
+        return jsonify({'error': 'Tick store is disabled'}), 503
+
+    try:
+        source = request.args.get('source', 'mexc-bitget')
+        symbol = request.args.get('symbol', DEFAULT_SYMBOLS[0])
+        end = float(request.args.get('end', time.time()))
+        start = float(request.args.get('start', end - 3600))
+        interval = float(request.args.get('interval', 60))
+        kind = 'gap' if '-' in source else 'book'
+        column = request.args.get('column', 'gap' if kind == 'gap' else 'last')
+
+        bars = tick_store.downsample(kind, stream_key(source, symbol), start, end, interval, column)
+        return jsonify({
+            'source': source,
+            'symbol': symbol,
+            'column': column,
+            'interval': interval,
+            'bars': {name: values.tolist() for name, values in bars.items()}
+        })
+
+    except Exception as e:
+        logger.error(f"Error in get_history: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/balance')
 def api_get_balance():
     """거래소 잔액 정보를 반환합니다."""
@@ -175,12 +332,23 @@ def api_get_balance():
         }), 503
 
     try:
-        balances = trading_executor.fetch_balance()
-        return jsonify(balances)
+        balances, age, stale = balance_service.get()
+        response = jsonify(balances)
+        response.headers['X-Balance-Age'] = f"{age:.1f}"
+        response.headers['X-Balance-Stale'] = '1' if stale else '0'
+        return response
     except Exception as e:
         logger.error(f"Error fetching balances: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/positions')
+def api_get_positions():
+    """포지션 장부의 거래소/코인별 포지션과 코인별 순노출을 반환합니다."""
+    if not trading_executor:
+        return jsonify({'error': 'System initializing, please wait...'}), 503
+
+    return jsonify(trading_executor.positions.get_status())
+
 @app.route('/api/trading/start', methods=['POST'])
 def start_trading():
     """자동매매 시작"""
@@ -215,30 +383,11 @@ def get_trading_status():
             return jsonify({'status': 'not_initialized'})
 
         status = 'running' if price_monitor.running else 'stopped'
-        return jsonify({'status': status})
+        return jsonify({'status': status, 'stats': price_monitor.get_stats()})
     except Exception as e:
         logger.error(f"Failed to get trading status: {e}")
         return jsonify({'error': str(e)}), 500
 
-def format_orderbook_data(exchange, symbol, orderbook, last_price, price_gap, price_gap_usdt):
-    """호가 데이터 포맷팅"""
-    asks = [[float(price), float(amount), float(price) * float(amount)]
-            for price, amount in orderbook['asks'][:3]]
-    bids = [[float(price), float(amount), float(price) * float(amount)]
-            for price, amount in orderbook['bids'][:3]]
-
-    return {
-        'exchange': exchange,
-        'symbol': symbol,
-        'asks': asks,
-        'bids': bids,
-        'last_price': last_price,
-        'last_price_krw': float(last_price) * 1300,
-        'price_gap': price_gap,
-        'price_gap_usdt': price_gap_usdt,
-        'timestamp': int(get_current_time().timestamp() * 1000)
-    }
-
 if __name__ == '__main__':
     # Start initialization in a separate thread
     init_thread = threading.Thread(target=initialize_components)
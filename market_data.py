@@ -0,0 +1,293 @@
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+from orderbook import OrderBook
+
+logger = logging.getLogger(__name__)
+
+# 대시보드/모니터가 기본으로 감시하는 거래소와 코인
+DEFAULT_EXCHANGES = ['mexc', 'gateio', 'bitget']
+DEFAULT_SYMBOLS = ['XRP/USDT', 'DOGE/USDT']
+
+# 가격차를 비교하는 거래소 쌍 (거래소1, 기준 거래소)
+DEFAULT_PAIRS = [('mexc', 'bitget'), ('gateio', 'bitget')]
+
+# 대시보드/알림에 표시되는 거래소 이름
+EXCHANGE_NAMES = {
+    'mexc': 'MEXC Futures',
+    'gateio': 'Gate.io Futures',
+    'bitget': 'Bitget Futures'
+}
+
+
+class MarketDataCache:
+    """거래소별 최신 호가/시세 스냅샷을 백그라운드에서 갱신하는 공유 캐시
+
+    HTTP 요청은 이 캐시만 읽으므로 접속한 대시보드 수와 관계없이
+    거래소 호출량은 refresh_interval 에 의해서만 결정됩니다.
+
+    시세는 매 주기 거래소별 fetch_tickers 한 번으로 모든 코인을 받고,
+    호가창은 거래소 요청 한도(book_budget) 안에서 우선 코인, 가격차가 큰
+    코인, 나머지를 순서대로 돌아가며 받습니다. 코인 수가 한도보다 적으면
+    매 주기 모든 코인의 호가창을 받습니다. 우선 코인과 순환 한 자리는 한도가
+    더 작아도 항상 받으며 (초과 요청은 토큰 버킷이 늦춤), 이번 주기에 빠진
+    코인 수는 schedule_stats['skipped_symbols'] 에 남깁니다.
+    """
+
+    def __init__(self, trading_executor, symbols: Optional[List[str]] = None,
+                 exchanges: Optional[List[str]] = None, refresh_interval: float = 0.5,
+                 max_staleness: float = 5.0, depth: int = 20, book_budget: Optional[int] = None,
+                 priority_symbols: Optional[List[str]] = None, hot_symbols: int = 10):
+        self.trading = trading_executor
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.exchanges = list(exchanges or DEFAULT_EXCHANGES)
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.depth = depth
+        self.book_budget = book_budget
+        self.priority_symbols = list(priority_symbols or DEFAULT_SYMBOLS)
+        self.hot_symbols = hot_symbols
+        self._cursor = 0
+        self.schedule_stats = {'cycles': 0, 'ticker_requests': 0, 'book_requests': 0, 'books_per_cycle': 0,
+                               'rotating_slots': 0, 'skipped_symbols': 0}
+        self._budget_warned = False
+
+        self._snapshots: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """스냅샷이 갱신될 때마다 (거래소, 코인)으로 호출될 콜백을 등록합니다."""
+        self._listeners.append(callback)
+
+    def start(self):
+        """백그라운드 갱신 스레드를 시작합니다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='market-data-refresher', daemon=True)
+        self._thread.start()
+        logger.info(f"Market data refresher started (interval={self.refresh_interval}s, "
+                    f"max_staleness={self.max_staleness}s)")
+
+    def stop(self):
+        """백그라운드 갱신 스레드를 중지합니다."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval * 2 + 1)
+        logger.info("Market data refresher stopped")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error(f"Market data refresh failed: {e}")
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(0.0, self.refresh_interval - elapsed))
+
+    def books_per_cycle(self) -> int:
+        """한 주기에 호가창을 받을 코인 수 (fetch_tickers 1회를 뺀 거래소별 요청 한도 중 최솟값)"""
+        if self.book_budget:
+            return self.book_budget
+        budgets = [self.trading.request_budget(exchange, self.refresh_interval) - 1 for exchange in self.exchanges]
+        return max(1, min(budgets)) if budgets else 1
+
+    def schedule_books(self, tickers: Dict[str, Dict[str, Dict[str, Any]]]) -> List[str]:
+        """이번 주기에 호가창을 받을 코인을 고릅니다 (우선 코인 > 가격차 큰 코인 > 순환)."""
+        symbols = self.symbols
+        budget = self.books_per_cycle()
+        if len(symbols) <= budget:
+            return list(symbols)
+
+        # 우선 코인은 한도와 관계없이 모두 받고, 나머지 코인이 멈추지 않도록 순환 한 자리는 남김
+        selected = [symbol for symbol in self.priority_symbols if symbol in symbols]
+        if budget < len(selected) + 1:
+            if not self._budget_warned:
+                logger.warning(f"Order book budget of {budget} per cycle is below {len(selected)} priority "
+                               f"symbols + 1 rotation slot, requests will be throttled by the rate limiter")
+                self._budget_warned = True
+            budget = len(selected) + 1
+
+        # 시세 기준 가격차가 큰 코인은 매 주기 호가창 갱신
+        spreads: Dict[str, float] = {}
+        for exchange1, exchange2 in DEFAULT_PAIRS:
+            tickers1, tickers2 = tickers.get(exchange1, {}), tickers.get(exchange2, {})
+            for symbol, ticker1 in tickers1.items():
+                ticker2 = tickers2.get(symbol)
+                if ticker1.get('last') and ticker2 and ticker2.get('last'):
+                    spread = abs(ticker1['last'] - ticker2['last']) / ticker2['last']
+                    spreads[symbol] = max(spreads.get(symbol, 0.0), spread)
+        # 순환 갱신이 멈추지 않도록 남은 한도의 절반까지만 사용
+        hot_limit = len(selected) + min(self.hot_symbols, (budget - len(selected)) // 2)
+        for symbol in sorted(spreads, key=spreads.get, reverse=True):
+            if len(selected) >= hot_limit:
+                break
+            if symbol not in selected:
+                selected.append(symbol)
+
+        # 남은 한도는 나머지 코인을 순서대로 돌아가며 채움
+        self.schedule_stats['rotating_slots'] = budget - len(selected)
+        scanned = 0
+        while len(selected) < budget and scanned < len(symbols):
+            symbol = symbols[self._cursor % len(symbols)]
+            self._cursor = (self._cursor + 1) % len(symbols)
+            scanned += 1
+            if symbol not in selected:
+                selected.append(symbol)
+
+        skipped = len(symbols) - len(selected)
+        self.schedule_stats['skipped_symbols'] = skipped
+        logger.debug(f"Scheduled {len(selected)} order books this cycle, skipped {skipped} symbols")
+        return selected
+
+    def refresh_once(self):
+        """시세를 일괄 조회하고, 이번 주기 대상 코인의 호가창을 병렬로 갱신합니다."""
+        symbols = list(self.symbols)
+        timeout = max(self.max_staleness, self.refresh_interval)
+        tickers = self.trading.fetch_all_tickers(symbols, self.exchanges, timeout=timeout)
+        book_symbols = self.schedule_books(tickers)
+
+        fetch_requests = [(exchange, symbol, 'orderbook') for symbol in book_symbols for exchange in self.exchanges]
+        # 일괄 시세 조회가 실패한 거래소는 코인별 시세로 대신 조회
+        fetch_requests += [(exchange, symbol, 'ticker') for symbol in book_symbols
+                           for exchange in self.exchanges if not tickers.get(exchange)]
+        results = self.trading.fetch_batch(fetch_requests, limit=self.depth, timeout=timeout)
+
+        fetched: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for result in results:
+            if result['error'] is None:
+                fetched.setdefault((result['exchange'], result['symbol']), {})[result['kind']] = result['data']
+
+        for (exchange, symbol), data in fetched.items():
+            ticker = data.get('ticker') or tickers.get(exchange, {}).get(symbol)
+            self.update(exchange, symbol, data.get('orderbook'), ticker)
+
+        self.schedule_stats['cycles'] += 1
+        self.schedule_stats['ticker_requests'] += sum(1 for exchange in self.exchanges if tickers.get(exchange))
+        self.schedule_stats['book_requests'] += len(book_symbols) * len(self.exchanges)
+        self.schedule_stats['books_per_cycle'] = len(book_symbols)
+
+    def get_schedule_status(self) -> Dict[str, Any]:
+        """감시 코인 수와 주기별 요청 수를 반환합니다."""
+        symbols = len(self.symbols)
+        slots = self.schedule_stats['rotating_slots']
+        return {
+            **self.schedule_stats,
+            'symbols': symbols,
+            'book_budget': self.books_per_cycle(),
+            # 순환 대상 코인의 호가창이 한 번씩 갱신되는 데 걸리는 시간 (초)
+            'rotation_s': self.refresh_interval * symbols / slots if slots else self.refresh_interval
+        }
+
+    def update(self, exchange: str, symbol: str, orderbook: Optional[OrderBook], ticker: Optional[dict]) -> bool:
+        """스냅샷을 갱신합니다. 조회 실패로 비어 있는 데이터는 기존 값을 덮어쓰지 않습니다."""
+        if orderbook is None or not len(orderbook['asks']) or not len(orderbook['bids']):
+            return False
+        if not ticker or not ticker.get('last'):
+            return False
+
+        with self._lock:
+            self._snapshots[(exchange, symbol)] = {
+                'exchange': exchange,
+                'symbol': symbol,
+                'orderbook': orderbook,
+                'ticker': ticker,
+                'updated_at': time.time(),
+                '_monotonic': time.monotonic()
+            }
+
+        for listener in self._listeners:
+            try:
+                listener(exchange, symbol)
+            except Exception as e:
+                logger.error(f"Market data listener failed: {e}")
+        return True
+
+    def get_snapshot(self, exchange: str, symbol: str, max_staleness: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """최신 스냅샷을 반환합니다. max_staleness 보다 오래된 데이터는 None 을 반환합니다."""
+        with self._lock:
+            entry = self._snapshots.get((exchange, symbol))
+        if entry is None:
+            return None
+
+        age = time.monotonic() - entry['_monotonic']
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        if age > limit:
+            return None
+
+        snapshot = dict(entry)
+        snapshot.pop('_monotonic')
+        snapshot['age_ms'] = age * 1000
+        return snapshot
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """모든 스냅샷의 나이(age)와 신선도 상태를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._snapshots.values())
+        return [
+            {
+                'exchange': entry['exchange'],
+                'symbol': entry['symbol'],
+                'age_ms': (now - entry['_monotonic']) * 1000,
+                'stale': (now - entry['_monotonic']) > self.max_staleness
+            }
+            for entry in entries
+        ]
+
+
+def format_orderbook_data(exchange, symbol, orderbook, last_price, price_gap, price_gap_usdt, age_ms=0):
+    """호가 데이터 포맷팅"""
+    asks = orderbook.levels_with_notional('asks', 3)
+    bids = orderbook.levels_with_notional('bids', 3)
+
+    return {
+        'exchange': exchange,
+        'symbol': symbol,
+        'asks': asks,
+        'bids': bids,
+        'last_price': last_price,
+        'last_price_krw': float(last_price) * 1300,
+        'price_gap': price_gap,
+        'price_gap_usdt': price_gap_usdt,
+        'age_ms': age_ms,
+        'timestamp': int(time.time() * 1000)
+    }
+
+
+def build_orderbook_rows(market_data: MarketDataCache, symbol: str) -> List[Dict[str, Any]]:
+    """한 코인의 대시보드용 호가 데이터(MEXC, Gate.io, Bitget 순)를 만듭니다.
+
+    Bitget 을 기준으로 한 가격 차이를 포함하며, 세 거래소 중 하나라도 신선한
+    스냅샷이 없으면 빈 리스트를 반환합니다.
+    """
+    mexc = market_data.get_snapshot('mexc', symbol)
+    gateio = market_data.get_snapshot('gateio', symbol)
+    bitget = market_data.get_snapshot('bitget', symbol)
+
+    if not (mexc and gateio and bitget):
+        logger.debug(f"No fresh snapshot for {symbol}, skipping")
+        return []
+
+    # MEXC-Bitget 가격 차이 계산
+    mexc_price = float(mexc['ticker']['last'])
+    bitget_price = float(bitget['ticker']['last'])
+    mexc_bitget_gap = ((mexc_price - bitget_price) / bitget_price) * 100
+    mexc_bitget_usdt = mexc_price - bitget_price
+
+    # Gate.io-Bitget 가격 차이 계산
+    gateio_price = float(gateio['ticker']['last'])
+    gateio_bitget_gap = ((gateio_price - bitget_price) / bitget_price) * 100
+    gateio_bitget_usdt = gateio_price - bitget_price
+
+    return [
+        format_orderbook_data(EXCHANGE_NAMES['mexc'], symbol, mexc['orderbook'], mexc_price, mexc_bitget_gap, mexc_bitget_usdt, mexc['age_ms']),
+        format_orderbook_data(EXCHANGE_NAMES['gateio'], symbol, gateio['orderbook'], gateio_price, gateio_bitget_gap, gateio_bitget_usdt, gateio['age_ms']),
+        format_orderbook_data(EXCHANGE_NAMES['bitget'], symbol, bitget['orderbook'], bitget_price, 0, 0, bitget['age_ms']),
+    ]
@@ -0,0 +1,559 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+import aiohttp
+
+from market_data import DEFAULT_EXCHANGES, DEFAULT_SYMBOLS
+from orderbook import OrderBook
+
+logger = logging.getLogger(__name__)
+
+
+class LocalOrderBook:
+    """스냅샷 + 델타 메시지로 유지되는 로컬 L2 호가창
+
+    sequence 는 마지막으로 반영한 메시지의 일련번호입니다. 델타의 시작 번호가
+    sequence + 1 보다 크면 메시지가 누락된 것으로 보고 재동기화가 필요합니다.
+    가격 단계는 배열 기반 OrderBook 에 보관합니다.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.book = OrderBook(symbol)
+        self.sequence: Optional[int] = None
+        self.synced = False
+        self.pending: List[Dict[str, Any]] = []  # 스냅샷 대기 중 받은 델타
+
+    def apply_snapshot(self, bids: List[Tuple[float, float]], asks: List[Tuple[float, float]],
+                       sequence: Optional[int], timestamp: Optional[int] = None):
+        """전체 호가창을 교체하고, 대기 중이던 델타를 순서대로 반영합니다."""
+        self.book.apply_snapshot(bids, asks, sequence, timestamp)
+        self.sequence = sequence
+        self.synced = True
+
+        pending, self.pending = self.pending, []
+        for delta in pending:
+            if not self.apply_delta(delta):
+                return False
+        return True
+
+    def apply_delta(self, delta: Dict[str, Any]) -> bool:
+        """델타를 반영합니다. 일련번호 누락이 감지되면 False 를 반환합니다."""
+        if not self.synced:
+            if len(self.pending) < 1000:
+                self.pending.append(delta)
+            return True
+
+        first, last = delta.get('first'), delta.get('last')
+        if last is not None and self.sequence is not None:
+            if last <= self.sequence:
+                return True  # 스냅샷보다 오래된 메시지
+            if first is not None and first > self.sequence + 1:
+                logger.warning(f"Sequence gap on {self.symbol}: expected {self.sequence + 1}, got {first}")
+                self.synced = False
+                return False
+
+        self.book.apply_delta(delta['bids'], delta['asks'], last, delta.get('timestamp'))
+        if last is not None:
+            self.sequence = last
+        return True
+
+    def invalidate(self):
+        """재동기화를 위해 호가창을 무효화합니다."""
+        self.synced = False
+        self.pending = []
+
+    def snapshot(self, limit: Optional[int] = None) -> OrderBook:
+        """상위 limit 단계를 복사한 OrderBook 을 반환합니다 (이후 델타의 영향을 받지 않음)."""
+        return self.book.copy(limit)
+
+
+class StreamAdapter:
+    """거래소별 WebSocket 프로토콜 차이를 흡수하는 어댑터의 기본 클래스"""
+
+    exchange = ''
+    ws_url = ''
+    rest_url = ''
+    ping_interval = 20.0
+
+    def __init__(self, ws_url: Optional[str] = None, rest_url: Optional[str] = None):
+        self.ws_url = ws_url or self.ws_url
+        self.rest_url = rest_url or self.rest_url
+        self.symbols_by_id: Dict[str, str] = {}
+        self.market_ids: Dict[str, str] = {}
+
+    def default_market_id(self, symbol: str) -> str:
+        base = symbol.split('/')[0]
+        return f"{base}_USDT"
+
+    def market_id(self, symbol: str) -> str:
+        return self.market_ids.get(symbol) or self.default_market_id(symbol)
+
+    def register(self, symbols: List[str], market_ids: Optional[Dict[str, Optional[str]]] = None):
+        """구독할 코인을 등록합니다. market_ids 는 SymbolUniverse 의 거래소 마켓 id 입니다."""
+        self.market_ids = {symbol: market_id for symbol, market_id in (market_ids or {}).items() if market_id}
+        self.symbols_by_id = {self.market_id(symbol): symbol for symbol in symbols}
+
+    def subscribe_messages(self, symbol: str) -> List[Any]:
+        raise NotImplementedError
+
+    def resubscribe_messages(self, symbol: str) -> List[Any]:
+        """REST 스냅샷이 없는 거래소는 재구독으로 스냅샷을 다시 받습니다."""
+        return []
+
+    def ping_message(self) -> Any:
+        raise NotImplementedError
+
+    def snapshot_url(self, symbol: str) -> Optional[str]:
+        return None
+
+    def parse_snapshot(self, payload: Any) -> Tuple[List, List, Optional[int], Optional[int]]:
+        raise NotImplementedError
+
+    def parse(self, message: Any) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class MexcStreamAdapter(StreamAdapter):
+    exchange = 'mexc'
+    ws_url = 'wss://contract.mexc.com/edge'
+    rest_url = 'https://contract.mexc.com'
+
+    def subscribe_messages(self, symbol: str) -> List[Any]:
+        market_id = self.market_id(symbol)
+        return [
+            {'method': 'sub.depth', 'param': {'symbol': market_id}},
+            {'method': 'sub.ticker', 'param': {'symbol': market_id}}
+        ]
+
+    def ping_message(self) -> Any:
+        return {'method': 'ping'}
+
+    def snapshot_url(self, symbol: str) -> Optional[str]:
+        return f"{self.rest_url}/api/v1/contract/depth/{self.market_id(symbol)}"
+
+    def parse_snapshot(self, payload: Any) -> Tuple[List, List, Optional[int], Optional[int]]:
+        data = payload['data']
+        bids = [(float(level[0]), float(level[1])) for level in data['bids']]
+        asks = [(float(level[0]), float(level[1])) for level in data['asks']]
+        return bids, asks, int(data['version']), data.get('timestamp')
+
+    def parse(self, message: Any) -> List[Dict[str, Any]]:
+        channel = message.get('channel')
+        symbol = self.symbols_by_id.get(message.get('symbol'))
+        if not symbol:
+            return []
+        data = message.get('data') or {}
+
+        if channel == 'push.depth':
+            version = int(data['version'])
+            return [{
+                'type': 'delta',
+                'symbol': symbol,
+                'bids': [(float(level[0]), float(level[1])) for level in data.get('bids', [])],
+                'asks': [(float(level[0]), float(level[1])) for level in data.get('asks', [])],
+                'first': version,
+                'last': version,
+                'timestamp': message.get('ts')
+            }]
+        if channel == 'push.ticker':
+            return [{
+                'type': 'ticker',
+                'symbol': symbol,
+                'last': float(data['lastPrice']),
+                'bid': float(data['bid1']) if data.get('bid1') is not None else None,
+                'ask': float(data['ask1']) if data.get('ask1') is not None else None,
+                'timestamp': data.get('timestamp') or message.get('ts')
+            }]
+        return []
+
+
+class BitgetStreamAdapter(StreamAdapter):
+    exchange = 'bitget'
+    ws_url = 'wss://ws.bitget.com/v2/ws/public'
+    rest_url = 'https://api.bitget.com'
+    ping_interval = 25.0
+
+    def default_market_id(self, symbol: str) -> str:
+        return f"{symbol.split('/')[0]}USDT"
+
+    def _args(self, symbol: str) -> List[Dict[str, str]]:
+        market_id = self.market_id(symbol)
+        return [
+            {'instType': 'USDT-FUTURES', 'channel': 'books', 'instId': market_id},
+            {'instType': 'USDT-FUTURES', 'channel': 'ticker', 'instId': market_id}
+        ]
+
+    def subscribe_messages(self, symbol: str) -> List[Any]:
+        return [{'op': 'subscribe', 'args': self._args(symbol)}]
+
+    def resubscribe_messages(self, symbol: str) -> List[Any]:
+        books = self._args(symbol)[:1]
+        return [{'op': 'unsubscribe', 'args': books}, {'op': 'subscribe', 'args': books}]
+
+    def ping_message(self) -> Any:
+        return 'ping'
+
+    def parse(self, message: Any) -> List[Dict[str, Any]]:
+        arg = message.get('arg') or {}
+        symbol = self.symbols_by_id.get(arg.get('instId'))
+        if not symbol or 'data' not in message:
+            return []
+
+        events = []
+        for data in message['data']:
+            if arg.get('channel') == 'books':
+                seq = int(data['seq']) if data.get('seq') is not None else None
+                pseq = data.get('pseq')
+                events.append({
+                    'type': 'snapshot' if message.get('action') == 'snapshot' else 'delta',
+                    'symbol': symbol,
+                    'bids': [(float(level[0]), float(level[1])) for level in data.get('bids', [])],
+                    'asks': [(float(level[0]), float(level[1])) for level in data.get('asks', [])],
+                    'first': int(pseq) + 1 if pseq is not None else None,
+                    'last': seq,
+                    'timestamp': int(data['ts']) if data.get('ts') else None
+                })
+            elif arg.get('channel') == 'ticker':
+                events.append({
+                    'type': 'ticker',
+                    'symbol': symbol,
+                    'last': float(data['lastPr']),
+                    'bid': float(data['bidPr']) if data.get('bidPr') else None,
+                    'ask': float(data['askPr']) if data.get('askPr') else None,
+                    'timestamp': int(data['ts']) if data.get('ts') else None
+                })
+        return events
+
+
+class GateioStreamAdapter(StreamAdapter):
+    exchange = 'gateio'
+    ws_url = 'wss://fx-ws.gateio.ws/v4/ws/usdt'
+    rest_url = 'https://api.gateio.ws'
+
+    def subscribe_messages(self, symbol: str) -> List[Any]:
+        market_id = self.market_id(symbol)
+        now = int(time.time())
+        return [
+            {'time': now, 'channel': 'futures.order_book_update', 'event': 'subscribe',
+             'payload': [market_id, '100ms', '20']},
+            {'time': now, 'channel': 'futures.tickers', 'event': 'subscribe', 'payload': [market_id]}
+        ]
+
+    def ping_message(self) -> Any:
+        return {'time': int(time.time()), 'channel': 'futures.ping'}
+
+    def snapshot_url(self, symbol: str) -> Optional[str]:
+        return (f"{self.rest_url}/api/v4/futures/usdt/order_book"
+                f"?contract={self.market_id(symbol)}&limit=20&with_id=true")
+
+    def parse_snapshot(self, payload: Any) -> Tuple[List, List, Optional[int], Optional[int]]:
+        bids = [(float(level['p']), float(level['s'])) for level in payload['bids']]
+        asks = [(float(level['p']), float(level['s'])) for level in payload['asks']]
+        timestamp = int(float(payload['current']) * 1000) if payload.get('current') else None
+        return bids, asks, int(payload['id']), timestamp
+
+    def parse(self, message: Any) -> List[Dict[str, Any]]:
+        if message.get('event') != 'update':
+            return []
+        channel = message.get('channel')
+        result = message.get('result')
+
+        if channel == 'futures.order_book_update':
+            symbol = self.symbols_by_id.get(result.get('s'))
+            if not symbol:
+                return []
+            return [{
+                'type': 'delta',
+                'symbol': symbol,
+                'bids': [(float(level['p']), float(level['s'])) for level in result.get('b', [])],
+                'asks': [(float(level['p']), float(level['s'])) for level in result.get('a', [])],
+                'first': int(result['U']),
+                'last': int(result['u']),
+                'timestamp': result.get('t')
+            }]
+        if channel == 'futures.tickers':
+            events = []
+            for ticker in result:
+                symbol = self.symbols_by_id.get(ticker.get('contract'))
+                if symbol:
+                    events.append({
+                        'type': 'ticker',
+                        'symbol': symbol,
+                        'last': float(ticker['last']),
+                        'bid': None,
+                        'ask': None,
+                        'timestamp': message.get('time_ms')
+                    })
+            return events
+        return []
+
+
+STREAM_ADAPTERS = {
+    'mexc': MexcStreamAdapter,
+    'bitget': BitgetStreamAdapter,
+    'gateio': GateioStreamAdapter
+}
+
+
+class MarketStream:
+    """MEXC, Bitget, Gate.io 선물의 호가/시세 WebSocket 스트림을 수집합니다.
+
+    별도 스레드의 asyncio 루프에서 동작하며, 갱신된 호가창과 시세는
+    market_data 캐시에 바로 반영되고 등록된 리스너에게 전달됩니다.
+    """
+
+    RESYNC_BACKOFF = 0.5  # 스냅샷 재요청 첫 대기 시간 (초)
+    RESYNC_MAX_BACKOFF = 30.0
+
+    def __init__(self, symbols: Optional[List[str]] = None, exchanges: Optional[List[str]] = None,
+                 market_data=None, urls: Optional[Dict[str, Tuple[str, str]]] = None,
+                 depth: int = 20, record_path: Optional[str] = None, universe=None):
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.market_data = market_data
+        self.depth = depth
+        self.record_path = record_path
+
+        urls = urls or {}
+        self.adapters: Dict[str, StreamAdapter] = {}
+        for exchange in exchanges or DEFAULT_EXCHANGES:
+            ws_url, rest_url = urls.get(exchange, (None, None))
+            adapter = STREAM_ADAPTERS[exchange](ws_url, rest_url)
+            market_ids = ({symbol: universe.market_id(exchange, symbol) for symbol in self.symbols}
+                          if universe else None)
+            adapter.register(self.symbols, market_ids)
+            self.adapters[exchange] = adapter
+
+        self.books: Dict[Tuple[str, str], LocalOrderBook] = {
+            (exchange, symbol): LocalOrderBook(symbol)
+            for exchange in self.adapters for symbol in self.symbols
+        }
+        self.tickers: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {
+            exchange: {'messages': 0, 'gaps': 0, 'resyncs': 0, 'resync_failures': 0, 'reconnects': 0}
+            for exchange in self.adapters
+        }
+
+        self._listeners: List[Callable[[str, str, str], None]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._record_file = None
+
+    @classmethod
+    def replay_urls(cls, base_url: str) -> Dict[str, Tuple[str, str]]:
+        """로컬 리플레이 서버(ws_replay_server.py)에 연결하기 위한 URL 목록"""
+        ws_base = base_url.replace('http://', 'ws://').replace('https://', 'wss://').rstrip('/')
+        return {
+            exchange: (f"{ws_base}/ws/{exchange}", f"{base_url.rstrip('/')}/rest/{exchange}")
+            for exchange in STREAM_ADAPTERS
+        }
+
+    def add_listener(self, callback: Callable[[str, str, str], None]):
+        """(거래소, 코인, 'orderbook' 또는 'ticker') 갱신 알림을 받을 콜백을 등록합니다."""
+        self._listeners.append(callback)
+
+    def start(self):
+        """스트리밍 스레드를 시작합니다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        if self.record_path:
+            self._record_file = open(self.record_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run_loop, name='market-stream', daemon=True)
+        self._thread.start()
+        logger.info(f"Market stream started for {list(self.adapters)} {self.symbols}")
+
+    def stop(self):
+        """스트리밍을 중지하고 스레드가 종료될 때까지 기다립니다."""
+        self._running = False
+        if self._loop:
+            self._loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(self._loop)])
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._record_file:
+            self._record_file.close()
+            self._record_file = None
+        logger.info("Market stream stopped")
+
+    def get_order_book(self, exchange: str, symbol: str, limit: int = 5) -> OrderBook:
+        """동기화된 로컬 호가창을 fetch_order_book 과 같은 OrderBook 으로 반환합니다."""
+        with self._lock:
+            book = self.books.get((exchange, symbol))
+            if not book or not book.synced:
+                return OrderBook(symbol)
+            return book.snapshot(limit)
+
+    def get_ticker(self, exchange: str, symbol: str) -> Dict[str, Any]:
+        """스트림으로 받은 최신 시세를 반환합니다."""
+        with self._lock:
+            return dict(self.tickers.get((exchange, symbol), {'last': 0}))
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*[
+                self._connection_loop(session, adapter) for adapter in self.adapters.values()
+            ])
+
+    async def _connection_loop(self, session: aiohttp.ClientSession, adapter: StreamAdapter):
+        backoff = 1.0
+        while self._running:
+            try:
+                async with session.ws_connect(adapter.ws_url, heartbeat=None) as ws:
+                    logger.info(f"Connected to {adapter.exchange} stream: {adapter.ws_url}")
+                    backoff = 1.0
+                    await self._subscribe(session, adapter, ws)
+                    ping_task = asyncio.ensure_future(self._ping_loop(adapter, ws))
+                    try:
+                        async for message in ws:
+                            if message.type == aiohttp.WSMsgType.TEXT:
+                                await self._handle_message(session, adapter, ws, message.data)
+                            elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                    finally:
+                        ping_task.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{adapter.exchange} stream error: {e}")
+
+            if not self._running:
+                break
+            self.stats[adapter.exchange]['reconnects'] += 1
+            with self._lock:
+                for symbol in self.symbols:
+                    self.books[(adapter.exchange, symbol)].invalidate()
+            logger.info(f"Reconnecting to {adapter.exchange} stream in {backoff:.0f}s...")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _subscribe(self, session: aiohttp.ClientSession, adapter: StreamAdapter, ws):
+        for symbol in self.symbols:
+            for message in adapter.subscribe_messages(symbol):
+                await self._send(ws, message)
+            if adapter.snapshot_url(symbol):
+                asyncio.ensure_future(self._resync(session, adapter, ws, symbol))
+
+    async def _ping_loop(self, adapter: StreamAdapter, ws):
+        while not ws.closed:
+            await asyncio.sleep(adapter.ping_interval)
+            await self._send(ws, adapter.ping_message())
+
+    async def _send(self, ws, message: Any):
+        if isinstance(message, str):
+            await ws.send_str(message)
+        else:
+            await ws.send_str(json.dumps(message))
+
+    async def _resync(self, session: aiohttp.ClientSession, adapter: StreamAdapter, ws, symbol: str):
+        """누락이 감지된 호가창을 스냅샷으로 다시 동기화합니다.
+
+        스냅샷 요청이 실패하거나 받은 스냅샷으로도 동기화되지 않으면 간격을 늘려 가며
+        다시 시도합니다. 동기화 전 델타는 버퍼에만 쌓이므로 여기서 포기하면 연결이
+        끊길 때까지 호가창이 갱신되지 않습니다.
+        """
+        url = adapter.snapshot_url(symbol)
+        if url is None:
+            self.stats[adapter.exchange]['resyncs'] += 1
+            for message in adapter.resubscribe_messages(symbol):
+                await self._send(ws, message)
+            return
+
+        backoff = self.RESYNC_BACKOFF
+        while self._running and not ws.closed:
+            self.stats[adapter.exchange]['resyncs'] += 1
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    payload = await response.json(content_type=None)
+                self._record(adapter.exchange, payload, path=url[len(adapter.rest_url):])
+                bids, asks, sequence, timestamp = adapter.parse_snapshot(payload)
+                with self._lock:
+                    synced = self.books[(adapter.exchange, symbol)].apply_snapshot(bids, asks, sequence, timestamp)
+                if synced:
+                    self._publish(adapter.exchange, symbol, 'orderbook')
+                    return
+                self.stats[adapter.exchange]['gaps'] += 1
+                logger.warning(f"Snapshot for {adapter.exchange} {symbol} did not sync, retrying in {backoff:.1f}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats[adapter.exchange]['resync_failures'] += 1
+                logger.error(f"Failed to resync {adapter.exchange} {symbol}: {e}, retrying in {backoff:.1f}s")
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.RESYNC_MAX_BACKOFF)
+
+    async def _handle_message(self, session: aiohttp.ClientSession, adapter: StreamAdapter, ws, raw: str):
+        self.stats[adapter.exchange]['messages'] += 1
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return  # 'pong' 등 JSON 이 아닌 응답
+        if not isinstance(message, dict):
+            return
+        self._record(adapter.exchange, message)
+
+        for event in adapter.parse(message):
+            key = (adapter.exchange, event['symbol'])
+            if event['type'] == 'ticker':
+                with self._lock:
+                    self.tickers[key] = {
+                        'symbol': event['symbol'],
+                        'last': event['last'],
+                        'bid': event['bid'],
+                        'ask': event['ask'],
+                        'timestamp': event['timestamp']
+                    }
+                self._publish(adapter.exchange, event['symbol'], 'ticker')
+                continue
+
+            with self._lock:
+                book = self.books[key]
+                if event['type'] == 'snapshot':
+                    ok = book.apply_snapshot(event['bids'], event['asks'], event['last'], event['timestamp'])
+                else:
+                    ok = book.apply_delta(event)
+                synced = book.synced
+
+            if not ok:
+                self.stats[adapter.exchange]['gaps'] += 1
+                asyncio.ensure_future(self._resync(session, adapter, ws, event['symbol']))
+            elif synced:
+                self._publish(adapter.exchange, event['symbol'], 'orderbook')
+
+    def _publish(self, exchange: str, symbol: str, kind: str):
+        if self.market_data is not None:
+            orderbook = self.get_order_book(exchange, symbol, self.depth)
+            ticker = self.get_ticker(exchange, symbol)
+            self.market_data.update(exchange, symbol, orderbook, ticker)
+
+        for listener in self._listeners:
+            try:
+                listener(exchange, symbol, kind)
+            except Exception as e:
+                logger.error(f"Market stream listener failed: {e}")
+
+    def _record(self, exchange: str, message: Any, path: Optional[str] = None):
+        """리플레이 서버에서 재생할 수 있도록 수신 메시지를 JSONL 로 기록합니다."""
+        if not self._record_file:
+            return
+        record = {'exchange': exchange, 'ts': time.time(), 'message': message}
+        if path:
+            record['path'] = path
+        self._record_file.write(json.dumps(record) + '\n')
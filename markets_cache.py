@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+import ccxt
+
+logger = logging.getLogger(__name__)
+
+# 저장 형식이 바뀌면 올려서 이전 캐시를 무시하도록 함
+CACHE_VERSION = 1
+
+# 캐시에 보존하는 마켓 필드 (거래소 원본 응답인 'info' 는 제외)
+MARKET_FIELDS = [
+    'id', 'symbol', 'base', 'quote', 'settle', 'baseId', 'quoteId', 'settleId',
+    'type', 'spot', 'margin', 'swap', 'future', 'option', 'active', 'contract',
+    'linear', 'inverse', 'contractSize', 'expiry', 'expiryDatetime', 'strike',
+    'optionType', 'taker', 'maker', 'percentage', 'tierBased', 'feeSide',
+    'precision', 'limits', 'created', 'subType'
+]
+
+
+class MarketsCache:
+    """ccxt 마켓 메타데이터(심볼, 정밀도, 한도, 계약 크기)의 로컬 파일 캐시
+
+    거래소별로 gzip 압축 JSON 파일 하나에 저장하며, 캐시가 있으면 load_markets()
+    대신 set_markets() 로 즉시 적용합니다. TTL 이 지나면 백그라운드에서 다시
+    받아 변경 여부를 확인하고 파일을 갱신합니다.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = 6 * 3600):
+        self.cache_dir = cache_dir or os.environ.get('MARKETS_CACHE_DIR', '.cache/markets')
+        self.ttl = ttl
+        self._clients: Dict[str, Any] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """백그라운드 갱신에서 마켓 정보가 바뀌면 (거래소 id, 클라이언트)로 호출될 콜백을 등록합니다."""
+        self._listeners.append(callback)
+
+    def path(self, exchange_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{exchange_id}.json.gz")
+
+    @staticmethod
+    def compact(markets: Dict[str, Any]) -> Dict[str, Any]:
+        """마켓 정보에서 필요한 필드만 남깁니다."""
+        return {
+            symbol: {field: market.get(field) for field in MARKET_FIELDS if field in market}
+            for symbol, market in markets.items()
+        }
+
+    @staticmethod
+    def fingerprint(markets: Dict[str, Any]) -> str:
+        """마켓 정보 변경 감지용 해시"""
+        payload = json.dumps(markets, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def load(self, exchange_id: str) -> Optional[Dict[str, Any]]:
+        """캐시 파일을 읽습니다. 없거나 버전이 맞지 않으면 None 을 반환합니다."""
+        path = self.path(exchange_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('version') != CACHE_VERSION or entry.get('exchange') != exchange_id:
+                logger.info(f"Ignoring {exchange_id} markets cache with incompatible version")
+                return None
+            return entry
+        except Exception as e:
+            logger.error(f"Failed to read {exchange_id} markets cache: {e}")
+            return None
+
+    def save(self, exchange_id: str, markets: Dict[str, Any]) -> Dict[str, Any]:
+        """마켓 정보를 압축 저장하고 저장한 항목을 반환합니다."""
+        compacted = self.compact(markets)
+        entry = {
+            'version': CACHE_VERSION,
+            'exchange': exchange_id,
+            'ccxt_version': ccxt.__version__,
+            'saved_at': time.time(),
+            'fingerprint': self.fingerprint(compacted),
+            'markets': compacted
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.path(exchange_id) + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, separators=(',', ':'), default=str)
+        os.replace(tmp_path, self.path(exchange_id))
+        return entry
+
+    def age(self, entry: Optional[Dict[str, Any]]) -> float:
+        """캐시 항목의 경과 시간(초). 다른 ccxt 버전으로 저장했으면 바로 갱신하도록 TTL 로 봅니다.
+
+        ccxt 버전마다 마켓 파싱 결과(정밀도 방식, 계약 크기 등)가 달라질 수 있기 때문입니다.
+        """
+        if not entry or entry.get('ccxt_version') != ccxt.__version__:
+            return self.ttl
+        return time.time() - entry.get('saved_at', 0)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.age(entry) < self.ttl
+
+    def warm_start(self, client, exchange_id: str) -> bool:
+        """캐시가 있으면 클라이언트에 바로 적용하고, 없으면 load_markets() 후 저장합니다.
+
+        캐시를 사용했으면 True 를 반환합니다. 캐시가 만료되었어도 우선 사용하고
+        백그라운드 갱신에서 새로 받습니다.
+        """
+        start_time = time.time()
+
+        entry = self.load(exchange_id)
+        if entry:
+            client.set_markets(entry['markets'])
+            self._register(exchange_id, client)
+            logger.info(f"Loaded {len(entry['markets'])} {exchange_id} markets from cache "
+                        f"in {(time.time() - start_time)*1000:.2f}ms"
+                        f"{'' if self.is_fresh(entry) else ' (expired, refresh scheduled)'}")
+            return True
+
+        client.load_markets()
+        self.save(exchange_id, client.markets)
+        self._register(exchange_id, client)
+        logger.info(f"Loaded {len(client.markets)} {exchange_id} markets from exchange "
+                    f"in {(time.time() - start_time)*1000:.2f}ms and saved to cache")
+        return False
+
+    def _register(self, exchange_id: str, client):
+        self._clients[exchange_id] = client
+        self._wakeup.set()  # 백그라운드 갱신 주기를 다시 계산
+
+    def refresh(self, exchange_id: str) -> bool:
+        """거래소에서 마켓 정보를 다시 받아 저장합니다. 변경이 있었으면 True 를 반환합니다."""
+        client = self._clients[exchange_id]
+        previous = self.load(exchange_id)
+        client.load_markets(reload=True)
+        entry = self.save(exchange_id, client.markets)
+
+        changed = previous is None or previous['fingerprint'] != entry['fingerprint']
+        if changed:
+            added = set(entry['markets']) - set(previous['markets'] if previous else {})
+            removed = set(previous['markets'] if previous else {}) - set(entry['markets'])
+            logger.info(f"{exchange_id} markets changed: {len(added)} added, {len(removed)} removed")
+            for listener in self._listeners:
+                try:
+                    listener(exchange_id, client)
+                except Exception as e:
+                    logger.error(f"Markets change listener failed for {exchange_id}: {e}")
+        else:
+            logger.debug(f"{exchange_id} markets unchanged")
+        return changed
+
+    def start_background_refresh(self):
+        """warm_start 로 등록된 거래소들의 마켓 정보를 TTL 주기로 갱신합니다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='markets-cache-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.clear()
+            next_refresh = self.ttl
+            for exchange_id in list(self._clients):
+                age = self.age(self.load(exchange_id))
+                if age >= self.ttl:
+                    try:
+                        self.refresh(exchange_id)
+                        age = 0
+                    except Exception as e:
+                        logger.error(f"Failed to refresh {exchange_id} markets: {e}")
+                        age = self.ttl - 60  # 1분 후 재시도
+                next_refresh = min(next_refresh, self.ttl - age)
+            self._wakeup.wait(max(next_refresh, 1))
@@ -0,0 +1,236 @@
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 지연시간 히스토그램 구간 상한 (ms). Prometheus 출력은 초 단위로 변환합니다.
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 대시보드용 최근 요청 기록 (거래소/엔드포인트별 최대 개수)
+RECENT_SAMPLES = 2048
+
+
+class LatencyHistogram:
+    """누적 지연시간 히스토그램 (Prometheus histogram 과 같은 구간 구조)"""
+
+    __slots__ = ('counts', 'total_ms', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # 마지막 칸은 +Inf
+        self.total_ms = 0.0
+        self.count = 0
+
+    def observe(self, latency_ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.total_ms += latency_ms
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """구간 안에서 선형 보간한 분위수 추정값 (ms)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0.0
+                if index >= len(LATENCY_BUCKETS_MS):
+                    return float(lower)
+                upper = LATENCY_BUCKETS_MS[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return float(LATENCY_BUCKETS_MS[-1])
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: str) -> str:
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class ExchangeMetrics:
+    """거래소 API 호출의 지연시간, 오류, 응답 크기를 모으는 메트릭 저장소
+
+    measure() 블록 하나가 호출 하나이며 (거래소, 엔드포인트) 별 누적
+    히스토그램과 (거래소, 엔드포인트, 코인, 결과) 별 건수, 오류 종류별 건수,
+    응답 바이트 수를 기록합니다. install() 한 ccxt 클라이언트는 응답 본문
+    크기와 요청 한도(throttle) 대기 시간을 현재 스레드의 measure() 블록에
+    더하며, 대기 시간은 지연시간에서 빼고 별도 히스토그램에 기록합니다. 대시보드용으로 최근
+    요청을 따로 보관해 window 초 동안의 p50/p99 를 계산합니다.
+    """
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self.started_at = time.time()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._queue_histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._requests: Dict[Tuple[str, str, str, str], int] = {}
+        self._errors: Dict[Tuple[str, str, str], int] = {}
+        self._bytes: Dict[Tuple[str, str], int] = {}
+        self._recent: Dict[Tuple[str, str], deque] = {}
+        self._last_error: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---- 수집 ----
+
+    def install(self, client, exchange: str):
+        """ccxt 클라이언트의 REST 응답 본문 크기와 throttle 대기 시간을 measure() 블록에 기록하도록 연결합니다.
+
+        요청 한도 스케줄러(RateLimitScheduler.install)를 먼저 설치해야 그 대기 시간이 포함됩니다.
+        """
+        original = client.on_rest_response
+        original_throttle = client.throttle
+
+        def on_rest_response(code, reason, url, method, response_headers, response_body, request_headers, request_body):
+            call = getattr(self._local, 'call', None)
+            if call is not None and response_body:
+                call['bytes'] += len(response_body)
+            return original(code, reason, url, method, response_headers, response_body, request_headers, request_body)
+
+        def throttle(cost=None):
+            started = time.perf_counter()
+            try:
+                return original_throttle(cost)
+            finally:
+                call = getattr(self._local, 'call', None)
+                if call is not None:
+                    call['queue_ms'] += (time.perf_counter() - started) * 1000
+
+        client.on_rest_response = on_rest_response
+        client.throttle = throttle
+
+    @contextmanager
+    def measure(self, exchange: str, endpoint: str, symbol: str = ''):
+        """블록 실행 시간을 한 번의 API 호출로 기록합니다. 예외는 오류 종류로 기록한 뒤 다시 발생시킵니다.
+
+        요청 한도 대기 시간은 지연시간에서 빼고 queue_ms 로 따로 기록합니다.
+        """
+        call = {'bytes': 0, 'queue_ms': 0.0}
+        previous = getattr(self._local, 'call', None)
+        self._local.call = call
+        started = time.perf_counter()
+        error = None
+        try:
+            yield call
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._local.call = previous
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.record(exchange, endpoint, symbol, max(0.0, elapsed_ms - call['queue_ms']), error, call['bytes'],
+                        call['queue_ms'])
+
+    def record(self, exchange: str, endpoint: str, symbol: str, latency_ms: float,
+               error: Optional[str] = None, payload_bytes: int = 0, queue_ms: float = 0.0):
+        key = (exchange, endpoint)
+        status = 'error' if error else 'ok'
+        now = time.time()
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+                self._queue_histograms[key] = LatencyHistogram()
+                self._recent[key] = deque(maxlen=RECENT_SAMPLES)
+            histogram.observe(latency_ms)
+            self._queue_histograms[key].observe(queue_ms)
+            request_key = (exchange, endpoint, symbol, status)
+            self._requests[request_key] = self._requests.get(request_key, 0) + 1
+            self._bytes[key] = self._bytes.get(key, 0) + payload_bytes
+            if error:
+                error_key = (exchange, endpoint, error)
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+                self._last_error[key] = {'error': error, 'symbol': symbol, 'at': now}
+            self._recent[key].append((now, latency_ms, bool(error), payload_bytes, queue_ms))
+
+    # ---- 출력 ----
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition 형식 (version 0.0.4)"""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.total_ms, h.count) for key, h in self._histograms.items()}
+            queue_histograms = {key: (list(h.counts), h.total_ms, h.count)
+                                for key, h in self._queue_histograms.items()}
+            requests = dict(self._requests)
+            errors = dict(self._errors)
+            payload = dict(self._bytes)
+
+        lines = []
+        for name, description, values in (
+                ('exchange_request_duration_seconds', 'Exchange API call latency, excluding rate limit wait.',
+                 histograms),
+                ('exchange_rate_limit_wait_seconds', 'Time exchange API calls waited for the rate limiter.',
+                 queue_histograms)):
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+            for (exchange, endpoint), (counts, total_ms, count) in sorted(values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(list(LATENCY_BUCKETS_MS) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    le = bound if bound == '+Inf' else f"{bound / 1000:g}"
+                    lines.append(f'{name}_bucket{{{_labels(exchange=exchange, endpoint=endpoint, le=le)}}} {cumulative}')
+                labels = _labels(exchange=exchange, endpoint=endpoint)
+                lines.append(f'{name}_sum{{{labels}}} {total_ms / 1000:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {count}')
+
+        lines += ['# HELP exchange_requests_total Exchange API calls by symbol and status.',
+                  '# TYPE exchange_requests_total counter']
+        for (exchange, endpoint, symbol, status), count in sorted(requests.items()):
+            lines.append(f'exchange_requests_total{{'
+                         f'{_labels(exchange=exchange, endpoint=endpoint, symbol=symbol, status=status)}}} {count}')
+
+        lines += ['# HELP exchange_request_errors_total Exchange API errors by exception class.',
+                  '# TYPE exchange_request_errors_total counter']
+        for (exchange, endpoint, error), count in sorted(errors.items()):
+            lines.append(f'exchange_request_errors_total{{'
+                         f'{_labels(exchange=exchange, endpoint=endpoint, error=error)}}} {count}')
+
+        lines += ['# HELP exchange_response_bytes_total Exchange API response body size.',
+                  '# TYPE exchange_response_bytes_total counter']
+        for (exchange, endpoint), count in sorted(payload.items()):
+            lines.append(f'exchange_response_bytes_total{{{_labels(exchange=exchange, endpoint=endpoint)}}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, window: Optional[float] = None) -> List[Dict[str, Any]]:
+        """최근 window 초 동안의 (거래소, 엔드포인트) 별 요청 수, 오류 수, p50/p99 지연시간 (대시보드용)"""
+        window = window or self.window
+        since = time.time() - window
+        with self._lock:
+            recent = {key: [sample for sample in samples if sample[0] >= since]
+                      for key, samples in self._recent.items()}
+            totals = {key: (h.quantile(0.5), h.quantile(0.99), h.count) for key, h in self._histograms.items()}
+            last_errors = dict(self._last_error)
+
+        rows = []
+        for (exchange, endpoint), samples in sorted(recent.items()):
+            latencies = np.array([sample[1] for sample in samples])
+            queue = np.array([sample[4] for sample in samples])
+            p50_total, p99_total, count_total = totals[(exchange, endpoint)]
+            rows.append({
+                'exchange': exchange,
+                'endpoint': endpoint,
+                'requests': len(samples),
+                'rate_per_s': len(samples) / window,
+                'errors': sum(1 for sample in samples if sample[2]),
+                'bytes': sum(sample[3] for sample in samples),
+                'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+                'max_ms': float(latencies.max()) if len(latencies) else None,
+                'queue_p50_ms': float(np.percentile(queue, 50)) if len(queue) else None,
+                'queue_p99_ms': float(np.percentile(queue, 99)) if len(queue) else None,
+                'total_requests': count_total,
+                'total_p50_ms': p50_total,
+                'total_p99_ms': p99_total,
+                'last_error': last_errors.get((exchange, endpoint))
+            })
+        return rows
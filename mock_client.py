@@ -0,0 +1,31 @@
+# 로컬 가상 거래소(mock_exchange_server.py)에 클라이언트를 연결하는 도우미.
+# 서버 모듈과 달리 aiohttp 없이 import 할 수 있어 TradingExecutor 시작 시 항상 불러옵니다.
+
+
+def venue_url(base_url: str, exchange: str) -> str:
+    """mock 서버에서 거래소 REST API 가 시작되는 주소"""
+    return f"{base_url.rstrip('/')}/rest/{exchange}"
+
+
+def point_client(client, exchange: str, base_url: str):
+    """ccxt 클라이언트의 API 주소를 mock 서버로 바꾸고 흉내 내는 마켓만 받도록 설정합니다."""
+    rest_url = venue_url(base_url, exchange)
+    urls = client.urls['api']
+    if exchange == 'mexc':
+        urls['spot'] = {'public': rest_url, 'private': rest_url}
+        urls['contract'] = {'public': f"{rest_url}/api/v1/contract", 'private': f"{rest_url}/api/v1/private"}
+    elif exchange == 'bitget':
+        for key, url in urls.items():
+            if isinstance(url, str):
+                urls[key] = rest_url
+        client.options['fetchMarkets'] = {'types': ['swap']}
+    else:
+        for key, url in urls.items():
+            if isinstance(url, dict):
+                urls[key] = {section: f"{rest_url}/api/v4" for section in url}
+        client.options['fetchMarkets'] = {'types': ['spot', 'swap']}
+    client.has['fetchCurrencies'] = False
+    # 서명은 검사하지 않으므로 키가 없으면 임의 값으로 채움 (ccxt 의 키 확인 통과용)
+    client.apiKey = client.apiKey or 'mock'
+    client.secret = client.secret or 'mock'
+    client.password = client.password or 'mock'
@@ -0,0 +1,1159 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+from aiohttp import web, WSMsgType
+
+from market_data import DEFAULT_SYMBOLS
+from mock_client import venue_url, point_client  # point_client 는 기존 import 경로 호환용
+
+logger = logging.getLogger(__name__)
+
+EXCHANGES = ('mexc', 'bitget', 'gateio')
+
+# 시뮬레이션 기본 설정 (거래소별로 configure() 나 /control/<거래소> 로 바꿀 수 있음)
+DEFAULT_VENUE_CONFIG = {
+    'latency': 0.0,       # REST 응답과 WebSocket 푸시 지연 (초)
+    'jitter': 0.0,        # 지연의 표준편차 (초)
+    'error_rate': 0.0,    # REST 요청이 5xx 로 실패할 확률
+    'reject_rate': 0.0,   # 주문이 거래소 오류 코드로 거부될 확률
+    'max_rps': 0.0,       # 초당 REST 요청 한도 (넘으면 429, 0 이면 무제한)
+    'fill_ratio': 1.0,    # 시장가 주문이 가져갈 수 있는 호가 잔량 비율 (1 미만이면 부분 체결이 잦아짐)
+    'ws_drop_rate': 0.0,  # 호가 델타를 보내지 않고 버릴 확률 (일련번호 누락 재동기화 시험용)
+    'taker_fee': 0.0005,
+    'basis_bps': 5.0       # 거래소간 가격차의 표준편차 (bp)
+}
+
+INITIAL_BALANCE = 10000.0
+
+# 틱마다 잔량을 새로 정하는 호가 단계 수 (면당)
+REQUOTES_PER_TICK = 2
+
+
+def _price_str(price: float) -> str:
+    return ('%.10f' % price).rstrip('0').rstrip('.')
+
+
+class SimulatedBook:
+    """한 거래소/코인의 가상 호가창
+
+    가격은 tick 정수 단위로 보관하고, 중간가가 움직이거나 주문이 잔량을 가져갈
+    때마다 version 을 올리고 바뀐 단계를 델타로 쌓아 둡니다 (drain() 으로 꺼냄).
+    따라서 어떤 version 의 REST 스냅샷에 이후 델타를 차례로 적용하면 현재
+    호가창과 같습니다. 잔량은 거래소 주문 단위 (MEXC/Gate.io 계약 수, Bitget 코인 수) 입니다.
+    """
+
+    def __init__(self, market_id: str, mid: float, contract_size: float, depth: int, rng: random.Random):
+        self.market_id = market_id
+        self.contract_size = contract_size
+        self.depth = depth
+        self.tick = 10 ** math.floor(math.log10(mid * 2e-4))  # 가격의 0.2~2bp
+        self.rng = rng
+        self.mid = mid
+        self.last = mid
+        self.version = 1
+        self.updated_at = time.time()
+        self.bids: Dict[int, float] = {}
+        self.asks: Dict[int, float] = {}
+        self._base_size = max(1.0, round(2000 / (mid * contract_size)))
+        self._deltas: List[Tuple[int, int, List[List[float]], List[List[float]]]] = []
+        self._rebuild()
+
+    def price(self, ticks: int) -> float:
+        return round(ticks * self.tick, 10)
+
+    def _size(self) -> float:
+        return float(max(1, round(self._base_size * self.rng.lognormvariate(0, 0.6))))
+
+    def _rebuild(self) -> Tuple[List[List[float]], List[List[float]]]:
+        best_bid = math.floor(self.mid / self.tick - 0.5)
+        best_ask = max(best_bid + 1, math.ceil(self.mid / self.tick + 0.5))
+        return (self._move(self.bids, range(best_bid - self.depth + 1, best_bid + 1)),
+                self._move(self.asks, range(best_ask, best_ask + self.depth)))
+
+    def _move(self, side: Dict[int, float], ticks: range) -> List[List[float]]:
+        """side 를 ticks 구간으로 옮기고 바뀐 단계를 반환합니다.
+
+        구간을 벗어난 단계는 지우고, 비어 있는 단계(새 구간, 체결로 빠진 단계)는
+        새 잔량으로 채우며, 그 밖에 REQUOTES_PER_TICK 개 단계만 잔량을 바꿉니다.
+        """
+        changes: Dict[int, float] = {}
+        for tick in [tick for tick in side if tick not in ticks]:
+            del side[tick]
+            changes[tick] = 0.0
+        for tick in ticks:
+            if tick not in side:
+                side[tick] = changes[tick] = self._size()
+        if len(changes) < len(ticks):
+            for _ in range(REQUOTES_PER_TICK):
+                tick = ticks[self.rng.randrange(len(ticks))]
+                side[tick] = changes[tick] = self._size()
+        return [[self.price(tick), size] for tick, size in changes.items()]
+
+    def _publish(self, bids: List[List[float]], asks: List[List[float]]):
+        self.version += 1
+        self.updated_at = time.time()
+        self._deltas.append((self.version, int(self.updated_at * 1000), bids, asks))
+
+    def step(self, mid: float):
+        """중간가를 옮기고 바뀐 단계를 델타로 쌓습니다. 잔량 0 은 삭제입니다."""
+        self.mid = mid
+        self._publish(*self._rebuild())
+
+    def drain(self) -> List[Tuple[int, int, List[List[float]], List[List[float]]]]:
+        """쌓인 (version, 시각 ms, bids, asks) 델타를 꺼냅니다."""
+        deltas, self._deltas = self._deltas, []
+        return deltas
+
+    def levels(self, side: str, limit: Optional[int] = None) -> List[List[float]]:
+        book = self.bids if side == 'bids' else self.asks
+        ticks = sorted(book, reverse=side == 'bids')[:limit or self.depth]
+        return [[self.price(tick), book[tick]] for tick in ticks]
+
+    def best(self) -> Tuple[float, float]:
+        return self.price(max(self.bids)), self.price(min(self.asks))
+
+    def match(self, side: str, amount: float, fill_ratio: float) -> Tuple[float, float]:
+        """시장가 주문을 반대편 호가부터 체결하고 (체결 수량, 평균가) 를 반환합니다 (남은 수량은 취소, IOC).
+
+        가져간 잔량은 호가창에서 빠지고 델타로 쌓입니다.
+        """
+        book = self.asks if side == 'buy' else self.bids
+        remaining, filled, cost = amount, 0.0, 0.0
+        changes = []
+        for tick in sorted(book, reverse=side == 'sell'):
+            if remaining <= 0:
+                break
+            take = min(remaining, book[tick] * fill_ratio)
+            if take <= 0:
+                continue
+            size = round(book[tick] - take, 8)
+            if size > 0:
+                book[tick] = size
+            else:
+                del book[tick]
+            changes.append([self.price(tick), max(size, 0.0)])
+            remaining -= take
+            filled += take
+            cost += take * self.price(tick)
+        if not filled:
+            return 0.0, 0.0
+        self._publish(changes if side == 'sell' else [], changes if side == 'buy' else [])
+        self.last = cost / filled
+        return filled, self.last
+
+
+class SimulatedAccount:
+    """한 거래소의 가상 USDT 선물 계정 (교차 마진, 단방향 포지션)"""
+
+    def __init__(self, balance: float = INITIAL_BALANCE):
+        self.balance = balance  # 실현 손익과 수수료를 반영한 지갑 잔액
+        self.positions: Dict[str, List[float]] = {}  # 마켓 id -> [계약 수(롱 +), 평균 단가]
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.leverage: Dict[str, int] = {}
+
+    def apply(self, book: SimulatedBook, side: str, filled: float, price: float, fee_rate: float) -> float:
+        """체결을 포지션/잔액에 반영하고 수수료(USDT)를 반환합니다."""
+        quantity = filled if side == 'buy' else -filled
+        position = self.positions.setdefault(book.market_id, [0.0, 0.0])
+        held, average = position
+        if held and (held > 0) != (quantity > 0):
+            closed = min(abs(quantity), abs(held))
+            self.balance += closed * book.contract_size * (price - average) * (1 if held > 0 else -1)
+            if abs(quantity) > abs(held):
+                position[1] = price
+        else:
+            position[1] = (held * average + quantity * price) / (held + quantity)
+        position[0] = round(held + quantity, 8)
+        if not position[0]:
+            del self.positions[book.market_id]
+        fee = filled * book.contract_size * price * fee_rate
+        self.balance -= fee
+        return fee
+
+    def unrealized(self, books: Dict[str, SimulatedBook]) -> float:
+        return sum(contracts * books[market_id].contract_size * (books[market_id].mid - entry)
+                   for market_id, (contracts, entry) in self.positions.items() if market_id in books)
+
+    def margin(self, books: Dict[str, SimulatedBook]) -> float:
+        return sum(abs(contracts) * books[market_id].contract_size * books[market_id].mid / self.leverage.get(market_id, 1)
+                   for market_id, (contracts, _) in self.positions.items() if market_id in books)
+
+
+class MockExchangeServer:
+    """MEXC 선물, Bitget mix, Gate.io 선물 API 를 흉내 내는 로컬 가상 거래소
+
+    코인별 공통 중간가를 무작위 보행으로 움직이고 거래소마다 작은 가격차(basis)를
+    더해 호가창을 만듭니다. REST 는 /rest/<거래소>/<원래 경로>, WebSocket 은
+    /ws/<거래소> 로 제공하므로 ws_replay_server 와 같은 방식으로 MarketStream,
+    주문 게이트웨이, ccxt 클라이언트(point_client) 를 연결할 수 있습니다.
+    시세, 호가, 시장가 주문(호가를 따라 체결, IOC), 포지션, 잔액을 지원하며
+    거래소별로 지연, 지터, 오류/거부 확률, 요청 한도, 체결 비율을 설정합니다.
+    서명은 검사하지 않습니다.
+    """
+
+    def __init__(self, symbols: Optional[List[str]] = None, depth: int = 20, tick_interval: float = 0.1,
+                 volatility: float = 0.00005, seed: Optional[int] = None, **config):
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.depth = depth
+        self.tick_interval = tick_interval
+        self.volatility = volatility  # 틱당 중간가 변동 (비율 표준편차)
+        self.rng = random.Random(seed)
+        self.config = {exchange: {**DEFAULT_VENUE_CONFIG, **config} for exchange in EXCHANGES}
+
+        self._mids: Dict[str, float] = {}
+        self._basis: Dict[Tuple[str, str], float] = {}
+        self.books: Dict[str, Dict[str, SimulatedBook]] = {exchange: {} for exchange in EXCHANGES}
+        self.accounts = {exchange: SimulatedAccount() for exchange in EXCHANGES}
+        for symbol in self.symbols:
+            self.add_symbol(symbol)
+
+        self.stats = {exchange: {'requests': 0, 'errors': 0, 'rate_limited': 0, 'orders': 0, 'rejects': 0,
+                                 'ws_messages': 0, 'ws_dropped': 0}
+                      for exchange in EXCHANGES}
+        self._order_ids = itertools.count(int(time.time() * 1000))
+        self._request_times: Dict[str, deque] = {exchange: deque() for exchange in EXCHANGES}
+        self._subscribers: Dict[str, Dict[web.WebSocketResponse, set]] = {exchange: {} for exchange in EXCHANGES}
+        self._runner: Optional[web.AppRunner] = None
+        self._ticker_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._url = ''
+
+        self.app = web.Application()
+        self.app.router.add_get('/ws/{exchange}', self._handle_ws)
+        self.app.router.add_route('*', '/rest/{exchange}/{path:.*}', self._handle_rest)
+        self.app.router.add_route('*', '/control/{exchange}', self._handle_control)
+
+        self.routes = {
+            'mexc': {
+                ('GET', 'api/v1/contract/ping'): self._mexc_ping,
+                ('GET', 'api/v3/exchangeInfo'): self._mexc_spot_info,
+                ('GET', 'api/v3/ticker/24hr'): self._mexc_spot_ticker,
+                ('GET', 'api/v1/contract/detail'): self._mexc_detail,
+                ('GET', 'api/v1/contract/ticker'): self._mexc_ticker,
+                ('GET', 'api/v1/contract/depth'): self._mexc_depth,
+                ('POST', 'api/v1/private/order/submit'): self._mexc_order,
+                ('POST', 'api/v1/private/order/create'): self._mexc_order,
+                ('GET', 'api/v1/private/order/get'): self._mexc_get_order,
+                ('GET', 'api/v1/private/position/open_positions'): self._mexc_positions,
+                ('GET', 'api/v1/private/account/assets'): self._mexc_assets,
+                ('POST', 'api/v1/private/position/change_leverage'): self._mexc_leverage
+            },
+            'bitget': {
+                ('GET', 'api/v2/public/time'): self._bitget_time,
+                ('GET', 'api/v2/mix/market/contracts'): self._bitget_contracts,
+                ('GET', 'api/v2/mix/market/ticker'): self._bitget_ticker,
+                ('GET', 'api/v2/mix/market/tickers'): self._bitget_ticker,
+                ('GET', 'api/v2/mix/market/merge-depth'): self._bitget_depth,
+                ('GET', 'api/v2/mix/market/orderbook'): self._bitget_depth,
+                ('POST', 'api/v2/mix/order/place-order'): self._bitget_order,
+                ('GET', 'api/v2/mix/order/detail'): self._bitget_get_order,
+                ('GET', 'api/v2/mix/position/all-position'): self._bitget_positions,
+                ('GET', 'api/v2/mix/position/single-position'): self._bitget_positions,
+                ('GET', 'api/v2/mix/account/accounts'): self._bitget_accounts,
+                ('POST', 'api/v2/mix/account/set-leverage'): self._bitget_leverage,
+                ('POST', 'api/v2/mix/account/set-margin-mode'): self._bitget_leverage
+            },
+            'gateio': {
+                ('GET', 'api/v4/spot/time'): self._gateio_time,
+                ('GET', 'api/v4/spot/currency_pairs'): self._gateio_spot_pairs,
+                ('GET', 'api/v4/spot/tickers'): self._gateio_spot_tickers,
+                ('GET', 'api/v4/margin/currency_pairs'): self._gateio_empty,
+                ('GET', 'api/v4/futures/usdt/contracts'): self._gateio_contracts,
+                ('GET', 'api/v4/futures/btc/contracts'): self._gateio_empty,
+                ('GET', 'api/v4/futures/usdt/tickers'): self._gateio_tickers,
+                ('GET', 'api/v4/futures/usdt/order_book'): self._gateio_depth,
+                ('POST', 'api/v4/futures/usdt/orders'): self._gateio_order,
+                ('GET', 'api/v4/futures/usdt/orders'): self._gateio_get_order,
+                ('GET', 'api/v4/futures/usdt/positions'): self._gateio_positions,
+                ('POST', 'api/v4/futures/usdt/positions'): self._gateio_leverage,
+                ('GET', 'api/v4/futures/usdt/accounts'): self._gateio_accounts,
+                ('POST', 'api/v4/futures/usdt/dual_mode'): self._gateio_leverage,
+                ('GET', 'api/v4/delivery/usdt/positions'): self._gateio_empty,
+                ('GET', 'api/v4/delivery/btc/positions'): self._gateio_empty
+            }
+        }
+
+    # ---- 시장 ----
+
+    @staticmethod
+    def market_id(exchange: str, symbol: str) -> str:
+        base = symbol.split('/')[0]
+        return f"{base}USDT" if exchange == 'bitget' else f"{base}_USDT"
+
+    def add_symbol(self, symbol: str, price: Optional[float] = None):
+        """코인을 추가합니다. 가격을 주지 않으면 코인 이름으로 정한 무작위 가격을 사용합니다."""
+        mid = price or round(random.Random(symbol).lognormvariate(0, 2.5), 6) or 1.0
+        self._mids[symbol] = mid
+        for exchange in EXCHANGES:
+            self._basis[(exchange, symbol)] = 0.0
+            # MEXC/Gate.io 는 계약 1개가 1 USDT 이상이 되도록 계약 크기를 정하고 Bitget 은 코인 단위
+            contract_size = 1.0 if exchange == 'bitget' else float(10 ** max(0, math.ceil(-math.log10(mid))))
+            market_id = self.market_id(exchange, symbol)
+            self.books[exchange][market_id] = SimulatedBook(market_id, mid, contract_size, self.depth, self.rng)
+
+    def symbol_of(self, exchange: str, market_id: str) -> Optional[str]:
+        book = self.books[exchange].get(market_id)
+        if book is None:
+            return None
+        return market_id.replace('_', '/') if exchange != 'bitget' else f"{market_id[:-4]}/USDT"
+
+    def configure(self, exchange: Optional[str] = None, **config):
+        """거래소(생략하면 전체)의 지연/오류/체결 설정을 바꿉니다."""
+        for name in ([exchange] if exchange else EXCHANGES):
+            unknown = set(config) - set(DEFAULT_VENUE_CONFIG)
+            if unknown:
+                raise ValueError(f"Unknown mock exchange settings: {', '.join(sorted(unknown))}")
+            self.config[name].update({key: float(value) for key, value in config.items()})
+
+    def tick(self) -> Dict[str, List[Tuple[SimulatedBook, List]]]:
+        """모든 코인의 중간가를 한 단계 움직이고 거래소별 (호가창, 쌓인 델타) 목록을 반환합니다."""
+        updates: Dict[str, List[Tuple[SimulatedBook, List]]] = {exchange: [] for exchange in EXCHANGES}
+        for symbol, mid in self._mids.items():
+            mid = self._mids[symbol] = mid * math.exp(self.rng.gauss(0, self.volatility))
+            for exchange in EXCHANGES:
+                basis = self._basis[(exchange, symbol)]
+                # 평균으로 천천히 돌아가는 가격차 (표준편차 basis_bps, 가끔 차익 기회가 생기도록)
+                basis += -0.01 * basis + self.rng.gauss(0, self.config[exchange]['basis_bps'] * 1e-4 * 0.14)
+                self._basis[(exchange, symbol)] = basis
+                book = self.books[exchange][self.market_id(exchange, symbol)]
+                book.step(mid * (1 + basis))
+                updates[exchange].append((book, book.drain()))
+        return updates
+
+    async def _run_ticker(self):
+        while True:
+            started = time.monotonic()
+            try:
+                updates = self.tick()
+                await asyncio.gather(*(self._broadcast(exchange, updates[exchange]) for exchange in EXCHANGES))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Mock exchange tick failed: {e}")
+            await asyncio.sleep(max(0.0, self.tick_interval - (time.monotonic() - started)))
+
+    # ---- 공통 처리 ----
+
+    def _delay(self, exchange: str) -> float:
+        config = self.config[exchange]
+        if not config['latency'] and not config['jitter']:
+            return 0.0
+        return max(0.0, self.rng.gauss(config['latency'], config['jitter']))
+
+    def _rate_limited(self, exchange: str) -> bool:
+        max_rps = self.config[exchange]['max_rps']
+        if not max_rps:
+            return False
+        now = time.monotonic()
+        times = self._request_times[exchange]
+        while times and times[0] < now - 1.0:
+            times.popleft()
+        if len(times) >= max_rps:
+            return True
+        times.append(now)
+        return False
+
+    def _error(self, exchange: str, status: int, message: str) -> web.Response:
+        if exchange == 'mexc':
+            body = {'success': False, 'code': 9999 if status >= 500 else 510, 'message': message}
+            status = 200 if status < 500 else status  # MEXC 는 업무 오류도 200 으로 응답
+        elif exchange == 'bitget':
+            body = {'code': '40000' if status < 500 else '50000', 'msg': message, 'requestTime': int(time.time() * 1000),
+                    'data': None}
+            if status == 429:
+                body['code'] = '429'
+        else:
+            body = {'label': 'TOO_MANY_REQUESTS' if status == 429 else 'SERVER_ERROR' if status >= 500
+                    else 'INVALID_PARAM_VALUE', 'message': message}
+        return web.json_response(body, status=status)
+
+    async def _handle_rest(self, request: web.Request) -> web.Response:
+        exchange = request.match_info['exchange']
+        if exchange not in self.routes:
+            return web.json_response({'message': f"unknown exchange {exchange}"}, status=404)
+        stats = self.stats[exchange]
+        stats['requests'] += 1
+
+        delay = self._delay(exchange)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._rate_limited(exchange):
+            stats['rate_limited'] += 1
+            return self._error(exchange, 429, 'Too many requests')
+        if self.config[exchange]['error_rate'] and self.rng.random() < self.config[exchange]['error_rate']:
+            stats['errors'] += 1
+            return self._error(exchange, 503, 'Service unavailable')
+
+        path = request.match_info['path'].strip('/')
+        handler, argument = self._route(exchange, request.method, path)
+        if handler is None:
+            return self._error(exchange, 404, f"{request.method} /{path} is not simulated")
+
+        body = await request.read()
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = dict(await request.post()) if request.content_type.endswith('urlencoded') else {}
+        params = {**request.query, **payload} if isinstance(payload, dict) else dict(request.query)
+        try:
+            return handler(params, argument)
+        except (KeyError, ValueError, TypeError) as e:
+            return self._error(exchange, 400, f"invalid request: {e}")
+
+    def _route(self, exchange: str, method: str, path: str):
+        routes = self.routes[exchange]
+        handler = routes.get((method, path))
+        if handler:
+            return handler, None
+        # 경로 끝에 마켓 id / 주문 id 가 붙는 엔드포인트 (예: depth/XRP_USDT, orders/123)
+        prefix, _, argument = path.rpartition('/')
+        handler = routes.get((method, prefix))
+        if handler:
+            return handler, argument
+        # Gate.io: positions/<contract>/leverage
+        parts = path.split('/')
+        if len(parts) > 2:
+            handler = routes.get((method, '/'.join(parts[:-2])))
+            if handler:
+                return handler, parts[-2]
+        return None, None
+
+    def _submit(self, exchange: str, market_id: str, side: str, amount: float, reduce_only: bool,
+                client_oid: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """시장가 주문을 체결하고 (주문, 오류 메시지) 를 반환합니다."""
+        stats = self.stats[exchange]
+        book = self.books[exchange].get(market_id)
+        if book is None:
+            return None, f"unknown symbol {market_id}"
+        if amount <= 0:
+            return None, 'order size must be positive'
+        config = self.config[exchange]
+        if config['reject_rate'] and self.rng.random() < config['reject_rate']:
+            stats['rejects'] += 1
+            return None, 'insufficient balance'
+
+        account = self.accounts[exchange]
+        held = account.positions.get(market_id, [0.0, 0.0])[0]
+        if reduce_only:
+            if not held or (held > 0) == (side == 'buy'):
+                stats['rejects'] += 1
+                return None, 'reduce-only order would open a position'
+            amount = min(amount, abs(held))
+
+        filled, price = book.match(side, amount, config['fill_ratio'])
+        fee = account.apply(book, side, filled, price, config['taker_fee']) if filled else 0.0
+        order = {
+            'id': str(next(self._order_ids)),
+            'client_oid': client_oid or '',
+            'market_id': market_id,
+            'side': side,
+            'amount': amount,
+            'filled': filled,
+            'price': price,
+            'fee': fee,
+            'reduce_only': reduce_only,
+            'status': 'filled' if filled >= amount else 'partially_filled' if filled else 'canceled',
+            'created_at': int(time.time() * 1000)
+        }
+        account.orders[order['id']] = order
+        stats['orders'] += 1
+        return order, None
+
+    def _equity(self, exchange: str) -> Tuple[float, float, float]:
+        """(지갑 잔액, 미실현 손익, 사용 증거금)"""
+        account = self.accounts[exchange]
+        books = self.books[exchange]
+        return account.balance, account.unrealized(books), account.margin(books)
+
+    # ---- MEXC (contract v1) ----
+
+    @staticmethod
+    def _mexc_ok(data: Any) -> web.Response:
+        return web.json_response({'success': True, 'code': 0, 'data': data})
+
+    def _mexc_ping(self, params, argument):
+        return self._mexc_ok(int(time.time() * 1000))
+
+    def _mexc_spot_info(self, params, argument):
+        # 현물은 마켓 목록과 시세만 흉내 냄 (ccxt 는 'XRP/USDT' 를 현물 마켓으로 찾음)
+        symbols = [{
+            'symbol': market_id.replace('_', ''), 'status': '1', 'baseAsset': market_id.split('_')[0],
+            'quoteAsset': 'USDT', 'baseAssetPrecision': 2, 'quotePrecision': 6, 'quoteAssetPrecision': 6,
+            'baseCommissionPrecision': 2, 'quoteCommissionPrecision': 6, 'orderTypes': ['LIMIT', 'MARKET'],
+            'isSpotTradingAllowed': True, 'isMarginTradingAllowed': False, 'permissions': ['SPOT'],
+            'baseSizePrecision': '0', 'makerCommission': '0', 'takerCommission': '0.0005',
+            'quoteAmountPrecision': '1', 'maxQuoteAmount': '2000000', 'fullName': market_id.split('_')[0]
+        } for market_id in self.books['mexc']]
+        return web.json_response({'timezone': 'CST', 'serverTime': int(time.time() * 1000), 'symbols': symbols})
+
+    def _mexc_spot_ticker(self, params, argument):
+        tickers = []
+        for market_id, book in self.books['mexc'].items():
+            if params.get('symbol') and params['symbol'] != market_id.replace('_', ''):
+                continue
+            bid, ask = book.best()
+            tickers.append({
+                'symbol': market_id.replace('_', ''), 'lastPrice': _price_str(book.last),
+                'bidPrice': _price_str(bid), 'askPrice': _price_str(ask), 'openPrice': _price_str(book.mid),
+                'highPrice': _price_str(book.mid * 1.05), 'lowPrice': _price_str(book.mid * 0.95),
+                'volume': '1000000', 'quoteVolume': _price_str(1000000 * book.mid),
+                'openTime': int(book.updated_at * 1000) - 86400000, 'closeTime': int(book.updated_at * 1000)
+            })
+        if params.get('symbol'):
+            return web.json_response(tickers[0]) if tickers else self._error('mexc', 400, 'Invalid symbol.')
+        return web.json_response(tickers)
+
+    def _mexc_detail(self, params, argument):
+        contracts = []
+        for market_id, book in self.books['mexc'].items():
+            if params.get('symbol') and params['symbol'] != market_id:
+                continue
+            base = market_id.split('_')[0]
+            contracts.append({
+                'symbol': market_id, 'displayName': f"{base}_USDT永续", 'displayNameEn': f"{base}_USDT PERPETUAL",
+                'positionOpenType': 3, 'baseCoin': base, 'quoteCoin': 'USDT', 'settleCoin': 'USDT',
+                'contractSize': book.contract_size, 'minLeverage': 1, 'maxLeverage': 200,
+                'priceScale': max(0, -int(round(math.log10(book.tick)))), 'volScale': 0, 'amountScale': 4,
+                'priceUnit': book.tick, 'volUnit': 1, 'minVol': 1, 'maxVol': 1000000,
+                'takerFeeRate': self.config['mexc']['taker_fee'], 'makerFeeRate': 0.0, 'state': 0,
+                'isNew': False, 'isHot': False, 'isHidden': False
+            })
+        return self._mexc_ok(contracts[0] if params.get('symbol') and contracts else contracts)
+
+    def _mexc_ticker_data(self, book: SimulatedBook) -> Dict[str, Any]:
+        bid, ask = book.best()
+        return {
+            'symbol': book.market_id, 'lastPrice': book.last, 'bid1': bid, 'ask1': ask,
+            'volume24': 1000000, 'amount24': 1000000 * book.mid * book.contract_size,
+            'holdVol': 0, 'lower24Price': book.mid * 0.95, 'high24Price': book.mid * 1.05, 'riseFallRate': 0,
+            'riseFallValue': 0, 'indexPrice': book.mid, 'fairPrice': book.mid, 'fundingRate': 0.0001,
+            'timestamp': int(book.updated_at * 1000)
+        }
+
+    def _mexc_ticker(self, params, argument):
+        if params.get('symbol'):
+            book = self.books['mexc'].get(params['symbol'])
+            if book is None:
+                return self._error('mexc', 400, 'contract not exists')
+            return self._mexc_ok(self._mexc_ticker_data(book))
+        return self._mexc_ok([self._mexc_ticker_data(book) for book in self.books['mexc'].values()])
+
+    def _mexc_depth(self, params, argument):
+        book = self.books['mexc'].get(argument)
+        if book is None:
+            return self._error('mexc', 400, 'contract not exists')
+        limit = int(params.get('limit') or book.depth)
+        return self._mexc_ok({
+            'asks': [[price, size, 1] for price, size in book.levels('asks', limit)],
+            'bids': [[price, size, 1] for price, size in book.levels('bids', limit)],
+            'version': book.version, 'timestamp': int(book.updated_at * 1000)
+        })
+
+    def _mexc_order_data(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        side = {('buy', False): 1, ('buy', True): 2, ('sell', False): 3, ('sell', True): 4}[
+            (order['side'], order['reduce_only'])]
+        state = {'filled': 3, 'partially_filled': 4, 'canceled': 4}[order['status']]
+        return {
+            'orderId': order['id'], 'symbol': order['market_id'], 'positionId': 0, 'price': 0,
+            'vol': order['amount'], 'leverage': 1, 'side': side, 'category': 1, 'orderType': 5,
+            'dealAvgPrice': order['price'], 'dealVol': order['filled'], 'orderMargin': 0,
+            'takerFee': order['fee'], 'makerFee': 0, 'profit': 0, 'feeCurrency': 'USDT', 'openType': 2,
+            'state': state, 'externalOid': order['client_oid'], 'errorCode': 0,
+            'usedMargin': 0, 'createTime': order['created_at'], 'updateTime': order['created_at']
+        }
+
+    def _mexc_order(self, params, argument):
+        side, reduce_only = {1: ('buy', False), 2: ('buy', True), 3: ('sell', False), 4: ('sell', True)}[
+            int(params['side'])]
+        order, error = self._submit('mexc', params['symbol'], side, float(params['vol']), reduce_only,
+                                    params.get('externalOid'))
+        if error:
+            return self._error('mexc', 400, error)
+        return self._mexc_ok({'orderId': order['id'], 'ts': order['created_at']})
+
+    def _mexc_get_order(self, params, argument):
+        order = self.accounts['mexc'].orders.get(argument)
+        if order is None:
+            return self._error('mexc', 400, 'order not exists')
+        return self._mexc_ok(self._mexc_order_data(order))
+
+    def _mexc_positions(self, params, argument):
+        positions = []
+        for market_id, (contracts, entry) in self.accounts['mexc'].positions.items():
+            if params.get('symbol') and params['symbol'] != market_id:
+                continue
+            book = self.books['mexc'][market_id]
+            positions.append({
+                'positionId': abs(hash(market_id)) % 10 ** 9, 'symbol': market_id,
+                'positionType': 1 if contracts > 0 else 2, 'openType': 2, 'state': 1,
+                'holdVol': abs(contracts), 'frozenVol': 0, 'closeVol': 0, 'holdAvgPrice': entry,
+                'openAvgPrice': entry, 'closeAvgPrice': 0, 'liquidatePrice': 0, 'oim': 0, 'im': 0,
+                'holdFee': 0, 'realised': 0, 'leverage': self.accounts['mexc'].leverage.get(market_id, 1),
+                'createTime': int(time.time() * 1000), 'updateTime': int(book.updated_at * 1000), 'autoAddIm': False
+            })
+        return self._mexc_ok(positions)
+
+    def _mexc_assets(self, params, argument):
+        balance, unrealized, margin = self._equity('mexc')
+        return self._mexc_ok([{
+            'currency': 'USDT', 'positionMargin': margin, 'availableBalance': balance + unrealized - margin,
+            'cashBalance': balance, 'frozenBalance': 0, 'equity': balance + unrealized,
+            'unrealized': unrealized, 'bonus': 0
+        }])
+
+    def _mexc_leverage(self, params, argument):
+        if params.get('symbol') and params.get('leverage'):
+            self.accounts['mexc'].leverage[params['symbol']] = int(params['leverage'])
+        return self._mexc_ok(None)
+
+    # ---- Bitget (v2 mix, USDT-FUTURES) ----
+
+    @staticmethod
+    def _bitget_ok(data: Any) -> web.Response:
+        return web.json_response({'code': '00000', 'msg': 'success', 'requestTime': int(time.time() * 1000),
+                                  'data': data})
+
+    def _bitget_time(self, params, argument):
+        return self._bitget_ok({'serverTime': str(int(time.time() * 1000))})
+
+    def _bitget_contracts(self, params, argument):
+        contracts = []
+        for market_id, book in self.books['bitget'].items():
+            places = max(0, -int(round(math.log10(book.tick))))
+            contracts.append({
+                'symbol': market_id, 'baseCoin': market_id[:-4], 'quoteCoin': 'USDT', 'buyLimitPriceRatio': '0.05',
+                'sellLimitPriceRatio': '0.05', 'feeRateUpRatio': '0.005',
+                'makerFeeRate': '0.0002', 'takerFeeRate': str(self.config['bitget']['taker_fee']),
+                'openCostUpRatio': '0.01', 'supportMarginCoins': ['USDT'], 'minTradeNum': '1',
+                'priceEndStep': '1', 'volumePlace': '0', 'pricePlace': str(places), 'sizeMultiplier': '1',
+                'symbolType': 'perpetual', 'minTradeUSDT': '5', 'maxSymbolOrderNum': '200',
+                'maxProductOrderNum': '400', 'maxPositionNum': '150', 'symbolStatus': 'normal',
+                'offTime': '-1', 'limitOpenTime': '-1', 'deliveryTime': '', 'deliveryStartTime': '',
+                'launchTime': '', 'fundInterval': '8', 'minLever': '1', 'maxLever': '125',
+                'posLimit': '0.05', 'maintainTime': ''
+            })
+        return self._bitget_ok(contracts)
+
+    def _bitget_ticker_data(self, book: SimulatedBook) -> Dict[str, Any]:
+        bid, ask = book.best()
+        return {
+            'symbol': book.market_id, 'lastPr': _price_str(book.last), 'askPr': _price_str(ask),
+            'bidPr': _price_str(bid), 'bidSz': str(book.bids[max(book.bids)]), 'askSz': str(book.asks[min(book.asks)]),
+            'high24h': _price_str(book.mid * 1.05), 'low24h': _price_str(book.mid * 0.95),
+            'ts': str(int(book.updated_at * 1000)), 'change24h': '0', 'baseVolume': '1000000',
+            'quoteVolume': _price_str(1000000 * book.mid), 'usdtVolume': _price_str(1000000 * book.mid),
+            'openUtc': _price_str(book.mid), 'changeUtc24h': '0', 'indexPrice': _price_str(book.mid),
+            'fundingRate': '0.0001', 'holdingAmount': '0', 'open24h': _price_str(book.mid),
+            'markPrice': _price_str(book.mid)
+        }
+
+    def _bitget_ticker(self, params, argument):
+        if params.get('symbol'):
+            book = self.books['bitget'].get(params['symbol'])
+            if book is None:
+                return self._error('bitget', 400, 'The symbol does not exist')
+            return self._bitget_ok([self._bitget_ticker_data(book)])
+        return self._bitget_ok([self._bitget_ticker_data(book) for book in self.books['bitget'].values()])
+
+    def _bitget_depth(self, params, argument):
+        book = self.books['bitget'].get(params.get('symbol'))
+        if book is None:
+            return self._error('bitget', 400, 'The symbol does not exist')
+        limit = int(params.get('limit') or book.depth)
+        return self._bitget_ok({
+            'asks': [[_price_str(price), str(size)] for price, size in book.levels('asks', limit)],
+            'bids': [[_price_str(price), str(size)] for price, size in book.levels('bids', limit)],
+            'ts': str(int(book.updated_at * 1000)), 'scale': _price_str(book.tick), 'precision': 'scale0',
+            'isMaxPrecision': 'NO'
+        })
+
+    def _bitget_order_data(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'symbol': order['market_id'], 'size': str(order['amount']), 'orderId': order['id'],
+            'clientOid': order['client_oid'], 'baseVolume': str(order['filled']),
+            'fee': str(-order['fee']), 'price': '', 'priceAvg': _price_str(order['price']) if order['filled'] else '',
+            'status': 'cancelled' if order['status'] == 'canceled' else order['status'], 'side': order['side'],
+            'force': 'ioc', 'totalProfits': '0', 'posSide': 'net', 'marginCoin': 'USDT',
+            'quoteVolume': _price_str(order['filled'] * order['price']), 'leverage': '1', 'marginMode': 'crossed',
+            'reduceOnly': 'YES' if order['reduce_only'] else 'NO', 'enterPointSource': 'API', 'tradeSide': 'open',
+            'posMode': 'one_way_mode', 'orderType': 'market', 'orderSource': 'market',
+            'cTime': str(order['created_at']), 'uTime': str(order['created_at'])
+        }
+
+    def _bitget_order(self, params, argument):
+        order, error = self._submit('bitget', params['symbol'], params['side'], float(params['size']),
+                                    params.get('reduceOnly') == 'YES', params.get('clientOid'))
+        if error:
+            return self._error('bitget', 400, error)
+        return self._bitget_ok({'orderId': order['id'], 'clientOid': order['client_oid']})
+
+    def _bitget_get_order(self, params, argument):
+        order = self.accounts['bitget'].orders.get(params.get('orderId'))
+        if order is None:
+            return self._error('bitget', 400, 'The order does not exist')
+        return self._bitget_ok(self._bitget_order_data(order))
+
+    def _bitget_positions(self, params, argument):
+        positions = []
+        for market_id, (contracts, entry) in self.accounts['bitget'].positions.items():
+            if params.get('symbol') and params['symbol'] != market_id:
+                continue
+            book = self.books['bitget'][market_id]
+            positions.append({
+                'marginCoin': 'USDT', 'symbol': market_id, 'holdSide': 'long' if contracts > 0 else 'short',
+                'openDelegateSize': '0', 'marginSize': _price_str(abs(contracts) * book.mid),
+                'available': str(abs(contracts)), 'locked': '0', 'total': str(abs(contracts)),
+                'leverage': str(self.accounts['bitget'].leverage.get(market_id, 1)), 'achievedProfits': '0',
+                'openPriceAvg': _price_str(entry), 'marginMode': 'crossed', 'posMode': 'one_way_mode',
+                'unrealizedPL': _price_str(contracts * (book.mid - entry)), 'liquidationPrice': '0',
+                'keepMarginRate': '0.004', 'markPrice': _price_str(book.mid), 'marginRatio': '0',
+                'cTime': str(int(time.time() * 1000)), 'uTime': str(int(book.updated_at * 1000))
+            })
+        return self._bitget_ok(positions)
+
+    def _bitget_accounts(self, params, argument):
+        balance, unrealized, margin = self._equity('bitget')
+        return self._bitget_ok([{
+            'marginCoin': 'USDT', 'locked': '0', 'available': _price_str(balance + unrealized - margin),
+            'crossedMaxAvailable': _price_str(balance + unrealized - margin),
+            'isolatedMaxAvailable': _price_str(balance + unrealized - margin),
+            'maxTransferOut': _price_str(balance - margin), 'accountEquity': _price_str(balance + unrealized),
+            'usdtEquity': _price_str(balance + unrealized), 'btcEquity': '0', 'crossedRiskRate': '0',
+            'unrealizedPL': _price_str(unrealized), 'coupon': '0', 'crossedMargin': _price_str(margin),
+            'isolatedMargin': '0'
+        }])
+
+    def _bitget_leverage(self, params, argument):
+        if params.get('symbol') and params.get('leverage'):
+            self.accounts['bitget'].leverage[params['symbol']] = int(params['leverage'])
+        return self._bitget_ok({'symbol': params.get('symbol'), 'marginCoin': 'USDT',
+                                'marginMode': params.get('marginMode', 'crossed'),
+                                'longLeverage': str(params.get('leverage', 1)),
+                                'shortLeverage': str(params.get('leverage', 1))})
+
+    # ---- Gate.io (futures v4, usdt) ----
+
+    def _gateio_time(self, params, argument):
+        return web.json_response({'server_time': int(time.time() * 1000)})
+
+    def _gateio_spot_pairs(self, params, argument):
+        # 현물은 마켓 목록과 시세만 흉내 냄 (ccxt 는 'XRP/USDT' 를 현물 마켓으로 찾음)
+        return web.json_response([{
+            'id': market_id, 'base': market_id.split('_')[0], 'quote': 'USDT', 'fee': '0.2',
+            'min_quote_amount': '1', 'amount_precision': 2, 'precision': 6, 'trade_status': 'tradable',
+            'sell_start': 0, 'buy_start': 0
+        } for market_id in self.books['gateio']])
+
+    def _gateio_spot_tickers(self, params, argument):
+        tickers = []
+        for market_id, book in self.books['gateio'].items():
+            if params.get('currency_pair') and params['currency_pair'] != market_id:
+                continue
+            bid, ask = book.best()
+            tickers.append({
+                'currency_pair': market_id, 'last': _price_str(book.last), 'lowest_ask': _price_str(ask),
+                'highest_bid': _price_str(bid), 'change_percentage': '0', 'base_volume': '1000000',
+                'quote_volume': _price_str(1000000 * book.mid), 'high_24h': _price_str(book.mid * 1.05),
+                'low_24h': _price_str(book.mid * 0.95)
+            })
+        return web.json_response(tickers)
+
+    def _gateio_contracts(self, params, argument):
+        contracts = []
+        for market_id, book in self.books['gateio'].items():
+            contracts.append({
+                'name': market_id, 'type': 'direct', 'quanto_multiplier': _price_str(book.contract_size),
+                'leverage_min': '1', 'leverage_max': '100', 'maintenance_rate': '0.005',
+                'mark_type': 'index', 'mark_price': _price_str(book.mid), 'index_price': _price_str(book.mid),
+                'last_price': _price_str(book.last), 'maker_fee_rate': '-0.0001',
+                'taker_fee_rate': str(self.config['gateio']['taker_fee']), 'order_price_round': _price_str(book.tick),
+                'mark_price_round': _price_str(book.tick), 'funding_rate': '0.0001', 'funding_interval': 28800,
+                'funding_next_apply': int(time.time()) + 3600, 'risk_limit_base': '1000000',
+                'risk_limit_step': '1000000', 'risk_limit_max': '8000000', 'order_size_min': 1,
+                'order_size_max': 1000000, 'order_price_deviate': '0.5', 'orderbook_id': book.version,
+                'trade_id': 1, 'trade_size': 0, 'position_size': 0, 'config_change_time': 0,
+                'in_delisting': False, 'orders_limit': 50, 'enable_bonus': True, 'enable_credit': True,
+                'create_time': 1600000000, 'funding_cap_ratio': '0.75'
+            })
+        return web.json_response(contracts)
+
+    def _gateio_empty(self, params, argument):
+        return web.json_response([])  # BTC 정산 선물과 만기 선물은 흉내 내지 않음
+
+    def _gateio_tickers(self, params, argument):
+        tickers = []
+        for market_id, book in self.books['gateio'].items():
+            if params.get('contract') and params['contract'] != market_id:
+                continue
+            bid, ask = book.best()
+            tickers.append({
+                'contract': market_id, 'last': _price_str(book.last), 'change_percentage': '0',
+                'total_size': '0', 'volume_24h': '1000000', 'volume_24h_base': str(1000000 * book.contract_size),
+                'volume_24h_quote': _price_str(1000000 * book.contract_size * book.mid),
+                'volume_24h_settle': _price_str(1000000 * book.contract_size * book.mid),
+                'mark_price': _price_str(book.mid), 'funding_rate': '0.0001', 'index_price': _price_str(book.mid),
+                'highest_bid': _price_str(bid), 'lowest_ask': _price_str(ask),
+                'high_24h': _price_str(book.mid * 1.05), 'low_24h': _price_str(book.mid * 0.95)
+            })
+        return web.json_response(tickers)
+
+    def _gateio_depth(self, params, argument):
+        book = self.books['gateio'].get(params.get('contract'))
+        if book is None:
+            return self._error('gateio', 400, 'contract not found')
+        limit = int(params.get('limit') or book.depth)
+        payload = {
+            'current': round(time.time(), 3), 'update': round(book.updated_at, 3),
+            'asks': [{'p': _price_str(price), 's': size} for price, size in book.levels('asks', limit)],
+            'bids': [{'p': _price_str(price), 's': size} for price, size in book.levels('bids', limit)]
+        }
+        if str(params.get('with_id')).lower() == 'true':
+            payload['id'] = book.version
+        return web.json_response(payload)
+
+    def _gateio_order_data(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        sign = 1 if order['side'] == 'buy' else -1
+        return {
+            'id': int(order['id']), 'user': 1, 'contract': order['market_id'],
+            'create_time': order['created_at'] / 1000, 'finish_time': order['created_at'] / 1000,
+            'finish_as': 'filled' if order['status'] == 'filled' else 'ioc', 'status': 'finished',
+            'size': int(order['amount']) * sign, 'iceberg': 0, 'price': '0',
+            'fill_price': _price_str(order['price']), 'left': int(order['amount'] - order['filled']) * sign,
+            'text': order['client_oid'] if order['client_oid'].startswith('t-') else f"t-{order['client_oid']}",
+            'tkfr': str(self.config['gateio']['taker_fee']), 'mkfr': '0', 'refu': 0, 'is_reduce_only':
+            order['reduce_only'], 'is_close': False, 'is_liq': False, 'tif': 'ioc'
+        }
+
+    def _gateio_order(self, params, argument):
+        size = int(params['size'])
+        order, error = self._submit('gateio', params['contract'], 'buy' if size > 0 else 'sell', float(abs(size)),
+                                    params.get('reduce_only') in (True, 'true'),
+                                    params.get('text'))
+        if error:
+            return self._error('gateio', 400, error)
+        return web.json_response(self._gateio_order_data(order), status=201)
+
+    def _gateio_get_order(self, params, argument):
+        order = self.accounts['gateio'].orders.get(argument or '')
+        if order is None:
+            return web.json_response({'label': 'ORDER_NOT_FOUND', 'message': 'order not found'}, status=404)
+        return web.json_response(self._gateio_order_data(order))
+
+    def _gateio_position_data(self, market_id: str, contracts: float, entry: float) -> Dict[str, Any]:
+        book = self.books['gateio'][market_id]
+        return {
+            'user': 1, 'contract': market_id, 'size': int(contracts),
+            'leverage': '0', 'cross_leverage_limit': str(self.accounts['gateio'].leverage.get(market_id, 1)),
+            'risk_limit': '1000000', 'leverage_max': '100', 'maintenance_rate': '0.005',
+            'value': _price_str(abs(contracts) * book.contract_size * book.mid), 'margin': '0',
+            'entry_price': _price_str(entry), 'liq_price': '0', 'mark_price': _price_str(book.mid),
+            'unrealised_pnl': _price_str(contracts * book.contract_size * (book.mid - entry)),
+            'realised_pnl': '0', 'history_pnl': '0', 'last_close_pnl': '0', 'realised_point': '0',
+            'history_point': '0', 'adl_ranking': 5, 'pending_orders': 0, 'mode': 'single',
+            'update_time': int(book.updated_at)
+        }
+
+    def _gateio_positions(self, params, argument):
+        positions = self.accounts['gateio'].positions
+        if argument:
+            contracts, entry = positions.get(argument, [0.0, 0.0])
+            return web.json_response(self._gateio_position_data(argument, contracts, entry))
+        return web.json_response([self._gateio_position_data(market_id, contracts, entry)
+                                  for market_id, (contracts, entry) in positions.items()])
+
+    def _gateio_accounts(self, params, argument):
+        balance, unrealized, margin = self._equity('gateio')
+        return web.json_response({
+            'user': 1, 'currency': 'USDT', 'total': _price_str(balance), 'unrealised_pnl': _price_str(unrealized),
+            'position_margin': _price_str(margin), 'order_margin': '0',
+            'available': _price_str(balance + unrealized - margin), 'point': '0', 'bonus': '0',
+            'in_dual_mode': False, 'enable_credit': False, 'position_initial_margin': _price_str(margin),
+            'maintenance_margin': '0', 'cross_available': _price_str(balance + unrealized - margin),
+            'history': {'dnw': '0', 'pnl': '0', 'fee': '0', 'refr': '0', 'fund': '0', 'point_dnw': '0',
+                        'point_fee': '0', 'point_refr': '0', 'bonus_dnw': '0', 'bonus_offset': '0'}
+        })
+
+    def _gateio_leverage(self, params, argument):
+        if argument in self.books['gateio']:
+            leverage = params.get('cross_leverage_limit') or params.get('leverage') or 1
+            self.accounts['gateio'].leverage[argument] = int(float(leverage)) or 1
+            contracts, entry = self.accounts['gateio'].positions.get(argument, [0.0, 0.0])
+            return web.json_response(self._gateio_position_data(argument, contracts, entry))
+        return web.json_response({'user': 1, 'currency': 'USDT', 'in_dual_mode': False})
+
+    # ---- WebSocket ----
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        exchange = request.match_info['exchange']
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        if exchange not in EXCHANGES:
+            await ws.close()
+            return ws
+
+        channels = self._subscribers[exchange].setdefault(ws, set())
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                if message.data == 'ping':
+                    await ws.send_str('pong')
+                    continue
+                try:
+                    payload = json.loads(message.data)
+                except ValueError:
+                    continue
+                await self._on_ws_message(exchange, ws, channels, payload)
+        finally:
+            self._subscribers[exchange].pop(ws, None)
+        return ws
+
+    async def _on_ws_message(self, exchange: str, ws: web.WebSocketResponse, channels: set, payload: Dict[str, Any]):
+        if exchange == 'mexc':
+            method = payload.get('method', '')
+            if method == 'ping':
+                await ws.send_str(json.dumps({'channel': 'pong', 'data': int(time.time() * 1000)}))
+            elif method in ('sub.depth', 'sub.ticker'):
+                market_id = payload.get('param', {}).get('symbol')
+                channels.add((method[4:], market_id))
+                await ws.send_str(json.dumps({'channel': f'rs.{method}', 'data': 'success',
+                                              'ts': int(time.time() * 1000)}))
+        elif exchange == 'bitget':
+            op = payload.get('op')
+            for arg in payload.get('args', []):
+                key = (arg.get('channel'), arg.get('instId'))
+                if op == 'subscribe':
+                    channels.add(key)
+                    await ws.send_str(json.dumps({'event': 'subscribe', 'arg': arg}))
+                    book = self.books['bitget'].get(key[1])
+                    if key[0] == 'books' and book is not None:
+                        await ws.send_str(json.dumps(self._bitget_book_message(book, 'snapshot',
+                                                                               book.levels('bids'),
+                                                                               book.levels('asks'))))
+                elif op == 'unsubscribe':
+                    channels.discard(key)
+                    await ws.send_str(json.dumps({'event': 'unsubscribe', 'arg': arg}))
+        else:
+            channel = payload.get('channel', '')
+            if channel == 'futures.ping':
+                await ws.send_str(json.dumps({'time': int(time.time()), 'channel': 'futures.pong', 'event': '',
+                                              'result': None}))
+            elif payload.get('event') == 'subscribe':
+                for market_id in payload.get('payload', [])[:1]:
+                    channels.add((channel, market_id))
+                await ws.send_str(json.dumps({'time': int(time.time()), 'channel': channel, 'event': 'subscribe',
+                                              'result': {'status': 'success'}}))
+
+    @staticmethod
+    def _bitget_book_message(book: SimulatedBook, action: str, bids: List, asks: List) -> Dict[str, Any]:
+        return {
+            'action': action,
+            'arg': {'instType': 'USDT-FUTURES', 'channel': 'books', 'instId': book.market_id},
+            'data': [{
+                'bids': [[_price_str(price), str(size)] for price, size in bids],
+                'asks': [[_price_str(price), str(size)] for price, size in asks],
+                'checksum': 0, 'seq': book.version, 'pseq': book.version - 1,
+                'ts': str(int(book.updated_at * 1000))
+            }],
+            'ts': int(book.updated_at * 1000)
+        }
+
+    def _ws_messages(self, exchange: str, book: SimulatedBook, deltas: List) -> List[Tuple[Any, bool, Dict]]:
+        """(구독 키, 호가 델타 여부, 메시지) 목록. 호가 델타마다 메시지 하나와 시세 하나를 거래소 형식으로 만듭니다."""
+        messages = []
+        for version, ts, bids, asks in deltas:
+            if exchange == 'mexc':
+                message = {'channel': 'push.depth', 'symbol': book.market_id, 'ts': ts, 'data': {
+                    'asks': [[price, size, 1] for price, size in asks],
+                    'bids': [[price, size, 1] for price, size in bids], 'version': version}}
+                messages.append((('depth', book.market_id), True, message))
+            elif exchange == 'bitget':
+                message = self._bitget_book_message(book, 'update', bids, asks)
+                message['data'][0].update({'seq': version, 'pseq': version - 1, 'ts': str(ts)})
+                messages.append((('books', book.market_id), True, message))
+            else:
+                messages.append((('futures.order_book_update', book.market_id), True, {
+                    'time': ts // 1000, 'time_ms': ts, 'channel': 'futures.order_book_update', 'event': 'update',
+                    'result': {'t': ts, 's': book.market_id, 'U': version, 'u': version,
+                               'b': [{'p': _price_str(price), 's': size} for price, size in bids],
+                               'a': [{'p': _price_str(price), 's': size} for price, size in asks]}}))
+
+        ts = int(book.updated_at * 1000)
+        if exchange == 'mexc':
+            messages.append((('ticker', book.market_id), False, {
+                'channel': 'push.ticker', 'symbol': book.market_id, 'ts': ts, 'data': self._mexc_ticker_data(book)}))
+        elif exchange == 'bitget':
+            messages.append((('ticker', book.market_id), False, {
+                'action': 'snapshot', 'arg': {'instType': 'USDT-FUTURES', 'channel': 'ticker',
+                                              'instId': book.market_id},
+                'data': [{'instId': book.market_id, **self._bitget_ticker_data(book)}], 'ts': ts}))
+        else:
+            bid, ask = book.best()
+            messages.append((('futures.tickers', book.market_id), False, {
+                'time': ts // 1000, 'time_ms': ts, 'channel': 'futures.tickers', 'event': 'update',
+                'result': [{'contract': book.market_id, 'last': _price_str(book.last),
+                            'mark_price': _price_str(book.mid), 'index_price': _price_str(book.mid),
+                            'highest_bid': _price_str(bid), 'lowest_ask': _price_str(ask)}]}))
+        return messages
+
+    async def _broadcast(self, exchange: str, updates: List[Tuple[SimulatedBook, List]]):
+        subscribers = self._subscribers[exchange]
+        if not subscribers:
+            return
+        drop_rate = self.config[exchange]['ws_drop_rate']
+        outgoing: Dict[web.WebSocketResponse, List[str]] = {}
+        for book, deltas in updates:
+            for key, is_delta, message in self._ws_messages(exchange, book, deltas):
+                data = None
+                for ws, channels in subscribers.items():
+                    if key not in channels:
+                        continue
+                    if is_delta and drop_rate and self.rng.random() < drop_rate:
+                        self.stats[exchange]['ws_dropped'] += 1
+                        continue
+                    data = data or json.dumps(message)
+                    outgoing.setdefault(ws, []).append(data)
+
+        delay = self._delay(exchange)
+        if delay:
+            await asyncio.sleep(delay)
+        for ws, messages in outgoing.items():
+            if ws.closed:
+                continue
+            try:
+                for data in messages:
+                    await ws.send_str(data)
+                self.stats[exchange]['ws_messages'] += len(messages)
+            except (ConnectionError, RuntimeError):
+                pass
+
+    # ---- 제어 ----
+
+    async def _handle_control(self, request: web.Request) -> web.Response:
+        """GET 은 설정/통계/계정 조회, POST 는 설정 변경 (예: {"latency": 0.05, "error_rate": 0.01})"""
+        exchange = request.match_info['exchange']
+        if exchange not in EXCHANGES and exchange != 'all':
+            return web.json_response({'error': f"unknown exchange {exchange}"}, status=404)
+        if request.method == 'POST':
+            try:
+                self.configure(None if exchange == 'all' else exchange, **await request.json())
+            except (ValueError, TypeError) as e:
+                return web.json_response({'error': str(e)}, status=400)
+        return web.json_response(self.get_status())
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {}
+        for exchange in EXCHANGES:
+            balance, unrealized, margin = self._equity(exchange)
+            status[exchange] = {
+                'config': self.config[exchange],
+                'stats': self.stats[exchange],
+                'balance': balance,
+                'unrealized': unrealized,
+                'positions': {market_id: {'contracts': contracts, 'entry_price': entry}
+                              for market_id, (contracts, entry) in self.accounts[exchange].positions.items()},
+                'subscribers': len(self._subscribers[exchange])
+            }
+        return status
+
+    # ---- 연결 주소 ----
+
+    def gateway_urls(self) -> Dict[str, str]:
+        """order_gateway.build_gateways(base_urls=...) 에 넘길 주소"""
+        return {exchange: venue_url(self._url, exchange) for exchange in EXCHANGES}
+
+    def stream_urls(self) -> Dict[str, Tuple[str, str]]:
+        """MarketStream(urls=...) 에 넘길 주소 (MarketStream.replay_urls(base_url) 과 같음)"""
+        ws_base = self._url.replace('http://', 'ws://')
+        return {exchange: (f"{ws_base}/ws/{exchange}", venue_url(self._url, exchange)) for exchange in EXCHANGES}
+
+    # ---- 실행 ----
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8090) -> str:
+        """서버와 시세 생성 작업을 시작하고 주소를 반환합니다. port=0 이면 빈 포트를 사용합니다."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self._url = f"http://{host}:{port}"
+        self._ticker_task = asyncio.ensure_future(self._run_ticker())
+        logger.info(f"Mock exchange server listening on {self._url} ({len(self.symbols)} symbols)")
+        return self._url
+
+    async def stop(self):
+        if self._ticker_task:
+            self._ticker_task.cancel()
+        for subscribers in self._subscribers.values():
+            for ws in list(subscribers):
+                await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def start_in_thread(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """별도 스레드에서 서버를 실행하고 주소를 반환합니다."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start(host, port))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='mock-exchange', daemon=True)
+        self._thread.start()
+        ready.wait(timeout=10)
+        return self._url
+
+    def stop_thread(self):
+        """start_in_thread 로 시작한 서버를 중지합니다."""
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='Local mock MEXC/Bitget/Gate.io futures exchange')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--symbols', default=','.join(DEFAULT_SYMBOLS), help='쉼표로 구분한 코인 목록')
+    parser.add_argument('--extra-symbols', type=int, default=0, help='부하 시험용으로 추가할 가상 코인 수')
+    parser.add_argument('--tick-interval', type=float, default=0.1, help='호가 갱신 주기 (초)')
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--volatility', type=float, default=0.00005, help='틱당 중간가 변동 (비율 표준편차)')
+    parser.add_argument('--seed', type=int, default=None)
+    for name, default in DEFAULT_VENUE_CONFIG.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args()
+
+    symbols = [symbol for symbol in args.symbols.split(',') if symbol]
+    symbols += [f"SIM{index}/USDT" for index in range(args.extra_symbols)]
+    server = MockExchangeServer(symbols, depth=args.depth, tick_interval=args.tick_interval,
+                                volatility=args.volatility, seed=args.seed,
+                                **{name: getattr(args, name) for name in DEFAULT_VENUE_CONFIG})
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    url = loop.run_until_complete(server.start(args.host, args.port))
+    print(f"MOCK_EXCHANGE_URL={url}")
+    print(f"MARKET_STREAM_REPLAY_URL={url}")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        loop.run_until_complete(server.stop())
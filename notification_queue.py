@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 'high'  # 주문 결과, 오류, 시스템 상태
+PRIORITY_LOW = 'low'    # 가격차 알림 (밀리면 요약하거나 버림)
+
+# 텔레그램 메시지 최대 길이
+MAX_MESSAGE_LENGTH = 4096
+
+# 생략 요약에 표시할 알림 종류 (key 의 ':' 앞부분)
+DROP_LABELS = {
+    'gap': '가격차 알림'
+}
+
+
+class NotificationQueue:
+    """텔레그램 발송을 호출 스레드에서 분리하는 제한 크기 대기열
+
+    enqueue() 는 즉시 반환하고, 워커 스레드가 대기 중인 메시지를 한 통으로
+    묶어 채팅방별 전송 한도(초당 1건, 분당 20건) 안에서 발송합니다. 대기열이
+    가득 차면 낮은 우선순위 알림부터 버리고, 버린 건수는 다음 메시지에
+    요약해서 붙입니다. 같은 key 의 낮은 우선순위 알림은 최신 것만 남깁니다.
+    """
+
+    def __init__(self, sender: Callable[[str], Any], max_size: int = 100, min_interval: float = 1.0,
+                 max_per_minute: int = 20, max_attempts: int = 3):
+        self.sender = sender
+        self.max_size = max_size
+        self.min_interval = min_interval
+        self.max_per_minute = max_per_minute
+        self.max_attempts = max_attempts
+
+        # key -> {'text', 'priority', 'enqueued_at', 'attempts'} (삽입 순서 유지)
+        self._items: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._dropped_summary: Dict[str, int] = {}
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._send_times: deque = deque()
+        self._blocked_until = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.metrics = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'sent_messages': 0,
+            'sent_batches': 0,
+            'send_failures': 0,
+            'send_latency_ms_last': 0.0,
+            'send_latency_ms_max': 0.0,
+            'send_latency_ms_total': 0.0,
+            'queue_wait_ms_max': 0.0
+        }
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='notification-queue', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """남은 메시지를 timeout 동안 발송한 뒤 워커를 중지합니다."""
+        self.flush(timeout)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def enqueue(self, text: str, priority: str = PRIORITY_HIGH, key: Optional[str] = None) -> bool:
+        """메시지를 대기열에 넣습니다. 버려졌으면 False 를 반환합니다."""
+        with self._condition:
+            self.metrics['enqueued'] += 1
+
+            if priority == PRIORITY_LOW and key is not None:
+                item_key = f"low:{key}"
+                if item_key in self._items:
+                    # 아직 보내지 않은 같은 종류의 알림은 최신 내용으로 교체
+                    self.metrics['coalesced'] += 1
+                    self._items[item_key].update({'text': text})
+                    return True
+            else:
+                self._sequence += 1
+                item_key = f"{priority}:{self._sequence}"
+
+            if len(self._items) >= self.max_size and not self._make_room(priority, key):
+                self._record_drop(key)
+                return False
+
+            self._items[item_key] = {
+                'text': text,
+                'priority': priority,
+                'key': key,
+                'enqueued_at': time.time(),
+                'attempts': 0
+            }
+            self._condition.notify()
+            return True
+
+    def _make_room(self, priority: str, key: Optional[str]) -> bool:
+        """대기열이 가득 찼을 때 가장 오래된 낮은 우선순위 알림을 버립니다."""
+        if priority != PRIORITY_HIGH:
+            return False
+        for item_key, item in self._items.items():
+            if item['priority'] == PRIORITY_LOW:
+                del self._items[item_key]
+                self._record_drop(item['key'])
+                return True
+        # 높은 우선순위만 가득하면 가장 오래된 것을 버림
+        item_key, item = next(iter(self._items.items()))
+        del self._items[item_key]
+        self._record_drop(item['key'])
+        logger.warning("Notification queue full of high priority messages, dropped the oldest")
+        return True
+
+    def _record_drop(self, key: Optional[str]):
+        self.metrics['dropped'] += 1
+        label = DROP_LABELS.get(key.split(':')[0], '메시지') if key else '메시지'
+        self._dropped_summary[label] = self._dropped_summary.get(label, 0) + 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """대기열이 빌 때까지 최대 timeout 초 기다립니다."""
+        deadline = time.time() + timeout
+        with self._condition:
+            while self._items and self._running:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return not self._items
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """대기열 길이와 발송 지연시간 통계를 반환합니다."""
+        with self._condition:
+            metrics = dict(self.metrics)
+            metrics['queue_depth'] = len(self._items)
+            metrics['queue_depth_high'] = sum(1 for item in self._items.values() if item['priority'] == PRIORITY_HIGH)
+        batches = metrics['sent_batches']
+        metrics['send_latency_ms_avg'] = metrics['send_latency_ms_total'] / batches if batches else 0.0
+        return metrics
+
+    def _wait_for_rate_limit(self) -> float:
+        """다음 발송까지 기다려야 하는 시간(초)"""
+        now = time.time()
+        while self._send_times and now - self._send_times[0] >= 60:
+            self._send_times.popleft()
+
+        delay = max(0.0, self._blocked_until - now)
+        if self._send_times:
+            delay = max(delay, self._send_times[-1] + self.min_interval - now)
+        if len(self._send_times) >= self.max_per_minute:
+            delay = max(delay, self._send_times[0] + 60 - now)
+        return delay
+
+    def _take_batch(self):
+        """발송할 메시지들을 꺼내 한 통으로 합칩니다 (높은 우선순위 먼저)."""
+        ordered = sorted(self._items.items(), key=lambda entry: entry[1]['priority'] != PRIORITY_HIGH)
+        batch, length = [], 0
+        for item_key, item in ordered:
+            added = len(item['text']) + 2
+            if batch and length + added > MAX_MESSAGE_LENGTH - 100:
+                break
+            batch.append((item_key, item))
+            length += added
+        for item_key, _ in batch:
+            del self._items[item_key]
+
+        texts = [item['text'][:MAX_MESSAGE_LENGTH - 100] for _, item in batch]
+        dropped, self._dropped_summary = self._dropped_summary, {}
+        if dropped:
+            summary = ', '.join(f"{label} {count}건" for label, count in dropped.items())
+            texts.append(f"ℹ️ 대기열 초과로 생략된 알림: {summary}")
+        return batch, '\n\n'.join(texts), dropped
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._items:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                delay = self._wait_for_rate_limit()
+                if delay > 0:
+                    # 기다리는 동안 들어온 메시지는 같은 묶음으로 발송됨
+                    self._condition.wait(delay)
+                    continue
+                batch, text, dropped = self._take_batch()
+                self._send_times.append(time.time())
+
+            self._send(batch, text, dropped)
+
+    def _send(self, batch, text: str, dropped: Dict[str, int]):
+        start_time = time.time()
+        try:
+            self.sender(text)
+        except Exception as e:
+            self.metrics['send_failures'] += 1
+            retry_after = getattr(e, 'retry_after', None)
+            logger.error(f"Failed to send notification batch of {len(batch)}: {e}")
+            with self._condition:
+                if retry_after:
+                    self._blocked_until = time.time() + float(retry_after)
+                # 생략 요약은 다음 묶음에 다시 붙임
+                for label, count in dropped.items():
+                    self._dropped_summary[label] = self._dropped_summary.get(label, 0) + count
+                # 대기열 앞쪽에 되돌려 재시도 (그 사이 같은 key 의 새 알림이 왔으면 이전 것은 버림)
+                for item_key, item in reversed(batch):
+                    item['attempts'] += 1
+                    if item_key in self._items:
+                        self.metrics['coalesced'] += 1
+                    elif item['attempts'] < self.max_attempts:
+                        self._items[item_key] = item
+                        self._items.move_to_end(item_key, last=False)
+                    else:
+                        self._record_drop(item['key'])
+                self._condition.notify_all()
+            return
+
+        latency_ms = (time.time() - start_time) * 1000
+        with self._condition:
+            self.metrics['sent_batches'] += 1
+            self.metrics['sent_messages'] += len(batch)
+            self.metrics['send_latency_ms_last'] = latency_ms
+            self.metrics['send_latency_ms_total'] += latency_ms
+            self.metrics['send_latency_ms_max'] = max(self.metrics['send_latency_ms_max'], latency_ms)
+            waited_ms = (start_time - min(item['enqueued_at'] for _, item in batch)) * 1000
+            self.metrics['queue_wait_ms_max'] = max(self.metrics['queue_wait_ms_max'], waited_ms)
+            self._condition.notify_all()  # flush() 대기 해제
+        logger.info(f"Sent {len(batch)} notification(s) in {latency_ms:.2f}ms")
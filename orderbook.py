@@ -0,0 +1,199 @@
+import logging
+from typing import Optional, Dict, Any, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BookSide:
+    """한쪽(매수 또는 매도) 호가를 가격 오름차순의 연속 (capacity, 2) 배열로 보관합니다.
+
+    0열은 가격, 1열은 수량입니다. 삽입/삭제는 미리 확보한 버퍼 안에서 제자리
+    이동으로 처리하므로 용량이 부족할 때만 새 배열을 할당합니다.
+    """
+
+    __slots__ = ('levels', 'count', 'descending', '_cum_notional')
+
+    def __init__(self, descending: bool, capacity: int = 64):
+        self.levels = np.empty((capacity, 2), dtype=np.float64)
+        self.count = 0
+        self.descending = descending  # 매수 호가는 높은 가격이 최우선
+        self._cum_notional: Optional[np.ndarray] = None
+
+    def set_levels(self, levels: Any):
+        """전체 호가를 교체합니다. levels 는 [[price, amount, ...], ...] 형태입니다."""
+        array = np.asarray(levels, dtype=np.float64)
+        if array.ndim != 2 or array.shape[0] == 0:
+            self.count = 0
+            self._cum_notional = None
+            return
+
+        array = array[:, :2]
+        array = array[array[:, 1] > 0]
+        array = array[np.argsort(array[:, 0], kind='stable')]
+        self._reserve(len(array))
+        self.levels[:len(array)] = array
+        self.count = len(array)
+        self._cum_notional = None
+
+    def _reserve(self, size: int):
+        if size <= len(self.levels):
+            return
+        capacity = max(size, len(self.levels) * 2)
+        grown = np.empty((capacity, 2), dtype=np.float64)
+        grown[:self.count] = self.levels[:self.count]
+        self.levels = grown
+
+    def index_of(self, price: float) -> int:
+        """가격이 들어갈 위치를 이진 탐색으로 찾습니다 (O(log n))."""
+        return int(np.searchsorted(self.levels[:self.count, 0], price))
+
+    def get(self, price: float) -> float:
+        """해당 가격의 수량을 반환합니다. 없으면 0 입니다."""
+        index = self.index_of(price)
+        if index < self.count and self.levels[index, 0] == price:
+            return float(self.levels[index, 1])
+        return 0.0
+
+    def update(self, price: float, amount: float):
+        """한 가격 단계를 갱신합니다. amount 가 0 이면 삭제합니다."""
+        index = self.index_of(price)
+        exists = index < self.count and self.levels[index, 0] == price
+
+        if amount > 0:
+            if exists:
+                self.levels[index, 1] = amount
+            else:
+                self._reserve(self.count + 1)
+                self.levels[index + 1:self.count + 1] = self.levels[index:self.count]
+                self.levels[index] = (price, amount)
+                self.count += 1
+        elif exists:
+            self.levels[index:self.count - 1] = self.levels[index + 1:self.count]
+            self.count -= 1
+        self._cum_notional = None
+
+    def view(self, limit: Optional[int] = None) -> np.ndarray:
+        """최우선 호가부터 정렬된 (n, 2) 배열 뷰를 반환합니다 (복사 없음)."""
+        levels = self.levels[:self.count]
+        if self.descending:
+            levels = levels[::-1]
+        return levels if limit is None else levels[:limit]
+
+    def cum_notional(self) -> np.ndarray:
+        """최우선 호가부터의 누적 체결 금액 (변경 전까지 캐시)"""
+        if self._cum_notional is None:
+            levels = self.view()
+            self._cum_notional = np.cumsum(levels[:, 0] * levels[:, 1])
+        return self._cum_notional
+
+
+class OrderBook:
+    """NumPy 배열 기반의 L2 호가창
+
+    ccxt 호가창 딕셔너리와 같은 키('bids', 'asks', 'symbol', 'timestamp', 'nonce')로
+    접근할 수 있어 기존 orderbook['asks'][0][0] 형태의 코드와 호환됩니다.
+    """
+
+    __slots__ = ('symbol', 'bid_side', 'ask_side', 'timestamp', 'nonce')
+
+    def __init__(self, symbol: Optional[str] = None, capacity: int = 64):
+        self.symbol = symbol
+        self.bid_side = BookSide(descending=True, capacity=capacity)
+        self.ask_side = BookSide(descending=False, capacity=capacity)
+        self.timestamp: Optional[int] = None
+        self.nonce: Optional[int] = None
+
+    @classmethod
+    def from_ccxt(cls, orderbook: Dict[str, Any], symbol: Optional[str] = None) -> 'OrderBook':
+        """ccxt fetch_order_book 결과로부터 호가창을 생성합니다."""
+        book = cls(symbol or orderbook.get('symbol'))
+        book.apply_snapshot(orderbook.get('bids', []), orderbook.get('asks', []),
+                            orderbook.get('nonce'), orderbook.get('timestamp'))
+        return book
+
+    def apply_snapshot(self, bids: Sequence, asks: Sequence, nonce: Optional[int] = None,
+                       timestamp: Optional[int] = None):
+        """전체 호가를 교체합니다."""
+        self.bid_side.set_levels(bids)
+        self.ask_side.set_levels(asks)
+        self.nonce = nonce
+        self.timestamp = timestamp
+
+    def apply_delta(self, bids: Sequence, asks: Sequence, nonce: Optional[int] = None,
+                    timestamp: Optional[int] = None):
+        """변경된 가격 단계만 반영합니다. 수량 0 은 삭제를 의미합니다."""
+        for price, amount in bids:
+            self.bid_side.update(float(price), float(amount))
+        for price, amount in asks:
+            self.ask_side.update(float(price), float(amount))
+        if nonce is not None:
+            self.nonce = nonce
+        if timestamp is not None:
+            self.timestamp = timestamp
+
+    @property
+    def bids(self) -> np.ndarray:
+        return self.bid_side.view()
+
+    @property
+    def asks(self) -> np.ndarray:
+        return self.ask_side.view()
+
+    def top(self, side: str, limit: Optional[int] = None) -> np.ndarray:
+        """상위 limit 단계의 (n, 2) 뷰를 반환합니다 (복사 없음)."""
+        return (self.bid_side if side == 'bids' else self.ask_side).view(limit)
+
+    def best_bid(self) -> Optional[float]:
+        return float(self.bid_side.view(1)[0, 0]) if self.bid_side.count else None
+
+    def best_ask(self) -> Optional[float]:
+        return float(self.ask_side.view(1)[0, 0]) if self.ask_side.count else None
+
+    def cum_notional(self, side: str) -> np.ndarray:
+        """최우선 호가부터의 누적 체결 금액 배열"""
+        return (self.bid_side if side == 'bids' else self.ask_side).cum_notional()
+
+    def copy(self, limit: Optional[int] = None) -> 'OrderBook':
+        """상위 limit 단계만 복사한 독립적인 호가창을 반환합니다."""
+        bids, asks = self.top('bids', limit), self.top('asks', limit)
+        book = OrderBook(self.symbol, capacity=max(len(bids), len(asks), 1))
+        book.apply_snapshot(bids, asks, self.nonce, self.timestamp)
+        return book
+
+    def levels_with_notional(self, side: str, limit: int) -> list:
+        """상위 limit 단계를 [price, amount, notional] 리스트로 반환합니다 (화면/알림용)."""
+        levels = self.top(side, limit)
+        cum = self.cum_notional(side)[:len(levels)]
+        notional = np.diff(cum, prepend=0.0)
+        return np.column_stack((levels, notional)).tolist()
+
+    def to_dict(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """JSON 직렬화용 ccxt 형태 딕셔너리"""
+        return {
+            'symbol': self.symbol,
+            'bids': self.top('bids', limit).tolist(),
+            'asks': self.top('asks', limit).tolist(),
+            'timestamp': self.timestamp,
+            'datetime': None,
+            'nonce': self.nonce
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key in ('bids', 'asks', 'symbol', 'timestamp', 'nonce'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in ('bids', 'asks', 'symbol', 'timestamp', 'nonce')
+
+    def __repr__(self) -> str:
+        return (f"OrderBook({self.symbol}, bid={self.best_bid()}, ask={self.best_ask()}, "
+                f"levels={self.bid_side.count}/{self.ask_side.count})")
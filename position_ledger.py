@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 스냅샷과 차이가 이 수량(코인)보다 작으면 같은 것으로 봄
+RECONCILE_TOLERANCE = 1e-9
+
+# 중복 체결(주문 응답 + 체결 스트림) 확인용으로 기억하는 주문 id 수
+SEEN_ORDERS = 4096
+
+
+class Position:
+    """한 거래소/코인의 포지션 (수량은 코인 단위, 롱 +, 숏 -)"""
+
+    __slots__ = ('quantity', 'entry_price', 'updated_at', 'source')
+
+    def __init__(self):
+        self.quantity = 0.0
+        self.entry_price = 0.0
+        self.updated_at = 0.0
+        self.source = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'quantity': self.quantity,
+            'side': 'long' if self.quantity > 0 else 'short' if self.quantity < 0 else 'flat',
+            'entry_price': self.entry_price,
+            'updated_at': self.updated_at,
+            'source': self.source
+        }
+
+
+class PositionLedger:
+    """(거래소, 코인) 별 포지션과 코인별 순노출을 메모리에 유지하는 장부
+
+    주문 응답/체결 알림(apply_fill)으로 바로 갱신하고, reconcile_interval 마다
+    거래소 포지션 스냅샷과 비교해 차이가 있으면 스냅샷 값으로 고칩니다.
+    포지션 조회와 코인별 순노출(모든 거래소 수량 합)은 dict 조회 한 번이므로
+    주문 전 노출 한도와 재고 쏠림(skew) 확인에 거래소 요청이 필요 없습니다.
+    """
+
+    def __init__(self, trading_executor=None, reconcile_interval: float = 60.0,
+                 max_notional: Optional[float] = None, max_skew: Optional[float] = None):
+        self.trading = trading_executor
+        self.reconcile_interval = reconcile_interval
+        self.max_notional = max_notional  # 코인별 전체 거래소 포지션 합 (USDT)
+        self.max_skew = max_skew  # 코인별 순노출 (USDT)
+
+        self._positions: Dict[Tuple[str, str], Position] = {}
+        self._net: Dict[str, float] = {}  # 코인 -> 순수량
+        self._gross: Dict[str, float] = {}  # 코인 -> 거래소별 |수량| 합
+        self._last_price: Dict[str, float] = {}
+        self._seen_orders: Dict[str, None] = {}
+        self._seen_order_queue: deque = deque()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'fills': 0, 'duplicate_fills': 0, 'reconciles': 0, 'drifts': 0, 'rejected': 0,
+                      'last_reconcile': None}
+
+    # ---- 갱신 ----
+
+    def _set_quantity(self, key: Tuple[str, str], position: Position, quantity: float):
+        symbol = key[1]
+        self._net[symbol] = self._net.get(symbol, 0.0) + quantity - position.quantity
+        self._gross[symbol] = self._gross.get(symbol, 0.0) + abs(quantity) - abs(position.quantity)
+        position.quantity = quantity
+
+    def apply_fill(self, fill: Dict[str, Any]):
+        """체결 하나를 반영합니다 (TradingExecutor 체결 알림 또는 체결 스트림). 같은 주문은 한 번만 반영합니다."""
+        quantity = fill['amount'] * fill.get('contract_size', 1.0) * (1 if fill['side'] == 'buy' else -1)
+        key = (fill['exchange'], fill['symbol'])
+        price = fill.get('price')
+        order_id = fill.get('order_id')
+
+        with self._lock:
+            if order_id:
+                seen_key = f"{fill['exchange']}:{order_id}"
+                if seen_key in self._seen_orders:
+                    self.stats['duplicate_fills'] += 1
+                    return
+                self._seen_orders[seen_key] = None
+                self._seen_order_queue.append(seen_key)
+                if len(self._seen_order_queue) > SEEN_ORDERS:
+                    self._seen_orders.pop(self._seen_order_queue.popleft(), None)
+
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = Position()
+            held = position.quantity
+            new_quantity = held + quantity
+            if price:
+                if not held or (new_quantity and (held > 0) != (new_quantity > 0)):
+                    position.entry_price = price  # 새 포지션 또는 반대 방향으로 넘어감
+                elif (held > 0) == (quantity > 0):
+                    position.entry_price = (held * position.entry_price + quantity * price) / new_quantity
+                self._last_price[fill['symbol']] = price
+            if abs(new_quantity) < RECONCILE_TOLERANCE:
+                new_quantity = 0.0
+            self._set_quantity(key, position, new_quantity)
+            position.updated_at = fill.get('ts') or time.time()
+            position.source = 'fill'
+            self.stats['fills'] += 1
+
+    def apply_snapshot(self, exchange: str, positions: List[Dict[str, Any]], requested_at: float) -> int:
+        """거래소 포지션 스냅샷과 비교해 다른 포지션을 고치고 고친 수를 반환합니다.
+
+        스냅샷 요청 이후에 체결로 갱신된 포지션은 스냅샷에 아직 반영되지 않았을
+        수 있으므로 건너뜁니다. 스냅샷에 없는 포지션은 청산된 것으로 봅니다.
+        """
+        snapshot = {position['symbol']: position for position in positions}
+        drifts = 0
+        with self._lock:
+            keys = {key for key in self._positions if key[0] == exchange}
+            keys.update((exchange, symbol) for symbol in snapshot)
+            for key in keys:
+                position = self._positions.get(key)
+                if position is not None and position.updated_at > requested_at:
+                    continue
+                remote = snapshot.get(key[1])
+                quantity = remote['quantity'] if remote else 0.0
+                if position is None:
+                    if not quantity:
+                        continue
+                    position = self._positions[key] = Position()
+                if abs(position.quantity - quantity) > RECONCILE_TOLERANCE:
+                    logger.warning(f"Position drift on {exchange} {key[1]}: ledger {position.quantity}, "
+                                   f"exchange {quantity}")
+                    drifts += 1
+                self._set_quantity(key, position, quantity)
+                if remote:
+                    position.entry_price = remote.get('entry_price') or position.entry_price
+                    if remote.get('mark_price'):
+                        self._last_price[key[1]] = remote['mark_price']
+                position.updated_at = requested_at
+                position.source = 'snapshot'
+            self.stats['drifts'] += drifts
+        return drifts
+
+    # ---- 조회 (O(1)) ----
+
+    def position(self, exchange: str, symbol: str) -> float:
+        """거래소/코인의 포지션 수량 (코인 단위, 롱 +)"""
+        position = self._positions.get((exchange, symbol))
+        return position.quantity if position else 0.0
+
+    def net_exposure(self, symbol: str) -> float:
+        """코인의 모든 거래소 포지션 합 (코인 단위). 헤지가 맞으면 0 입니다."""
+        return self._net.get(symbol, 0.0)
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        return self._last_price.get(symbol)
+
+    def get_position(self, exchange: str, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            position = self._positions.get((exchange, symbol))
+            return position.to_dict() if position else None
+
+    def check_order(self, legs: List[Tuple[str, str, str, float, float]],
+                    price: Optional[float] = None) -> Tuple[bool, str]:
+        """주문 전 노출 한도 확인. legs 는 (거래소, 코인, side, 주문 계약 수, 계약 크기) 목록이며
+        계약 수 x 계약 크기를 코인 수량으로 봅니다 (USDT 금액을 넘기면 안 됩니다).
+
+        주문 후 코인별 전체 포지션(max_notional)이나 순노출(max_skew)이 한도를
+        넘고 주문 전보다 커지는 경우에만 거부합니다 (줄이는 주문은 허용).
+        """
+        if self.max_notional is None and self.max_skew is None:
+            return True, ''
+
+        symbols: Dict[str, List[float]] = {}
+        with self._lock:
+            for exchange, symbol, side, amount, contract_size in legs:
+                quantity = amount * contract_size * (1 if side == 'buy' else -1)
+                held = self.position(exchange, symbol)
+                net, gross = symbols.setdefault(symbol, [self._net.get(symbol, 0.0), self._gross.get(symbol, 0.0)])
+                symbols[symbol] = [net + quantity, gross + abs(held + quantity) - abs(held)]
+
+            for symbol, (net_after, gross_after) in symbols.items():
+                mark = price or self._last_price.get(symbol)
+                if not mark:
+                    continue  # 가격을 모르면 확인하지 않음
+                net_before, gross_before = self._net.get(symbol, 0.0), self._gross.get(symbol, 0.0)
+                if (self.max_notional is not None and gross_after * mark > self.max_notional
+                        and gross_after > gross_before):
+                    self.stats['rejected'] += 1
+                    return False, (f"{symbol} 포지션 한도 초과: {gross_after * mark:.2f} USDT "
+                                   f"(한도 {self.max_notional:.2f})")
+                if (self.max_skew is not None and abs(net_after) * mark > self.max_skew
+                        and abs(net_after) > abs(net_before)):
+                    self.stats['rejected'] += 1
+                    return False, (f"{symbol} 순노출 한도 초과: {net_after * mark:+.2f} USDT "
+                                   f"(한도 {self.max_skew:.2f})")
+        return True, ''
+
+    # ---- 스냅샷 대조 ----
+
+    def start(self):
+        """reconcile_interval 마다 거래소 포지션과 대조하는 스레드를 시작합니다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='position-reconcile', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.reconcile()
+            self._stop_event.wait(self.reconcile_interval)
+
+    def reconcile(self, exchanges: Optional[List[str]] = None):
+        """준비된 거래소의 포지션 스냅샷을 받아 장부와 대조합니다."""
+        for exchange in exchanges or list(self.trading.EXCHANGE_NAMES):
+            if not self.trading.is_ready(exchange):
+                continue
+            requested_at = time.time()
+            try:
+                positions = self.trading.fetch_positions(exchange)
+            except Exception as e:
+                logger.error(f"Failed to fetch {exchange} positions for reconciliation: {e}")
+                continue
+            drifts = self.apply_snapshot(exchange, positions, requested_at)
+            if drifts:
+                logger.warning(f"Reconciled {drifts} {exchange} positions from exchange snapshot")
+        self.stats['reconciles'] += 1
+        self.stats['last_reconcile'] = time.time()
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            positions = {f"{exchange}:{symbol}": position.to_dict()
+                         for (exchange, symbol), position in self._positions.items() if position.quantity}
+            net = {symbol: quantity for symbol, quantity in self._net.items() if quantity}
+        return {**self.stats, 'positions': positions, 'net_exposure': net,
+                'limits': {'max_notional': self.max_notional, 'max_skew': self.max_skew}}
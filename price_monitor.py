@@ -1,27 +1,61 @@
 import logging
+import os
+import threading
 import time
-from datetime import datetime
-from typing import Optional, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Tuple, Set
 from telegram_notifier import TelegramNotifier
-from trading import TradingExecutor
+from trading import TradingExecutor, get_trading_executor
+from market_data import EXCHANGE_NAMES, DEFAULT_PAIRS, format_orderbook_data
+from alert_dedup import AlertDedupStore
 
 logger = logging.getLogger(__name__)
 
+# 화면용 거래소 이름 ('MEXC Futures') -> 거래소 id ('mexc')
+EXCHANGE_IDS = {name: exchange for exchange, name in EXCHANGE_NAMES.items()}
+
+# 자동 트레이딩 기본 설정 (백테스트도 같은 값을 기본으로 사용)
+DEFAULT_TRADING_THRESHOLDS = {
+    'entry_long': 0.05,   # MEXC에서 숏, Bitget에서 롱 진입 임계값
+    'entry_short': -0.06  # MEXC에서 롱, Bitget에서 숏 진입 임계값
+}
+SAFETY_MARGIN = 0.95  # 계산된 거래 가능 수량 중 실제 사용 비율
+TRADE_COOLDOWN = 60  # 같은 코인 재진입 최소 간격 (초)
+
+
+def entry_signal(gap, thresholds: Dict[str, float]):
+    """가격차가 진입 임계값을 넘었는지 판단합니다. 1: 롱 진입, -1: 숏 진입, 0: 없음
+
+    gap 에 numpy 배열을 넘기면 원소별 결과를 배열로 반환합니다 (백테스트용).
+    """
+    long_entry = gap >= thresholds['entry_long']
+    short_entry = (gap <= thresholds['entry_short']) & ~long_entry
+    return long_entry * 1 - short_entry * 1
+
+
+def entry_min_edge(gap: float, thresholds: Dict[str, float]) -> float:
+    """거래 수량 계산에 쓰는 최소 기대 수익률(%) (넘은 진입 임계값의 크기)"""
+    return thresholds['entry_long'] if gap >= 0 else abs(thresholds['entry_short'])
+
+
 class PriceGapMonitor:
-    def __init__(self):
+    def __init__(self, market_data=None, trading: Optional[TradingExecutor] = None):
         logger.info("Initializing PriceGapMonitor...")
         try:
             self.telegram = TelegramNotifier()
-            self.trading = TradingExecutor()
+            self.trading = trading or get_trading_executor()
+            self.market_data = market_data
 
             # 트레이딩 설정
-            self.trading_thresholds = {
-                'entry_long': 0.05,   # MEXC에서 숏, Bitget에서 롱 진입 임계값
-                'entry_short': -0.06  # MEXC에서 롱, Bitget에서 숏 진입 임계값
-            }
+            self.trading_thresholds = dict(DEFAULT_TRADING_THRESHOLDS)
 
-            # 감시할 코인 목록
-            self.trading_symbols = ['DOGE/USDT', 'XRP/USDT']
+            # 자동 매매할 코인 목록 (가격차 알림은 시세 캐시의 모든 코인에 대해 동작)
+            self.trading_symbols = [symbol.strip() for symbol in
+                                    os.environ.get('TRADING_SYMBOLS', 'DOGE/USDT,XRP/USDT').split(',')
+                                    if symbol.strip()]
+
+            # 주문 경로에서 마진/레버리지 설정 호출을 없애기 위해 미리 적용
+            self.trading.prewarm_account_config(self.trading_symbols)
 
             # 기존 알림용 임계값 설정 유지
             self.thresholds = {
@@ -31,8 +65,33 @@ class PriceGapMonitor:
                 }
             }
 
+            # 감시할 거래소 쌍 (거래소1, 기준 거래소)
+            self.exchange_pairs = list(DEFAULT_PAIRS)
+
             self.running = False
-            self.last_check: Dict[str, datetime] = {}
+            # 가격차 에피소드당 한 번만 알림 (임계값의 절반 안쪽으로 돌아오면 에피소드 종료)
+            self.alert_dedup = AlertDedupStore(ttl=1800, release_ratio=0.5)
+
+            # 이벤트 기반 감지 루프 상태
+            self.trade_cooldown = TRADE_COOLDOWN
+            self.last_trade: Dict[str, float] = {}
+            self.trades_in_flight: Set[str] = set()
+            self.stats = {
+                'ticks_received': 0,
+                'ticks_processed': 0,
+                'gaps_detected': 0,
+                'trades_triggered': 0,
+                'eval_time_ms_total': 0.0,
+                'eval_time_ms_max': 0.0
+            }
+            self._pending_symbols: Set[str] = set()
+            self._pending_lock = threading.Lock()
+            self._wakeup = threading.Event()
+            self._worker: Optional[threading.Thread] = None
+            self._action_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='monitor-action')
+
+            if self.market_data is not None:
+                self.market_data.add_listener(self.on_market_update)
 
             logger.info("PriceGapMonitor initialized successfully")
         except Exception as e:
@@ -46,6 +105,7 @@ class PriceGapMonitor:
             self.running = True
 
             if self.test_telegram():
+                self._start_worker()
                 logger.info("Price gap monitoring started successfully")
                 self.telegram.send_message(
                     "🔄 자동 트레이딩 시스템이 시작되었습니다.\n"
@@ -66,17 +126,113 @@ class PriceGapMonitor:
         try:
             logger.info("Stopping price gap monitoring...")
             self.running = False
+            self._wakeup.set()
+            if self._worker:
+                self._worker.join(timeout=5)
+                self._worker = None
             self.telegram.send_message("🛑 자동 트레이딩 시스템이 중지되었습니다.")
             logger.info("Price gap monitoring stopped")
         except Exception as e:
             logger.error(f"Failed to stop price gap monitoring: {e}")
             raise
 
+    def _start_worker(self):
+        """시세 갱신을 처리하는 감지 스레드를 시작합니다."""
+        if self._worker and self._worker.is_alive():
+            return
+        if self.market_data is None:
+            logger.warning("No market data source attached, detection loop will not receive ticks")
+        self._worker = threading.Thread(target=self._run, name='price-gap-monitor', daemon=True)
+        self._worker.start()
+
+    def on_market_update(self, exchange: str, symbol: str):
+        """시세 캐시 갱신 콜백. 코인 단위로 모아 감지 스레드에 전달합니다."""
+        if not self.running:
+            return
+        with self._pending_lock:
+            self.stats['ticks_received'] += 1
+            self._pending_symbols.add(symbol)
+        self._wakeup.set()
+
+    def _run(self):
+        logger.info("Price gap detection loop started")
+        while self.running:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            with self._pending_lock:
+                symbols, self._pending_symbols = self._pending_symbols, set()
+
+            for symbol in symbols:
+                started = time.perf_counter()
+                for exchange1, exchange2 in self.exchange_pairs:
+                    pair = self._build_pair_data(symbol, exchange1, exchange2)
+                    if pair:
+                        self.process_exchange_data(*pair)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                self.stats['ticks_processed'] += 1
+                self.stats['eval_time_ms_total'] += elapsed_ms
+                self.stats['eval_time_ms_max'] = max(self.stats['eval_time_ms_max'], elapsed_ms)
+        logger.info("Price gap detection loop stopped")
+
+    def _build_pair_data(self, symbol: str, exchange1: str, exchange2: str) -> Optional[Tuple[dict, dict]]:
+        """시세 캐시의 최신 스냅샷으로 process_exchange_data 입력을 만듭니다."""
+        snapshot1 = self.market_data.get_snapshot(exchange1, symbol)
+        snapshot2 = self.market_data.get_snapshot(exchange2, symbol)
+        if not snapshot1 or not snapshot2:
+            return None
+
+        price1 = float(snapshot1['ticker']['last'])
+        price2 = float(snapshot2['ticker']['last'])
+        gap = ((price1 - price2) / price2) * 100
+        data1 = format_orderbook_data(EXCHANGE_NAMES[exchange1], symbol, snapshot1['orderbook'],
+                                      price1, gap, price1 - price2, snapshot1['age_ms'])
+        data2 = format_orderbook_data(EXCHANGE_NAMES[exchange2], symbol, snapshot2['orderbook'],
+                                      price2, 0, 0, snapshot2['age_ms'])
+
+        # 거래 수량 계산에는 상위 3단계가 아닌 전체 호가창(OrderBook)을 사용
+        data1['orderbook'] = snapshot1['orderbook']
+        data2['orderbook'] = snapshot2['orderbook']
+        return data1, data2
+
+    def get_stats(self) -> dict:
+        """감지 루프 카운터를 반환합니다."""
+        stats = dict(self.stats)
+        processed = stats['ticks_processed']
+        stats['eval_time_ms_avg'] = stats['eval_time_ms_total'] / processed if processed else 0.0
+        stats['running'] = self.running
+        stats['notifications'] = self.telegram.get_metrics()
+        stats['alerts'] = self.get_alert_stats()
+        return stats
+
+    def get_alert_stats(self) -> dict:
+        """가격차 알림 에피소드별 발송/억제 건수를 반환합니다."""
+        return self.alert_dedup.get_stats()
+
+    def _submit_trade(self, data1: dict, data2: dict, gap: float):
+        """진행 중인 거래나 재진입 대기시간이 없을 때만 차익거래를 백그라운드로 실행합니다."""
+        symbol = data1['symbol']
+        now = time.time()
+        if symbol in self.trades_in_flight or now - self.last_trade.get(symbol, 0) < self.trade_cooldown:
+            return
+
+        self.trades_in_flight.add(symbol)
+        self.last_trade[symbol] = now
+        self.stats['trades_triggered'] += 1
+
+        def run():
+            try:
+                self.execute_arbitrage_trades(data1, data2, gap)
+            finally:
+                self.trades_in_flight.discard(symbol)
+
+        self._action_pool.submit(run)
+
     def test_telegram(self) -> bool:
         """텔레그램 봇 연결 테스트"""
         try:
             logger.info("Testing Telegram connection...")
-            if self.telegram.send_message("🔄 테스트 메시지: MEXC-Bitget 가격 알림 시스템 작동 중"):
+            if self.telegram.send_message_now("🔄 테스트 메시지: MEXC-Bitget 가격 알림 시스템 작동 중"):
                 logger.info("Telegram test message sent successfully")
                 return True
             return False
@@ -84,54 +240,77 @@ class PriceGapMonitor:
             logger.error(f"Telegram test failed: {e}")
             return False
 
-    def execute_arbitrage_trades(self, mexc_data: dict, bitget_data: dict, gap: float):
-        """차익거래 주문을 실행합니다."""
+    def execute_arbitrage_trades(self, data1: dict, data2: dict, gap: float):
+        """가격차를 발견한 거래소 쌍(data1 거래소, data2 기준 거래소)에 차익거래 주문을 실행합니다."""
         try:
-            # 거래 가능 금액 계산
-            tradable_amount = self.trading.calculate_tradable_amount(mexc_data, bitget_data)
-            if tradable_amount <= 0:
+            exchange1 = EXCHANGE_IDS[data1['exchange']]
+            exchange2 = EXCHANGE_IDS[data2['exchange']]
+            name1 = data1['exchange'].split(' ')[0]
+            name2 = data2['exchange'].split(' ')[0]
+
+            # 거래소별 주문 계약 수 계산 (호가 깊이와 수수료 반영, 95%만 사용하여 안전마진 확보)
+            threshold = entry_min_edge(gap, self.trading_thresholds)
+            trade_amounts = self.trading.calculate_tradable_amount(
+                data1['orderbook'],
+                data2['orderbook'],
+                gap,
+                threshold,
+                exchange1,
+                exchange2,
+                symbol=data1['symbol'],
+                safety_margin=SAFETY_MARGIN
+            )
+            if not trade_amounts or min(trade_amounts.values()) <= 0:
                 logger.error("Invalid tradable amount calculated")
                 return
 
-            # 실제 거래에 사용할 금액 (USDT)
-            trade_amount = tradable_amount * 0.95  # 95%만 사용하여 안전마진 확보
-
             success = False
             message = ""
+            report = {}
 
             if gap >= self.trading_thresholds['entry_long']:
-                # MEXC에서 숏, Bitget에서 롱
-                logger.info(f"Executing long arbitrage trades for gap {gap:.2f}%")
-                success, message = self.trading.execute_simultaneous_orders(
-                    mexc_data['symbol'],
-                    bitget_data['symbol'],
-                    'sell',  # MEXC 숏
-                    'buy',   # Bitget 롱
-                    trade_amount
+                # 거래소1에서 숏, 기준 거래소에서 롱
+                logger.info(f"Executing long arbitrage trades on {exchange1}-{exchange2} for gap {gap:.2f}%")
+                success, message, report = self.trading.execute_simultaneous_orders(
+                    data1['symbol'],
+                    data2['symbol'],
+                    'sell',  # 거래소1 숏
+                    'buy',   # 기준 거래소 롱
+                    trade_amounts,
+                    price=float(data1['last_price']),
+                    exchange1=exchange1,
+                    exchange2=exchange2
                 )
 
             elif gap <= self.trading_thresholds['entry_short']:
-                # MEXC에서 롱, Bitget에서 숏
-                logger.info(f"Executing short arbitrage trades for gap {gap:.2f}%")
-                success, message = self.trading.execute_simultaneous_orders(
-                    mexc_data['symbol'],
-                    bitget_data['symbol'],
-                    'buy',   # MEXC 롱
-                    'sell',  # Bitget 숏
-                    trade_amount
+                # 거래소1에서 롱, 기준 거래소에서 숏
+                logger.info(f"Executing short arbitrage trades on {exchange1}-{exchange2} for gap {gap:.2f}%")
+                success, message, report = self.trading.execute_simultaneous_orders(
+                    data1['symbol'],
+                    data2['symbol'],
+                    'buy',   # 거래소1 롱
+                    'sell',  # 기준 거래소 숏
+                    trade_amounts,
+                    price=float(data1['last_price']),
+                    exchange1=exchange1,
+                    exchange2=exchange2
                 )
 
             # 거래 결과 텔레그램 알림 전송
             if success:
                 direction = "롱" if gap >= self.trading_thresholds['entry_long'] else "숏"
-                price_diff = abs(float(mexc_data['last_price']) - float(bitget_data['last_price']))
+                price_diff = abs(float(data1['last_price']) - float(data2['last_price']))
+                notional = (trade_amounts[exchange2] * self.trading.contract_size(exchange2, data2['symbol'])
+                            * float(data2['last_price']))
                 message = (
-                    f"✅ 차익거래 실행 완료 ({direction})\n"
-                    f"코인: {mexc_data['symbol']}\n"
+                    f"✅ 차익거래 실행 완료 ({direction}, {name1}-{name2})\n"
+                    f"코인: {data1['symbol']}\n"
                     f"갭: {gap:+.2f}% ({price_diff:.4f} USDT)\n"
-                    f"MEXC 가격: {mexc_data['last_price']:.4f} USDT\n"
-                    f"Bitget 가격: {bitget_data['last_price']:.4f} USDT\n"
-                    f"거래금액: {trade_amount:.2f} USDT\n"
+                    f"{name1} 가격: {data1['last_price']:.4f} USDT\n"
+                    f"{name2} 가격: {data2['last_price']:.4f} USDT\n"
+                    f"거래수량: {name1} {trade_amounts[exchange1]:g} / {name2} {trade_amounts[exchange2]:g} 계약\n"
+                    f"거래금액: 약 {notional:.2f} USDT\n"
+                    f"주문 시간차: {report['skew_ms']:.1f}ms\n"
                     "거래 모드: Cross 모드, 1배 레버리지"
                 )
             else:
@@ -151,47 +330,69 @@ class PriceGapMonitor:
 
             # MEXC-Bitget 또는 Gate.io-Bitget 거래소 쌍에 대해서만 자동 트레이딩 실행
             if data1['exchange'].startswith('MEXC') and data2['exchange'].startswith('Bitget'):
-                if data1['symbol'] in self.trading_symbols:  # XRP와 DOGE 코인만 처리
+                if data1['symbol'] in self.trading_symbols:  # 자동 매매 대상 코인만 처리
                     price1 = float(data1['last_price'])
                     price2 = float(data2['last_price'])
                     gap = ((price1 - price2) / price2) * 100
 
                     # 자동 트레이딩 조건 확인 및 실행
-                    if gap >= self.trading_thresholds['entry_long'] or gap <= self.trading_thresholds['entry_short']:
-                        self.execute_arbitrage_trades(data1, data2, gap)
+                    if entry_signal(gap, self.trading_thresholds):
+                        self.stats['gaps_detected'] += 1
+                        self._submit_trade(data1, data2, gap)
 
             elif data1['exchange'].startswith('Gate.io') and data2['exchange'].startswith('Bitget'):
-                if data1['symbol'] in self.trading_symbols:  # XRP와 DOGE 코인만 처리
+                if data1['symbol'] in self.trading_symbols:  # 자동 매매 대상 코인만 처리
                     price1 = float(data1['last_price'])
                     price2 = float(data2['last_price'])
                     gap = ((price1 - price2) / price2) * 100
 
                     # 자동 트레이딩 조건 확인 및 실행
-                    if gap >= self.trading_thresholds['entry_long'] or gap <= self.trading_thresholds['entry_short']:
-                        self.execute_arbitrage_trades(data1, data2, gap)
+                    if entry_signal(gap, self.trading_thresholds):
+                        self.stats['gaps_detected'] += 1
+                        self._submit_trade(data1, data2, gap)
 
             # 기존 알림 로직 실행
+            pair = f"{data1['exchange']}-{data2['exchange']}"
             gap_info = self.check_price_gap(data1, data2)
             if not gap_info:
+                # 임계값 아래 관측값으로 진행 중인 에피소드의 종료 여부를 판단
+                self.alert_dedup.observe(pair, data1['symbol'], float(data1.get('price_gap', 0)))
                 return
 
             gap, symbol = gap_info
-            current_time = datetime.now()
-            alert_key = f"{symbol}-{gap:.2f}"
-
-            # 마지막 알림으로부터 최소 5분이 지났는지 확인
-            if alert_key in self.last_check:
-                time_since_last = current_time - self.last_check[alert_key]
-                if time_since_last.total_seconds() < 300:  # 5분 = 300초
-                    return
+            threshold = self.thresholds.get(data1['exchange'].split(' ')[0], self.thresholds['MEXC'])
+            direction, level = ('up', threshold['entry']) if gap >= 0 else ('down', threshold['exit'])
+            if not self.alert_dedup.observe(pair, symbol, gap, direction, level):
+                return
 
-            # 텔레그램 알림 전송
-            if self.telegram.send_gap_alert(data1['exchange'], data2['exchange'], data1, data2, gap):
-                self.last_check[alert_key] = current_time
+            # 텔레그램 알림 (발송 대기열에 넣고 바로 반환)
+            sizing = self.gap_alert_sizing(data1, data2, gap)
+            self.telegram.send_gap_alert(data1['exchange'], data2['exchange'], data1, data2, gap, sizing)
 
         except Exception as e:
             logger.error(f"데이터 처리 중 오류 발생: {e}")
 
+    def gap_alert_sizing(self, data1: dict, data2: dict, gap: float) -> dict:
+        """가격차 알림에 표시할 거래 가능 수량을 자동 매매와 같은 기준으로 계산합니다.
+
+        수수료, 계약 크기, 진입 임계값(entry_min_edge), 안전마진을 execute_arbitrage_trades 와
+        똑같이 적용하므로 알림의 거래가능금액과 실제 주문 금액이 일치합니다.
+        """
+        try:
+            return self.trading.calculate_depth_sizing(
+                data1.get('orderbook', data1),
+                data2.get('orderbook', data2),
+                gap,
+                entry_min_edge(gap, self.trading_thresholds),
+                EXCHANGE_IDS[data1['exchange']],
+                EXCHANGE_IDS[data2['exchange']],
+                symbol=data1['symbol'],
+                safety_margin=SAFETY_MARGIN
+            )
+        except Exception as e:
+            logger.error(f"Failed to size gap alert: {e}")
+            return {}
+
     def check_price_gap(self, data1: dict, data2: dict) -> Optional[Tuple[float, str]]:
         """주어진 거래소 데이터에서 가격 갭을 확인합니다."""
         try:
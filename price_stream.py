@@ -0,0 +1,228 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+import pytz
+
+from market_data import DEFAULT_SYMBOLS, build_orderbook_rows
+
+logger = logging.getLogger(__name__)
+
+KST = pytz.timezone('Asia/Seoul')
+
+# 변경 여부 비교에서 제외하는 필드 (매 틱마다 바뀌는 값)
+VOLATILE_FIELDS = ('age_ms', 'timestamp')
+
+
+def sse_frame(event: str, data: str) -> str:
+    """Server-Sent Events 프레임 문자열을 만듭니다."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class StreamClient:
+    """접속한 대시보드 하나의 전송 대기열
+
+    키(코인|거래소)별로 가장 최신 프레임만 보관하므로 느린 클라이언트가 있어도
+    대기열은 코인 x 거래소 수를 넘지 않고, 밀린 중간 값은 버려집니다.
+    """
+
+    def __init__(self, client_id: int):
+        self.client_id = client_id
+        self.connected_at = time.time()
+        self.last_drain = time.monotonic()
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self._pending: 'OrderedDict[str, str]' = OrderedDict()
+        self._condition = threading.Condition()
+
+    def push(self, key: str, frame: str):
+        with self._condition:
+            if key in self._pending:
+                self.coalesced += 1
+                del self._pending[key]
+            self._pending[key] = frame
+            self._condition.notify()
+
+    def drain(self, timeout: float) -> List[str]:
+        """대기 중인 프레임을 모두 꺼냅니다. timeout 동안 없으면 빈 리스트를 반환합니다."""
+        with self._condition:
+            if not self._pending and not self.closed:
+                self._condition.wait(timeout)
+            frames = list(self._pending.values())
+            self._pending.clear()
+            self.last_drain = time.monotonic()
+        self.sent += len(frames)
+        return frames
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+
+    def backlog(self) -> int:
+        return len(self._pending)
+
+
+class PriceStreamHub:
+    """시세 캐시의 변경분을 모든 대시보드에 푸시하는 SSE 팬아웃 허브
+
+    시세 캐시 갱신 알림을 받으면 interval 마다 변경된 코인의 행만 한 번
+    직렬화해서 모든 클라이언트 대기열에 넣습니다. 접속 수가 늘어도 거래소
+    호출이나 JSON 직렬화는 늘지 않고 전송만 늘어납니다.
+    """
+
+    def __init__(self, market_data, symbols: Optional[List[str]] = None, interval: float = 0.25,
+                 max_clients: int = 50, client_timeout: float = 30.0):
+        self.market_data = market_data
+        self.symbols = symbols or DEFAULT_SYMBOLS
+        self.interval = interval
+        self.max_clients = max_clients
+        self.client_timeout = client_timeout
+
+        self._clients: Dict[int, StreamClient] = {}
+        self._next_client_id = 1
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # (코인|거래소) 별 마지막으로 보낸 프레임과 비교용 내용
+        self._frames: 'OrderedDict[str, str]' = OrderedDict()
+        self._signatures: Dict[str, str] = {}
+        self._time_frame = ''
+        self.stats = {'broadcasts': 0, 'frames_serialized': 0, 'clients_dropped': 0}
+
+        market_data.add_listener(self.on_market_update)
+
+    def on_market_update(self, exchange: str, symbol: str):
+        """시세 캐시 갱신 알림 (갱신 스레드에서 호출됨)"""
+        with self._lock:
+            self._dirty.add(symbol)
+        self._wakeup.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        with self._lock:
+            self._dirty.update(self.symbols)
+        self._thread = threading.Thread(target=self._run, name='price-stream', daemon=True)
+        self._thread.start()
+        logger.info("Price stream hub started")
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def subscribe(self) -> Optional[StreamClient]:
+        """새 클라이언트를 등록하고 현재 전체 상태를 대기열에 넣습니다. 접속 수 초과 시 None."""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            client = StreamClient(self._next_client_id)
+            self._next_client_id += 1
+            for key, frame in self._frames.items():
+                client.push(key, frame)
+            if self._time_frame:
+                client.push('time', self._time_frame)
+            self._clients[client.client_id] = client
+        logger.info(f"Stream client {client.client_id} connected ({len(self._clients)} total)")
+        return client
+
+    def unsubscribe(self, client: StreamClient):
+        client.close()
+        with self._lock:
+            self._clients.pop(client.client_id, None)
+        logger.info(f"Stream client {client.client_id} disconnected "
+                    f"(sent {client.sent}, coalesced {client.coalesced})")
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = [
+                {
+                    'id': client.client_id,
+                    'connected_at': client.connected_at,
+                    'backlog': client.backlog(),
+                    'sent': client.sent,
+                    'coalesced': client.coalesced
+                }
+                for client in self._clients.values()
+            ]
+        return {**self.stats, 'clients': clients}
+
+    def _run(self):
+        last_time_push = 0.0
+        while self._running:
+            self._wakeup.wait(1.0)
+            self._wakeup.clear()
+            if not self._running:
+                break
+
+            try:
+                frames = self._collect_changes()
+                now = time.time()
+                if int(now) != int(last_time_push):
+                    last_time_push = now
+                    frames['time'] = self._build_time_frame()
+                if frames:
+                    self._broadcast(frames)
+            except Exception as e:
+                logger.error(f"Price stream broadcast failed: {e}")
+
+            time.sleep(self.interval)  # 이 사이에 들어온 갱신은 다음 전송에 합쳐짐
+
+    def _collect_changes(self) -> Dict[str, str]:
+        """변경된 코인의 행 중 내용이 바뀐 것만 직렬화합니다."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        frames: Dict[str, str] = {}
+        for symbol in dirty:
+            for row in build_orderbook_rows(self.market_data, symbol):
+                key = f"{symbol}|{row['exchange']}"
+                signature = json.dumps([row[field] for field in row if field not in VOLATILE_FIELDS])
+                if self._signatures.get(key) == signature:
+                    continue
+                self._signatures[key] = signature
+                frames[key] = sse_frame('row', json.dumps(row))
+                self.stats['frames_serialized'] += 1
+        return frames
+
+    def _build_time_frame(self) -> str:
+        current_time = datetime.now(KST)
+        self._time_frame = sse_frame('time', json.dumps({
+            'timestamp': int(current_time.timestamp() * 1000),
+            'formatted_time': current_time.strftime('%H:%M:%S')
+        }))
+        return self._time_frame
+
+    def _broadcast(self, frames: Dict[str, str]):
+        now = time.monotonic()
+        with self._lock:
+            for key, frame in frames.items():
+                if key != 'time':
+                    self._frames[key] = frame
+            clients = list(self._clients.values())
+
+        for client in clients:
+            # 오랫동안 대기열을 비우지 못한 클라이언트는 연결을 끊음
+            if client.backlog() and now - client.last_drain > self.client_timeout:
+                logger.warning(f"Dropping stalled stream client {client.client_id}")
+                self.stats['clients_dropped'] += 1
+                self.unsubscribe(client)
+                continue
+            for key, frame in frames.items():
+                client.push(key, frame)
+        self.stats['broadcasts'] += 1
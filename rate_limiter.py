@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_ORDER = 0         # 주문, 포지션 조회/청산
+PRIORITY_MARKET_DATA = 1   # 시세/호가 조회
+PRIORITY_ACCOUNT = 2       # 잔액, 마진/레버리지 사전 설정, 대시보드용 조회
+
+PRIORITY_NAMES = {
+    PRIORITY_ORDER: 'order',
+    PRIORITY_MARKET_DATA: 'market_data',
+    PRIORITY_ACCOUNT: 'account'
+}
+
+# 거래소별 요청 한도 (초당 토큰, 최대 적립량). 토큰 1개는 ccxt 엔드포인트 cost 1 에 해당합니다.
+#   MEXC 선물: 엔드포인트별 20회/2초
+#   Gate.io 선물: 공개 API 200회/10초, 주문 100회/초 (계정 조회와 함께 보수적으로 20회/초)
+#   Bitget 선물: 시세 20회/초(IP), 주문/계정 10회/초(UID)
+VENUE_LIMITS = {
+    'mexc': {'public': (10.0, 20.0), 'private': (10.0, 20.0)},
+    'gateio': {'public': (20.0, 40.0), 'private': (20.0, 20.0)},
+    'bitget': {'public': (20.0, 20.0), 'private': (10.0, 10.0)}
+}
+
+# 낮은 우선순위 요청이 남겨 둬야 하는 토큰 비율 (주문용 여유분)
+RESERVE_RATIO = {
+    PRIORITY_ORDER: 0.0,
+    PRIORITY_MARKET_DATA: 0.2,
+    PRIORITY_ACCOUNT: 0.5
+}
+
+WAIT_SAMPLES = 512
+
+
+class RateLimitTimeout(Exception):
+    """요청 한도 대기가 timeout 을 넘었을 때 발생합니다."""
+
+
+class TokenBucket:
+    """우선순위 대기열이 있는 토큰 버킷
+
+    토큰은 초당 rate 개씩 capacity 까지 쌓입니다. 대기 중인 요청 중 우선순위가
+    가장 높은(먼저 온) 요청만 토큰을 가져갈 수 있으며, 낮은 우선순위 요청은
+    reserve 만큼의 토큰을 남겨 둬야 하므로 주문은 시세/대시보드 요청 뒤에서
+    기다리지 않습니다.
+    """
+
+    def __init__(self, rate: float, capacity: float, reserve_ratio: Optional[Dict[int, float]] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = {priority: capacity * ratio for priority, ratio in (reserve_ratio or RESERVE_RATIO).items()}
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight: float = 1.0, priority: int = PRIORITY_MARKET_DATA,
+                timeout: Optional[float] = None) -> float:
+        """토큰 weight 개를 가져옵니다. 기다린 시간(초)을 반환합니다."""
+        weight = min(weight, self.capacity)
+        needed = min(weight + self.reserve.get(priority, 0.0), self.capacity)
+        ticket = (priority, next(self._sequence))
+        started = time.monotonic()
+
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    is_next = self._waiters[0] == ticket
+                    if is_next and self.tokens >= needed:
+                        self.tokens -= weight
+                        return now - started
+
+                    remaining = None if timeout is None else timeout - (now - started)
+                    if remaining is not None and remaining <= 0:
+                        raise RateLimitTimeout(f"Waited {now - started:.2f}s for {weight} tokens")
+                    # 차례가 된 요청은 토큰이 찰 때까지만, 나머지는 앞 요청이 끝날 때까지 대기
+                    delay = max((needed - self.tokens) / self.rate, 0.001) if is_next else remaining
+                    if delay is not None and remaining is not None:
+                        delay = min(delay, remaining)
+                    self._cond.wait(delay)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def queued(self) -> int:
+        with self._cond:
+            return len(self._waiters)
+
+    def level(self) -> float:
+        with self._cond:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class RateLimitScheduler:
+    """거래소별 공개/개인 API 토큰 버킷으로 모든 ccxt 요청의 순서를 정하는 스케줄러
+
+    install() 로 ccxt 클라이언트의 throttle 을 교체하면, 각 요청은 ccxt 가 계산한
+    엔드포인트 cost 만큼 토큰을 가져간 뒤에 전송됩니다. 요청의 우선순위와
+    버킷(공개/개인)은 호출하는 쪽에서 context() 로 지정하며, 지정하지 않은
+    요청은 가장 낮은 우선순위로 처리합니다. 우선순위별 대기 시간을 기록합니다.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Tuple[float, float]]]] = None,
+                 default_timeout: Optional[Dict[int, Optional[float]]] = None):
+        limits = limits or VENUE_LIMITS
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {
+            (exchange, bucket): TokenBucket(rate, capacity)
+            for exchange, buckets in limits.items()
+            for bucket, (rate, capacity) in buckets.items()
+        }
+        # 우선순위별 최대 대기 시간 (주문은 무제한)
+        self.default_timeout = default_timeout or {
+            PRIORITY_ORDER: None,
+            PRIORITY_MARKET_DATA: 5.0,
+            PRIORITY_ACCOUNT: 30.0
+        }
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+    # ---- 우선순위 지정 ----
+
+    @contextmanager
+    def context(self, priority: int, bucket: str = 'public'):
+        """이 블록 안에서 현재 스레드가 보내는 요청의 우선순위와 버킷을 지정합니다."""
+        previous = getattr(self._local, 'context', None)
+        self._local.context = (priority, bucket)
+        try:
+            yield
+        finally:
+            self._local.context = previous
+
+    def current_context(self) -> Tuple[int, str]:
+        return getattr(self._local, 'context', None) or (PRIORITY_ACCOUNT, 'private')
+
+    # ---- 토큰 ----
+
+    def install(self, client, exchange: str):
+        """ccxt 클라이언트의 기본 throttle 대신 이 스케줄러를 사용하게 합니다."""
+        client.enableRateLimit = True
+
+        def throttle(cost=None):
+            priority, bucket = self.current_context()
+            self.acquire(exchange, bucket, priority, 1.0 if cost is None else float(cost))
+
+        client.throttle = throttle
+
+    def acquire(self, exchange: str, bucket: str = 'public', priority: int = PRIORITY_MARKET_DATA,
+                weight: float = 1.0, timeout: Optional[float] = None) -> float:
+        """토큰을 가져옵니다. 기다린 시간(초)을 반환하며, 한도가 없는 거래소는 바로 반환합니다."""
+        token_bucket = self.buckets.get((exchange, bucket))
+        if token_bucket is None:
+            return 0.0
+        if timeout is None:
+            timeout = self.default_timeout.get(priority)
+        try:
+            waited = token_bucket.acquire(weight, priority, timeout)
+        except RateLimitTimeout:
+            self._record(exchange, priority, timeout or 0.0, timed_out=True)
+            logger.warning(f"Rate limit wait timed out on {exchange} {bucket} "
+                           f"({PRIORITY_NAMES.get(priority, priority)})")
+            raise
+        self._record(exchange, priority, waited)
+        return waited
+
+    def budget(self, exchange: str, interval: float, bucket: str = 'public', utilization: float = 0.5) -> int:
+        """interval 초 동안 보낼 수 있는 cost 1 요청 수 (utilization 비율만 사용)"""
+        token_bucket = self.buckets.get((exchange, bucket))
+        if token_bucket is None:
+            return 1
+        return max(1, int(token_bucket.rate * interval * utilization))
+
+    # ---- 지표 ----
+
+    def _record(self, exchange: str, priority: int, waited: float, timed_out: bool = False):
+        with self._stats_lock:
+            stats = self._stats.get((exchange, priority))
+            if stats is None:
+                stats = self._stats[(exchange, priority)] = {
+                    'requests': 0, 'timeouts': 0, 'waited': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+                    'samples': deque(maxlen=WAIT_SAMPLES)
+                }
+            wait_ms = waited * 1000
+            stats['requests'] += 1
+            stats['timeouts'] += int(timed_out)
+            stats['waited'] += int(wait_ms >= 1.0)
+            stats['wait_ms_total'] += wait_ms
+            stats['wait_ms_max'] = max(stats['wait_ms_max'], wait_ms)
+            stats['samples'].append(wait_ms)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """거래소/우선순위별 요청 수와 대기 시간, 버킷별 토큰 잔량과 대기열 길이를 반환합니다."""
+        with self._stats_lock:
+            queue_time = {}
+            for (exchange, priority), stats in self._stats.items():
+                samples = sorted(stats['samples'])
+                queue_time.setdefault(exchange, {})[PRIORITY_NAMES.get(priority, str(priority))] = {
+                    'requests': stats['requests'],
+                    'timeouts': stats['timeouts'],
+                    'waited': stats['waited'],
+                    'wait_ms_avg': stats['wait_ms_total'] / stats['requests'],
+                    'wait_ms_p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0,
+                    'wait_ms_max': stats['wait_ms_max']
+                }
+        buckets = {
+            f"{exchange}:{bucket}": {
+                'rate': token_bucket.rate,
+                'capacity': token_bucket.capacity,
+                'tokens': round(token_bucket.level(), 3),
+                'queued': token_bucket.queued()
+            }
+            for (exchange, bucket), token_bucket in self.buckets.items()
+        }
+        return {'queue_time': queue_time, 'buckets': buckets}
@@ -7,6 +7,7 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from sheets_writer import SheetsAppendWriter
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,7 @@ class SheetsLogger:
         self.SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
         self.creds = None
         self.service = None
+        self.writer: Optional[SheetsAppendWriter] = None
         self.spreadsheet_id = os.environ.get('GOOGLE_SHEETS_ID')
 
         # 시트 범위 설정
@@ -66,6 +68,10 @@ class SheetsLogger:
 
                 # 헤더 추가
                 self._initialize_headers()
+
+                # 행 기록은 백그라운드에서 모아서 append
+                self.writer = SheetsAppendWriter(self.service, self.spreadsheet_id)
+                self.writer.start()
                 logger.info("Google Sheets API initialized successfully")
                 return True
 
@@ -135,25 +141,20 @@ class SheetsLogger:
                 ]
             ]
             
-            # 시트 선택 및 업데이트
+            # 시트 선택 후 버퍼에 추가 (다음 빈 행 조회 없이 append 로 기록됨)
             sheet_range = self.MEXC_SHEET_RANGE if is_mexc else self.GATE_SHEET_RANGE
             sheet_name = sheet_range.split('!')[0]
-            
-            # 다음 빈 행 찾기
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=sheet_range
-            ).execute()
-            next_row = len(result.get('values', [])) + 1
-            
-            # 데이터 추가
-            self._update_values(
-                sheet_name,
-                f'A{next_row}:G{next_row}',
-                row_data
-            )
-            
-            logger.info(f"Successfully logged price gap data to {sheet_name}")
+            if not self.writer:
+                logger.warning("Google Sheets writer is not initialized, skipping price gap log")
+                return
+            self.writer.add(sheet_range, row_data[0])
+
+            logger.debug(f"Queued price gap data for {sheet_name}")
             
         except Exception as e:
-            logger.error(f"Failed to log price gap: {e}")
\ No newline at end of file
+            logger.error(f"Failed to log price gap: {e}")
+
+    def close(self):
+        """버퍼에 남은 행을 기록하고 writer 를 중지합니다."""
+        if self.writer:
+            self.writer.stop()
\ No newline at end of file
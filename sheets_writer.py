@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+
+class SheetsAppendWriter:
+    """구글 시트에 행을 모아서 values().append 로 한 번에 추가하는 백그라운드 writer
+
+    add() 는 메모리 버퍼에 행을 넣고 바로 반환합니다. 버퍼가 batch_size 에
+    도달하거나 flush_interval 이 지나면 시트 범위별로 append 요청 한 번에
+    기록합니다. API 호출이 실패하면 행을 spill_path(JSONL)에 저장해 두고,
+    다음 성공 시 새 행보다 먼저 다시 기록합니다.
+
+    service 는 googleapiclient 의 build('sheets', 'v4') 결과이며,
+    spreadsheets().values().append(...).execute() 만 사용하므로 테스트에서는
+    같은 형태의 스텁으로 대체할 수 있습니다.
+    """
+
+    def __init__(self, service, spreadsheet_id: str, batch_size: int = 50, flush_interval: float = 5.0,
+                 spill_path: Optional[str] = None, max_backoff: float = 60.0):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path or os.environ.get('SHEETS_SPILL_PATH', '.cache/sheets_spill.jsonl')
+        self.max_backoff = max_backoff
+
+        self._buffer: List[Dict[str, Any]] = []  # {'range': ..., 'row': [...]}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+        self.metrics = {
+            'rows_added': 0,
+            'rows_written': 0,
+            'rows_spilled': 0,
+            'append_requests': 0,
+            'append_failures': 0,
+            'last_flush_ms': 0.0
+        }
+
+    def add(self, range_name: str, row: List[Any]):
+        """기록할 행을 버퍼에 추가합니다."""
+        with self._lock:
+            self._buffer.append({'range': range_name, 'row': row})
+            self.metrics['rows_added'] += 1
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='sheets-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 행을 기록하고 백그라운드 스레드를 중지합니다."""
+        self._running = False
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self.flush(force=True)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.metrics, 'buffered': self.pending(), 'spilled_pending': os.path.exists(self.spill_path)}
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self, force: bool = False) -> bool:
+        """버퍼와 spill 파일의 행을 시트에 기록합니다. 모두 기록했으면 True 를 반환합니다."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+
+            if not force and time.time() < self._retry_at:
+                # 재시도 대기 중에는 API 를 호출하지 않고 파일로 보관
+                self._spill(rows)
+                return False
+
+            start_time = time.time()
+            spilled = self._load_spill()
+            if spilled:
+                replayed = len(spilled)
+                ok = self._append_all(spilled)
+                os.remove(self.spill_path)
+                if not ok:
+                    # 기록되지 않은 행만 순서대로 다시 보관
+                    self._spill(spilled + rows)
+                    return False
+                logger.info(f"Replayed {replayed} spilled rows to Google Sheets")
+
+            if rows and not self._append_all(rows):
+                self._spill(rows)
+                return False
+
+            if rows or spilled:
+                self.metrics['last_flush_ms'] = (time.time() - start_time) * 1000
+            self._failures = 0
+            self._retry_at = 0.0
+            return True
+
+    def _append_all(self, rows: List[Dict[str, Any]]) -> bool:
+        """시트 범위별로 묶어서 append 요청을 보냅니다."""
+        grouped: Dict[str, List[List[Any]]] = {}
+        for entry in rows:
+            grouped.setdefault(entry['range'], []).append(entry['row'])
+
+        for range_name, values in grouped.items():
+            try:
+                self.service.spreadsheets().values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=range_name,
+                    valueInputOption='USER_ENTERED',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': values}
+                ).execute()
+                self.metrics['append_requests'] += 1
+                self.metrics['rows_written'] += len(values)
+            except Exception as e:
+                self.metrics['append_failures'] += 1
+                self._failures += 1
+                backoff = min(self.max_backoff, self.flush_interval * 2 ** self._failures)
+                self._retry_at = time.time() + backoff
+                logger.error(f"Failed to append {len(values)} rows to {range_name}, "
+                             f"retrying in {backoff:.0f}s: {e}")
+                # 이미 기록된 범위는 제외하고 나머지만 다시 시도되도록 남김
+                written = set(list(grouped)[:list(grouped).index(range_name)])
+                rows[:] = [entry for entry in rows if entry['range'] not in written]
+                return False
+        return True
+
+    def _spill(self, rows: List[Dict[str, Any]]):
+        """기록하지 못한 행을 로컬 파일에 추가합니다."""
+        if not rows:
+            return
+        try:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for entry in rows:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.metrics['rows_spilled'] += len(rows)
+        except Exception as e:
+            logger.error(f"Failed to spill {len(rows)} sheet rows to {self.spill_path}: {e}")
+
+    def _load_spill(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.spill_path):
+            return []
+        try:
+            with open(self.spill_path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            logger.error(f"Failed to read spilled sheet rows from {self.spill_path}: {e}")
+            return []
@@ -23,6 +23,72 @@ function updateCurrentTime() {
         });
 }
 
+function mergeRow(exchange) {
+    if (!exchange || !exchange.symbol || exchange.last_price === null) return;
+    if (!previousPrices[exchange.symbol]) {
+        previousPrices[exchange.symbol] = {};
+    }
+    previousPrices[exchange.symbol][exchange.exchange] = {
+        price: exchange.last_price,
+        status: 'success',
+        asks: exchange.asks,
+        bids: exchange.bids,
+        last_price_krw: exchange.last_price_krw,
+        price_gap: exchange.price_gap
+    };
+}
+
+let renderScheduled = false;
+let pollTimers = [];
+
+// 스트림 이벤트가 연달아 와도 화면은 프레임당 한 번만 갱신
+function scheduleRender() {
+    if (renderScheduled) return;
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+        renderScheduled = false;
+        updatePriceTable(previousPrices);
+    });
+}
+
+// 서버 푸시 스트림 (/api/stream) 연결, 실패 시 폴링으로 대체
+function startStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource('/api/stream');
+    source.onopen = () => stopPolling();
+    source.addEventListener('row', event => {
+        mergeRow(JSON.parse(event.data));
+        scheduleRender();
+    });
+    source.addEventListener('time', event => {
+        document.getElementById('currentTime').textContent = `현재 시간: ${JSON.parse(event.data).formatted_time}`;
+    });
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            startPolling();
+        }
+    };
+}
+
+function startPolling() {
+    if (pollTimers.length) return;
+    fetchPrices();
+    updateCurrentTime();
+    pollTimers = [
+        setInterval(updateCurrentTime, 1000),
+        setInterval(fetchPrices, 3000)
+    ];
+}
+
+function stopPolling() {
+    pollTimers.forEach(timer => clearInterval(timer));
+    pollTimers = [];
+}
+
 async function fetchPrices() {
     try {
         const response = await fetch('/api/orderbook');
@@ -36,34 +102,7 @@ async function fetchPrices() {
             return;
         }
 
-        // Group data by symbol
-        const groupedData = data.reduce((acc, exchange) => {
-            const symbol = exchange.symbol;
-            if (!acc[symbol]) {
-                acc[symbol] = {};
-            }
-            acc[symbol][exchange.exchange] = {
-                price: exchange.last_price,
-                status: 'success',
-                asks: exchange.asks,
-                bids: exchange.bids,
-                last_price_krw: exchange.last_price_krw,
-                price_gap: exchange.price_gap
-            };
-            return acc;
-        }, {});
-
-        // 새로운 데이터와 이전 데이터를 병합
-        Object.entries(groupedData).forEach(([symbol, exchanges]) => {
-            if (!previousPrices[symbol]) {
-                previousPrices[symbol] = {};
-            }
-            Object.entries(exchanges).forEach(([exchange, info]) => {
-                if (info && info.price !== null) {
-                    previousPrices[symbol][exchange] = info;
-                }
-            });
-        });
+        data.forEach(mergeRow);
 
         // 병합된 데이터로 화면 업데이트
         updatePriceTable(previousPrices);
@@ -199,9 +238,4 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // Initial load
 fetchPrices();
-
-// Update time every second
-setInterval(updateCurrentTime, 1000);
-
-// Auto-refresh every 3 seconds
-setInterval(fetchPrices, 3000);
\ No newline at end of file
+startStream();
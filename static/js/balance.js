@@ -40,9 +40,11 @@ function updateBalanceTable(data) {
             <td>${formatNumber(balance.used, 2)} USDT</td>
             <td class="text-${balance.dailyPnL >= 0 ? 'success' : 'danger'}">
                 ${formatPercentage(balance.dailyPnL)}
+                <small class="text-muted">(${formatNumber(balance.dailyPnLUSDT || 0, 2)} USDT)</small>
             </td>
             <td class="text-${balance.monthlyPnL >= 0 ? 'success' : 'danger'}">
                 ${formatPercentage(balance.monthlyPnL)}
+                <small class="text-muted">(${formatNumber(balance.monthlyPnLUSDT || 0, 2)} USDT)</small>
             </td>
         `;
         tbody.appendChild(row);
@@ -0,0 +1,105 @@
+const REFRESH_INTERVAL = 2000;
+let isUpdating = false;
+
+function formatMs(value) {
+    return value != null ? value.toFixed(1) + 'ms' : '-';
+}
+
+function formatBytes(bytes) {
+    if (bytes >= 1024 * 1024) return (bytes / 1024 / 1024).toFixed(1) + 'MB';
+    if (bytes >= 1024) return (bytes / 1024).toFixed(1) + 'KB';
+    return bytes + 'B';
+}
+
+function latencyClass(value) {
+    if (value == null) return '';
+    if (value >= 500) return 'text-danger';
+    if (value >= 150) return 'text-warning';
+    return 'text-success';
+}
+
+function updateMetricsTable(data) {
+    const tbody = document.getElementById('metricsTableBody');
+    document.getElementById('metricsWindow').textContent = `최근 ${data.window}초`;
+
+    if (!data.endpoints.length) {
+        showError('아직 기록된 요청이 없습니다.');
+        return;
+    }
+
+    tbody.innerHTML = data.endpoints.map(row => {
+        const lastError = row.last_error
+            ? `${row.last_error.error} ${row.last_error.symbol} (${new Date(row.last_error.at * 1000).toLocaleTimeString('ko-KR')})`
+            : '-';
+        return `
+            <tr>
+                <td><span class="badge bg-primary">${row.exchange}</span></td>
+                <td>${row.endpoint}</td>
+                <td>${row.requests} <small class="text-muted">/ ${row.total_requests}</small></td>
+                <td>${row.rate_per_s.toFixed(2)}</td>
+                <td class="${latencyClass(row.p50_ms)}">${formatMs(row.p50_ms)}</td>
+                <td class="${latencyClass(row.p99_ms)}">${formatMs(row.p99_ms)}</td>
+                <td>${formatMs(row.max_ms)}</td>
+                <td>${formatBytes(row.bytes)}</td>
+                <td class="${row.errors ? 'text-danger' : ''}">${row.errors}</td>
+                <td><small>${lastError}</small></td>
+            </tr>
+        `;
+    }).join('');
+}
+
+function updateRateLimitTable(rateLimits) {
+    const tbody = document.getElementById('rateLimitTableBody');
+    const rows = [];
+    Object.entries(rateLimits.queue_time || {}).forEach(([exchange, priorities]) => {
+        Object.entries(priorities).forEach(([priority, stats]) => {
+            rows.push(`
+                <tr>
+                    <td>${exchange}</td>
+                    <td>${priority}</td>
+                    <td>${stats.requests}</td>
+                    <td>${formatMs(stats.wait_ms_avg)}</td>
+                    <td>${formatMs(stats.wait_ms_p95)}</td>
+                    <td>${formatMs(stats.wait_ms_max)}</td>
+                    <td class="${stats.timeouts ? 'text-danger' : ''}">${stats.timeouts}</td>
+                </tr>
+            `);
+        });
+    });
+    tbody.innerHTML = rows.join('');
+}
+
+async function fetchMetrics() {
+    if (isUpdating) return;
+    isUpdating = true;
+
+    try {
+        const response = await fetch('/api/metrics/summary');
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const data = await response.json();
+        updateMetricsTable(data);
+        updateRateLimitTable(data.rate_limits);
+    } catch (error) {
+        console.error('Error fetching metrics:', error);
+        showError('지연시간 정보를 가져오는데 실패했습니다.');
+    } finally {
+        isUpdating = false;
+    }
+}
+
+function showError(message) {
+    const tbody = document.getElementById('metricsTableBody');
+    tbody.innerHTML = `
+        <tr>
+            <td colspan="10" class="text-center text-muted">
+                <i class="fas fa-exclamation-triangle"></i> ${message}
+            </td>
+        </tr>
+    `;
+}
+
+// 초기 로드 후 2초마다 갱신
+fetchMetrics();
+setInterval(fetchMetrics, REFRESH_INTERVAL);
@@ -11,14 +11,17 @@ function formatPercentage(number) {
     return number != null ? (number >= 0 ? '+' : '') + number.toFixed(2) + '%' : '0.00%';
 }
 
+function setCurrentTime(formattedTime) {
+    document.querySelectorAll('.current-time').forEach(el => {
+        el.textContent = `현재 시간: ${formattedTime}`;
+    });
+}
+
+// 스트림 연결이 안 될 때만 사용하는 폴링 방식 시간 갱신
 function updateCurrentTime() {
     fetch('/api/current_time')
         .then(response => response.json())
-        .then(data => {
-            document.querySelectorAll('.current-time').forEach(el => {
-                el.textContent = `현재 시간: ${data.formatted_time}`;
-            });
-        })
+        .then(data => setCurrentTime(data.formatted_time))
         .catch(error => {
             console.error('Error fetching server time:', error);
             const now = new Date();
@@ -29,9 +32,7 @@ function updateCurrentTime() {
                 hour12: false,
                 timeZone: 'Asia/Seoul'
             });
-            document.querySelectorAll('.current-time').forEach(el => {
-                el.textContent = `현재 시간: ${timeStr}`;
-            });
+            setCurrentTime(timeStr);
         });
 }
 
@@ -39,9 +40,26 @@ let isUpdating = false;
 let retryCount = 0;
 const MAX_RETRIES = 3;
 const RETRY_DELAY = 2000;
-const REFRESH_INTERVAL = 500; // 0.5초로 변경
+const REFRESH_INTERVAL = 500; // 폴링 대체 모드의 갱신 주기
 const USDT_TO_KRW = 1300;
 
+// 카드 배치: [행 ID, 비교 거래소, 기준 거래소]
+const CARD_LAYOUT = [
+    ['exchangeCardsRow1', 'MEXC Futures', 'Bitget Futures'],
+    ['exchangeCardsRow2', 'Gate.io Futures', 'Bitget Futures']
+];
+
+// 코인 -> 거래소 -> 최신 호가 데이터
+const latestRows = {};
+// `${행 ID}|${코인}|${거래소}` -> 카드 요소 (한 번 만들고 재사용)
+let cardElements = {};
+const dirtyRows = new Set();
+let renderScheduled = false;
+
+let eventSource = null;
+let streamFailures = 0;
+let pollTimers = [];
+
 function getExchangeLogo(exchange) {
     switch (exchange) {
         case 'MEXC Futures':
@@ -55,25 +73,35 @@ function getExchangeLogo(exchange) {
     }
 }
 
-function createExchangeCard(data) {
-    if (!data || !data.symbol) {
-        console.error('Invalid data in createExchangeCard:', data);
-        return '';
-    }
-
+function formatPriceGap(data) {
     const priceGapClass = !data.price_gap ? '' :
                            data.price_gap >= 0 ? 'text-success' : 'text-danger';
 
     // 가격 차이 표시 (퍼센트와 USDT 차이)
-    let priceGapValue;
     if (data.price_gap === 0) {
-        priceGapValue = '기준';
-    } else {
-        const percentageGap = formatPercentage(data.price_gap);
-        const usdtGapValue = formatNumber(Math.abs(data.price_gap_usdt), 6);
-        const usdtGapSign = data.price_gap_usdt >= 0 ? '+' : '-';
-        priceGapValue = `${percentageGap} (${usdtGapSign}${usdtGapValue})`;
+        return [priceGapClass, '기준'];
     }
+    const percentageGap = formatPercentage(data.price_gap);
+    const usdtGapValue = formatNumber(Math.abs(data.price_gap_usdt), 6);
+    const usdtGapSign = data.price_gap_usdt >= 0 ? '+' : '-';
+    return [priceGapClass, `${percentageGap} (${usdtGapSign}${usdtGapValue})`];
+}
+
+function updatePriceGap(data, cardElement) {
+    const gapElement = cardElement.querySelector('.price-gap');
+    if (!gapElement) return;
+    const [priceGapClass, priceGapValue] = formatPriceGap(data);
+    gapElement.className = `price-gap ${priceGapClass}`;
+    gapElement.textContent = priceGapValue;
+}
+
+function createExchangeCard(data) {
+    if (!data || !data.symbol) {
+        console.error('Invalid data in createExchangeCard:', data);
+        return '';
+    }
+
+    const [priceGapClass, priceGapValue] = formatPriceGap(data);
 
     const baseCurrency = data.symbol.split('/')[0];
     const decimals = baseCurrency === 'XRP' ? 4 : 5;
@@ -110,7 +138,7 @@ function createExchangeCard(data) {
                         </tbody>
                     </table>
                     <div class="card-footer py-2 text-center">
-                        <span class="${priceGapClass}">
+                        <span class="price-gap ${priceGapClass}">
                             ${priceGapValue}
                         </span>
                     </div>
@@ -217,7 +245,12 @@ async function checkInitialization() {
     }
 }
 
+function resetCards() {
+    cardElements = {};
+}
+
 function showInitializing(status, details) {
+    resetCards();
     const row1 = document.getElementById('exchangeCardsRow1');
     const row2 = document.getElementById('exchangeCardsRow2');
     if (row1) {
@@ -342,6 +375,125 @@ function updatePriceGapSummary(data) {
     });
 }
 
+function applyRows(rows) {
+    rows.forEach(row => {
+        if (!row || !row.symbol) {
+            console.error('Invalid exchange data:', row);
+            return;
+        }
+        if (!latestRows[row.symbol]) {
+            latestRows[row.symbol] = {};
+        }
+        latestRows[row.symbol][row.exchange] = row;
+        dirtyRows.add(`${row.symbol}|${row.exchange}`);
+    });
+    scheduleRender();
+}
+
+function scheduleRender() {
+    if (renderScheduled) return;
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+        renderScheduled = false;
+        renderDirtyRows();
+    });
+}
+
+function ensureCards(symbol) {
+    const exchanges = latestRows[symbol];
+    CARD_LAYOUT.forEach(([rowId, exchange1, exchange2]) => {
+        if (!exchanges[exchange1] || !exchanges[exchange2]) return;
+        if (cardElements[`${rowId}|${symbol}|${exchange1}`]) return;
+
+        const row = document.getElementById(rowId);
+        if (!row) return;
+        // 초기화/오류 메시지가 표시 중이면 지움
+        if (!Object.keys(cardElements).some(key => key.startsWith(`${rowId}|`))) {
+            row.innerHTML = '';
+        }
+        [exchange1, exchange2].forEach(exchange => {
+            row.insertAdjacentHTML('beforeend', createExchangeCard(exchanges[exchange]));
+            cardElements[`${rowId}|${symbol}|${exchange}`] = row.lastElementChild;
+        });
+    });
+}
+
+// 바뀐 거래소 카드만 갱신 (전체 카드를 다시 만들지 않음)
+function renderDirtyRows() {
+    const keys = Array.from(dirtyRows);
+    dirtyRows.clear();
+
+    keys.forEach(key => {
+        const [symbol, exchange] = key.split('|');
+        const data = latestRows[symbol][exchange];
+        ensureCards(symbol);
+        CARD_LAYOUT.forEach(([rowId]) => {
+            const card = cardElements[`${rowId}|${symbol}|${exchange}`];
+            if (card) {
+                updateOrderBook(data, card);
+                updatePriceGap(data, card);
+            }
+        });
+    });
+
+    const allRows = [];
+    Object.values(latestRows).forEach(exchanges => allRows.push(...Object.values(exchanges)));
+    updatePriceGapSummary(allRows);
+}
+
+// 서버 푸시 스트림 (/api/stream) 연결
+function startStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    eventSource = new EventSource('/api/stream');
+    eventSource.onopen = () => {
+        streamFailures = 0;
+        stopPolling();
+    };
+    eventSource.addEventListener('row', event => applyRows([JSON.parse(event.data)]));
+    eventSource.addEventListener('time', event => setCurrentTime(JSON.parse(event.data).formatted_time));
+    eventSource.onerror = () => {
+        // CONNECTING 상태면 브라우저가 자동으로 재연결함
+        if (eventSource.readyState !== EventSource.CLOSED) return;
+        eventSource = null;
+        streamFailures++;
+        if (streamFailures > MAX_RETRIES) {
+            startPolling();
+            return;
+        }
+        setTimeout(startup, RETRY_DELAY * streamFailures);
+    };
+}
+
+function startPolling() {
+    if (pollTimers.length) return;
+    console.warn('Stream unavailable, falling back to polling');
+    fetchOrderBook();
+    updateCurrentTime();
+    pollTimers = [
+        setInterval(updateCurrentTime, 1000),
+        setInterval(fetchOrderBook, REFRESH_INTERVAL)
+    ];
+}
+
+function stopPolling() {
+    pollTimers.forEach(timer => clearInterval(timer));
+    pollTimers = [];
+}
+
+async function startup() {
+    const initStatus = await checkInitialization();
+    if (!initStatus.initialized) {
+        showInitializing(initStatus.status, initStatus.details);
+        setTimeout(startup, 2000);
+        return;
+    }
+    startStream();
+}
+
 async function fetchOrderBook() {
     if (isUpdating) return;
     isUpdating = true;
@@ -367,59 +519,7 @@ async function fetchOrderBook() {
             throw new Error('Invalid data format received from server');
         }
 
-        // Update price gap summary
-        updatePriceGapSummary(data);
-
-        const row1 = document.getElementById('exchangeCardsRow1');
-        const row2 = document.getElementById('exchangeCardsRow2');
-
-        if (!row1 || !row2) {
-            throw new Error('Required DOM elements not found');
-        }
-
-        row1.innerHTML = '';
-        row2.innerHTML = '';
-
-        const groupedData = data.reduce((acc, exchange) => {
-            if (!exchange || !exchange.symbol) {
-                console.error('Invalid exchange data:', exchange);
-                return acc;
-            }
-
-            const symbol = exchange.symbol;
-            if (!acc[symbol]) {
-                acc[symbol] = {};
-            }
-            acc[symbol][exchange.exchange] = exchange;
-            return acc;
-        }, {});
-
-        Object.entries(groupedData).forEach(([symbol, exchanges]) => {
-            if (exchanges['MEXC Futures'] && exchanges['Bitget Futures']) {
-                const mexcCard = createExchangeCard(exchanges['MEXC Futures']);
-                const bitgetCard = createExchangeCard(exchanges['Bitget Futures']);
-
-                if (mexcCard && bitgetCard) {
-                    row1.insertAdjacentHTML('beforeend', mexcCard);
-                    row1.insertAdjacentHTML('beforeend', bitgetCard);
-                    updateOrderBook(exchanges['MEXC Futures'], row1.children[row1.children.length - 2]);
-                    updateOrderBook(exchanges['Bitget Futures'], row1.children[row1.children.length - 1]);
-                }
-            }
-
-            if (exchanges['Gate.io Futures'] && exchanges['Bitget Futures']) {
-                const gateCard = createExchangeCard(exchanges['Gate.io Futures']);
-                const bitgetCard = createExchangeCard(exchanges['Bitget Futures']);
-
-                if (gateCard && bitgetCard) {
-                    row2.insertAdjacentHTML('beforeend', gateCard);
-                    row2.insertAdjacentHTML('beforeend', bitgetCard);
-                    updateOrderBook(exchanges['Gate.io Futures'], row2.children[row2.children.length - 2]);
-                    updateOrderBook(exchanges['Bitget Futures'], row2.children[row2.children.length - 1]);
-                }
-            }
-        });
-
+        applyRows(data);
         retryCount = 0;
     } catch (error) {
         console.error('Error:', error);
@@ -442,6 +542,7 @@ async function handleError(errorMsg) {
 }
 
 function showError(message) {
+    resetCards();
     const row1 = document.getElementById('exchangeCardsRow1');
     const row2 = document.getElementById('exchangeCardsRow2');
     if (row1) {
@@ -475,8 +576,4 @@ style.textContent = `
 `;
 document.head.appendChild(style);
 
-fetchOrderBook();
-updateCurrentTime();
-
-setInterval(updateCurrentTime, 1000);
-setInterval(fetchOrderBook, REFRESH_INTERVAL);
\ No newline at end of file
+startup();
\ No newline at end of file
@@ -0,0 +1,162 @@
+import argparse
+import csv
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from backtest import DEFAULT_PARAMS, Backtester, PairDataset, parameter_grid, parse_time
+from tick_store import TickStore, stream_key
+
+logger = logging.getLogger(__name__)
+
+# 탐색할 수 있는 파라미터 (CLI 옵션 이름은 '_' 를 '-' 로 바꾼 것)
+SWEEP_PARAMS = ('entry_long', 'entry_short', 'safety_margin', 'cooldown', 'exit_gap', 'max_hold')
+
+# 결과 표에 남기는 요약 항목
+RESULT_COLUMNS = ('trades', 'signals', 'pnl', 'fees', 'hit_rate', 'avg_pnl', 'max_drawdown',
+                  'partial_fills', 'avg_skew_ms', 'skew_cost', 'avg_hold_s')
+
+# 워커 프로세스마다 한 번만 만드는 백테스터 (데이터셋은 memmap 으로 공유)
+_worker_backtester: Optional[Backtester] = None
+
+
+def parse_axis(spec: str) -> List[float]:
+    """'0.03,0.05' 목록 또는 '시작:끝:간격' 범위(끝 포함)를 값 목록으로 바꿉니다."""
+    if ':' in spec:
+        start, stop, step = (float(part) for part in spec.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + step * i, 10) for i in range(max(count, 1))]
+    return [float(part) for part in spec.split(',') if part]
+
+
+def random_grid(axes: Dict[str, List[float]], samples: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """각 축의 최솟값~최댓값 범위에서 균등하게 뽑은 파라미터 조합 목록 (랜덤 탐색)"""
+    rng = random.Random(seed)
+    return [{name: round(rng.uniform(min(values), max(values)), 6) for name, values in axes.items()}
+            for _ in range(samples)]
+
+
+def prepare_dataset(store: TickStore, exchange1: str, exchange2: str, symbol: str,
+                    start: float, end: float, cache_dir: str) -> str:
+    """정렬된 데이터셋을 cache_dir 에 한 번 저장하고 경로를 반환합니다 (이미 있으면 재사용)."""
+    name = f"{stream_key(f'{exchange1}-{exchange2}', symbol)}_{int(start)}_{int(end)}"
+    path = os.path.join(cache_dir, name)
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        logger.info(f"Reusing prepared dataset {path}")
+        return path
+
+    started = time.perf_counter()
+    dataset = PairDataset.from_store(store, exchange1, exchange2, symbol, start, end)
+    dataset.save(path)
+    logger.info(f"Prepared {len(dataset)} rows in {path} ({time.perf_counter() - started:.1f}s)")
+    return path
+
+
+def _init_worker(dataset_path: str, backtester_options: Dict[str, Any]):
+    global _worker_backtester
+    dataset = PairDataset.load(dataset_path, mmap=True)
+    _worker_backtester = Backtester(dataset, **backtester_options)
+
+
+def _run_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    summary = _worker_backtester.run(params, record_trades=False)
+    row = {name: summary['params'][name] for name in SWEEP_PARAMS}
+    row.update({name: summary[name] for name in RESULT_COLUMNS})
+    row['elapsed_ms'] = (time.perf_counter() - started) * 1000
+    row['worker'] = os.getpid()
+    return row
+
+
+def run_sweep(dataset_path: str, grid: List[Dict[str, Any]], workers: Optional[int] = None,
+              backtester_options: Optional[Dict[str, Any]] = None, chunksize: int = 0) -> List[Dict[str, Any]]:
+    """파라미터 조합들을 프로세스 풀에서 나눠 실행합니다.
+
+    각 워커는 시작할 때 dataset_path 를 memmap 으로 열기만 하므로 데이터는
+    운영체제 페이지 캐시 한 벌을 모든 워커가 함께 사용합니다. 같은 워커에
+    비슷한 조합이 연속으로 가도록 묶어서 보내 진입 체결 캐시를 재사용합니다.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(grid) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dataset_path, backtester_options or {})) as executor:
+        return list(executor.map(_run_params, grid, chunksize=chunksize))
+
+
+def write_results(path: str, rows: List[Dict[str, Any]]):
+    """결과 표를 CSV 로 저장합니다."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    columns = list(SWEEP_PARAMS) + list(RESULT_COLUMNS) + ['elapsed_ms', 'worker']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({name: f"{value:.6g}" if isinstance(value, float) else value
+                             for name, value in row.items()})
+
+
+def format_table(rows: List[Dict[str, Any]], limit: int = 10) -> str:
+    """손익 상위 limit 개 조합을 터미널용 표로 만듭니다."""
+    columns = list(SWEEP_PARAMS) + ['trades', 'pnl', 'hit_rate', 'skew_cost', 'elapsed_ms']
+    lines = [' '.join(f"{name:>13}" for name in columns)]
+    for row in sorted(rows, key=lambda r: r['pnl'], reverse=True)[:limit]:
+        lines.append(' '.join(f"{row[name]:>13.6g}" for name in columns))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='Sweep price gap strategy parameters over recorded ticks')
+    parser.add_argument('--pair', default='mexc-bitget', help='거래소 쌍 (예: mexc-bitget)')
+    parser.add_argument('--symbol', default='XRP/USDT')
+    parser.add_argument('--start', required=True, help='시작 시각 (유닉스 시각 또는 ISO, UTC)')
+    parser.add_argument('--end', required=True, help='종료 시각 (유닉스 시각 또는 ISO, UTC)')
+    parser.add_argument('--store', default=None, help='TickStore 경로 (기본: TICK_STORE_DIR)')
+    parser.add_argument('--cache-dir', default='.cache/sweep', help='정렬된 데이터셋 저장 위치')
+    for name in SWEEP_PARAMS:
+        parser.add_argument(f"--{name.replace('_', '-')}", default=str(DEFAULT_PARAMS[name]),
+                            help="값 목록 '0.03,0.05' 또는 범위 '시작:끝:간격'")
+    parser.add_argument('--random', type=int, default=0, help='격자 대신 범위 안에서 N 개 조합을 무작위 탐색')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--depth-share', type=float, default=1.0)
+    parser.add_argument('--contract-size1', type=float, default=1.0, help='거래소1 계약 1개의 코인 수')
+    parser.add_argument('--contract-size2', type=float, default=1.0, help='거래소2 계약 1개의 코인 수')
+    parser.add_argument('--lot-size', type=float, default=0.0, help='주문 수량 단위 (코인, 0 이면 내림 없음)')
+    parser.add_argument('--output', default=None, help='결과 CSV 경로 (기본: data/sweeps/<시각>.csv)')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    axes = {name: parse_axis(getattr(args, name)) for name in SWEEP_PARAMS}
+    grid = random_grid(axes, args.random, args.seed) if args.random else parameter_grid(**axes)
+
+    exchange1, exchange2 = args.pair.split('-')
+    start, end = parse_time(args.start), parse_time(args.end)
+    dataset_path = prepare_dataset(TickStore(args.store), exchange1, exchange2, args.symbol,
+                                   start, end, args.cache_dir)
+
+    started = time.perf_counter()
+    results = run_sweep(dataset_path, grid, args.workers,
+                        {'jitter_ms': args.jitter_ms, 'depth_share': args.depth_share,
+                         'contract_sizes': {exchange1: args.contract_size1, exchange2: args.contract_size2},
+                         'lot_size': args.lot_size})
+    elapsed = time.perf_counter() - started
+
+    output = args.output or os.path.join('data', 'sweeps', f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.csv")
+    write_results(output, results)
+    run_times = np.array([row['elapsed_ms'] for row in results])
+    logger.info(f"Ran {len(results)} combinations in {elapsed:.1f}s "
+                f"(per run avg {run_times.mean():.1f}ms, max {run_times.max():.1f}ms), results in {output}")
+    print(format_table(results, args.top))
@@ -0,0 +1,134 @@
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 공통 심볼의 결제(quote) 통화. 공통 심볼은 기존 코드와 같은 'XRP/USDT' 형태입니다.
+SETTLE_CURRENCY = 'USDT'
+
+
+def canonical_symbol(base: str) -> str:
+    return f"{base}/{SETTLE_CURRENCY}"
+
+
+def fallback_market_symbol(symbol: str) -> str:
+    """인덱스에 없는 코인의 USDT 무기한 선물 심볼 (예: XRP/USDT -> XRP/USDT:USDT)"""
+    if ':' in symbol:
+        return symbol
+    return f"{symbol.split('/')[0]}/{SETTLE_CURRENCY}:{SETTLE_CURRENCY}"
+
+
+def is_usdt_perpetual(market: Dict[str, Any]) -> bool:
+    """USDT 로 결제하는 선형 무기한 선물 마켓인지 확인합니다."""
+    return (
+        bool(market.get('swap'))
+        and market.get('linear') is not False
+        and market.get('settle') == SETTLE_CURRENCY
+        and market.get('quote') == SETTLE_CURRENCY
+        and market.get('active') is not False
+    )
+
+
+class SymbolUniverse:
+    """거래소별 USDT 무기한 선물 마켓을 공통 심볼로 묶은 인덱스
+
+    ccxt 마켓 메타데이터에서 USDT 결제 선형 무기한 선물만 골라
+    공통 심볼('XRP/USDT') -> 거래소별 마켓(ccxt 심볼, 거래소 id, 계약 크기)과
+    그 역방향 인덱스를 미리 만들어 둡니다. 심볼 변환은 dict 조회 한 번이며,
+    인덱스에 없는 코인은 'XRP/USDT:USDT' 형태로 변환합니다.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, Dict[str, Dict[str, Any]]] = {}  # 공통 심볼 -> 거래소 -> 마켓
+        self._canonical: Dict[str, Dict[str, str]] = {}  # 거래소 -> ccxt 심볼/id -> 공통 심볼
+        self._lock = threading.Lock()
+
+    def add_exchange(self, exchange: str, markets: Dict[str, Dict[str, Any]]) -> int:
+        """거래소의 마켓 정보로 인덱스를 (다시) 만들고 등록된 마켓 수를 반환합니다."""
+        entries: Dict[str, Dict[str, Any]] = {}
+        for market in markets.values():
+            if not is_usdt_perpetual(market):
+                continue
+            symbol = canonical_symbol(market['base'])
+            entries[symbol] = {
+                'symbol': market['symbol'],
+                'id': market.get('id'),
+                'contract_size': float(market.get('contractSize') or 1.0)
+            }
+
+        reverse = {}
+        for symbol, entry in entries.items():
+            reverse[entry['symbol']] = symbol
+            if entry['id']:
+                reverse[entry['id']] = symbol
+
+        with self._lock:
+            for symbol in list(self._index):
+                self._index[symbol].pop(exchange, None)
+                if not self._index[symbol]:
+                    del self._index[symbol]
+            for symbol, entry in entries.items():
+                self._index.setdefault(symbol, {})[exchange] = entry
+            self._canonical[exchange] = reverse
+
+        logger.info(f"Indexed {len(entries)} USDT perpetual markets for {exchange}")
+        return len(entries)
+
+    def exchanges(self) -> List[str]:
+        with self._lock:
+            return list(self._canonical)
+
+    def market(self, exchange: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """공통 심볼의 거래소 마켓 정보 (없으면 None)"""
+        with self._lock:
+            return self._index.get(symbol, {}).get(exchange)
+
+    def market_symbol(self, exchange: str, symbol: str) -> str:
+        """공통 심볼을 거래소의 ccxt 심볼로 변환합니다."""
+        entry = self.market(exchange, symbol)
+        return entry['symbol'] if entry else fallback_market_symbol(symbol)
+
+    def market_id(self, exchange: str, symbol: str) -> Optional[str]:
+        """공통 심볼을 거래소 API 의 마켓 id(WebSocket 구독용)로 변환합니다."""
+        entry = self.market(exchange, symbol)
+        return entry['id'] if entry else None
+
+    def canonical(self, exchange: str, market_symbol: str) -> str:
+        """거래소의 ccxt 심볼 또는 마켓 id 를 공통 심볼로 변환합니다."""
+        with self._lock:
+            symbol = self._canonical.get(exchange, {}).get(market_symbol)
+        return symbol or market_symbol.split(':')[0]
+
+    def symbols(self, exchanges: Optional[Iterable[str]] = None) -> List[str]:
+        """주어진 거래소 모두에 상장된 공통 심볼 목록 (교집합)"""
+        with self._lock:
+            exchanges = list(exchanges or self._canonical)
+            return sorted(symbol for symbol, markets in self._index.items()
+                          if all(exchange in markets for exchange in exchanges))
+
+    def select(self, exchanges: Optional[Iterable[str]] = None, limit: Optional[int] = None,
+               priority: Optional[List[str]] = None,
+               volumes: Optional[Dict[str, float]] = None) -> List[str]:
+        """감시할 심볼을 고릅니다.
+
+        priority 에 있는 심볼을 먼저 넣고, 나머지는 volumes(24시간 거래대금)가
+        큰 순서(없으면 이름 순)로 limit 개까지 채웁니다.
+        """
+        available = self.symbols(exchanges)
+        selected = [symbol for symbol in priority or [] if symbol in available]
+        rest = [symbol for symbol in available if symbol not in selected]
+        if volumes:
+            rest.sort(key=lambda symbol: volumes.get(symbol, 0.0), reverse=True)
+        selected.extend(rest)
+        return selected[:limit] if limit else selected
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            per_exchange = {exchange: sum(1 for markets in self._index.values() if exchange in markets)
+                            for exchange in self._canonical}
+            exchanges = list(self._canonical)
+        return {
+            'markets': per_exchange,
+            'common': len(self.symbols(exchanges)) if exchanges else 0
+        }
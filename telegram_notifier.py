@@ -4,6 +4,7 @@ import pytz
 from telegram import Bot
 from telegram.error import TelegramError
 from datetime import datetime, timedelta
+from notification_queue import NotificationQueue, PRIORITY_HIGH, PRIORITY_LOW
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,9 @@ class TelegramNotifier:
         self.USDT_TO_KRW = 1300  # USDT to KRW exchange rate
         self.is_enabled = True
         self.KST = pytz.timezone('Asia/Seoul')
+        # 로컬 가짜 봇 서버 테스트용 (예: http://127.0.0.1:8081/bot)
+        self.base_url = os.environ.get('TELEGRAM_API_BASE_URL')
+        self.queue = NotificationQueue(self._deliver)
 
         logger.info("Initializing TelegramNotifier")
 
@@ -23,45 +27,64 @@ class TelegramNotifier:
             return
 
         try:
-            self.bot = Bot(token=self.bot_token)
+            self.bot = Bot(token=self.bot_token, base_url=self.base_url)
             bot_info = self.bot.get_me()
             logger.info(f"Successfully initialized Telegram bot: {bot_info.username}")
+            self.queue.start()
         except Exception as e:
             logger.error(f"Failed to initialize Telegram bot: {e}")
             self.is_enabled = False
 
         self.last_alerts = {}
 
-    def send_message(self, message: str) -> bool:
-        """텔레그램으로 메시지를 전송합니다."""
+    def send_message(self, message: str, priority: str = PRIORITY_HIGH, key: str = None) -> bool:
+        """메시지를 발송 대기열에 넣고 바로 반환합니다. 실제 전송은 워커 스레드가 합니다."""
+        if not self.is_enabled:
+            logger.warning("Telegram notifications are disabled")
+            return False
+
+        return self.queue.enqueue(message, priority, key)
+
+    def send_message_now(self, message: str) -> bool:
+        """대기열을 거치지 않고 텔레그램으로 메시지를 바로 전송합니다 (연결 테스트용)."""
         if not self.is_enabled:
             logger.warning("Telegram notifications are disabled")
             return False
 
         try:
-            self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode='HTML'
-            )
+            self._deliver(message)
             logger.info("Message sent successfully")
             return True
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
             return False
 
-    def send_gap_alert(self, exchange1: str, exchange2: str, data1: dict, data2: dict, gap: float) -> bool:
-        """가격 갭이 임계값을 초과할 때 알림을 보냅니다."""
+    def _deliver(self, message: str):
+        self.bot.send_message(
+            chat_id=self.chat_id,
+            text=message,
+            parse_mode='HTML'
+        )
+
+    def get_metrics(self) -> dict:
+        """발송 대기열 지표를 반환합니다."""
+        return {'enabled': self.is_enabled, **self.queue.get_metrics()}
+
+    def close(self, timeout: float = 5.0):
+        """남은 메시지를 발송하고 워커를 중지합니다."""
+        self.queue.stop(timeout)
+
+    def send_gap_alert(self, exchange1: str, exchange2: str, data1: dict, data2: dict, gap: float,
+                       sizing: dict) -> bool:
+        """가격 갭이 임계값을 초과할 때 알림을 보냅니다.
+
+        sizing 은 TradingExecutor.calculate_depth_sizing 결과로, 자동 매매와 같은 수수료,
+        계약 크기, 진입 임계값으로 계산한 주문 금액(order_notional)을 거래가능금액으로 표시합니다.
+        """
         try:
             current_time = datetime.now(self.KST)
 
-            # 거래 가능 금액 계산
-            sellAmount1 = float(data1['asks'][0][0]) * float(data1['asks'][0][1])
-            buyAmount1 = float(data1['bids'][0][0]) * float(data1['bids'][0][1])
-            sellAmount2 = float(data2['asks'][0][0]) * float(data2['asks'][0][1])
-            buyAmount2 = float(data2['bids'][0][0]) * float(data2['bids'][0][1])
-
-            trade_amount = min(sellAmount1, buyAmount1, sellAmount2, buyAmount2)
+            trade_amount = sizing.get('order_notional', 0.0)
             trade_amount_krw = trade_amount * self.USDT_TO_KRW
 
             # 코인 아이콘 선택
@@ -80,7 +103,8 @@ class TelegramNotifier:
                 f"원화금액: {trade_amount_krw:,.0f}원"
             )
 
-            return self.send_message(message)
+            alert_key = f"gap:{exchange1}:{exchange2}:{data1['symbol']}"
+            return self.send_message(message, PRIORITY_LOW, alert_key)
 
         except Exception as e:
             logger.error(f"Failed to send gap alert: {e}")
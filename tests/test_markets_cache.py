@@ -0,0 +1,139 @@
+import copy
+import gzip
+import json
+import os
+import time
+
+import ccxt
+import pytest
+
+from markets_cache import MarketsCache, CACHE_VERSION
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'mexc_markets.json')
+EXCHANGE = 'mexc'
+
+
+def fixture_markets():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FakeClient:
+    """load_markets 호출 횟수를 기록하는 네트워크 없는 ccxt 클라이언트 대역"""
+
+    def __init__(self, markets):
+        self.remote_markets = markets
+        self.markets = None
+        self.load_calls = 0
+
+    def load_markets(self, reload=False):
+        self.load_calls += 1
+        self.markets = copy.deepcopy(self.remote_markets)
+        return self.markets
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MarketsCache(cache_dir=str(tmp_path), ttl=60)
+    yield cache
+    cache.stop()
+
+
+def rewrite_entry(cache, **fields):
+    with gzip.open(cache.path(EXCHANGE), 'rt', encoding='utf-8') as f:
+        entry = json.load(f)
+    entry.update(fields)
+    with gzip.open(cache.path(EXCHANGE), 'wt', encoding='utf-8') as f:
+        json.dump(entry, f)
+
+
+# ---- 읽기/저장 ----
+
+def test_cold_start_loads_and_saves(cache):
+    client = FakeClient(fixture_markets())
+    assert cache.warm_start(client, EXCHANGE) is False
+    assert client.load_calls == 1
+    entry = cache.load(EXCHANGE)
+    assert entry['ccxt_version'] == ccxt.__version__
+    assert set(entry['markets']) == {'XRP/USDT:USDT', 'DOGE/USDT:USDT'}
+    assert 'info' not in entry['markets']['XRP/USDT:USDT']  # 원본 응답은 저장하지 않음
+
+
+def test_warm_start_uses_cache(cache):
+    cache.save(EXCHANGE, fixture_markets())
+    client = FakeClient(fixture_markets())
+    assert cache.warm_start(client, EXCHANGE) is True
+    assert client.load_calls == 0
+    assert client.markets['XRP/USDT:USDT']['contractSize'] == 100.0
+    assert client.markets['XRP/USDT:USDT']['precision'] == {'amount': 1.0, 'price': 0.0001}
+
+
+def test_incompatible_cache_is_ignored(cache):
+    cache.save(EXCHANGE, fixture_markets())
+    rewrite_entry(cache, version=CACHE_VERSION + 1)
+    assert cache.load(EXCHANGE) is None
+    assert cache.load('bitget') is None
+
+
+# ---- TTL ----
+
+def test_ttl(cache):
+    entry = cache.save(EXCHANGE, fixture_markets())
+    assert cache.is_fresh(entry)
+    entry['saved_at'] = time.time() - cache.ttl - 1
+    assert not cache.is_fresh(entry)
+
+
+def test_ccxt_version_mismatch_is_stale(cache):
+    entry = cache.save(EXCHANGE, fixture_markets())
+    entry['ccxt_version'] = '0.0.1'
+    assert not cache.is_fresh(entry)
+    assert cache.age(entry) == cache.ttl
+
+
+def test_ccxt_version_mismatch_refreshes_right_away(cache):
+    cache.save(EXCHANGE, fixture_markets())
+    rewrite_entry(cache, ccxt_version='0.0.1')
+    client = FakeClient(fixture_markets())
+    assert cache.warm_start(client, EXCHANGE) is True
+
+    cache.start_background_refresh()  # TTL 을 기다리지 않고 바로 다시 받음
+    deadline = time.time() + 5
+    while cache.load(EXCHANGE)['ccxt_version'] != ccxt.__version__ and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.load(EXCHANGE)['ccxt_version'] == ccxt.__version__
+    assert client.load_calls == 1
+
+
+# ---- 변경 감지 ----
+
+def test_refresh_detects_changes(cache):
+    markets = fixture_markets()
+    client = FakeClient(markets)
+    cache.warm_start(client, EXCHANGE)
+    changes = []
+    cache.add_listener(lambda exchange_id, _: changes.append(exchange_id))
+
+    assert cache.refresh(EXCHANGE) is False
+    assert changes == []
+
+    listed = copy.deepcopy(markets['XRP/USDT:USDT'])
+    listed.update({'id': 'ADA_USDT', 'symbol': 'ADA/USDT:USDT', 'base': 'ADA', 'baseId': 'ADA'})
+    client.remote_markets = dict(markets, **{'ADA/USDT:USDT': listed})
+    assert cache.refresh(EXCHANGE) is True
+    assert changes == [EXCHANGE]
+
+    client.remote_markets['XRP/USDT:USDT']['precision']['amount'] = 10.0
+    assert cache.refresh(EXCHANGE) is True
+    assert cache.load(EXCHANGE)['markets']['XRP/USDT:USDT']['precision']['amount'] == 10.0
+
+
+def test_info_only_change_is_ignored(cache):
+    markets = fixture_markets()
+    client = FakeClient(markets)
+    cache.warm_start(client, EXCHANGE)
+    client.remote_markets['XRP/USDT:USDT']['info']['volUnit'] = 2
+    assert cache.refresh(EXCHANGE) is False
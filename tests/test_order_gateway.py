@@ -0,0 +1,183 @@
+import base64
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from mock_exchange_server import MockExchangeServer
+from order_gateway import (MexcGateway, BitgetGateway, GateioGateway, OrderGatewayError, floor_to_step,
+                           format_amount)
+
+API_KEY = 'test-key'
+SECRET = 'test-secret'
+PASSPHRASE = 'test-passphrase'
+SYMBOL = 'XRP/USDT'
+EXCHANGES = ('mexc', 'bitget', 'gateio')
+
+
+@pytest.fixture(scope='module')
+def server():
+    mock = MockExchangeServer(symbols=[SYMBOL], seed=1, tick_interval=60.0)
+    mock.start_in_thread(port=0)
+    yield mock
+    mock.stop_thread()
+
+
+@pytest.fixture(autouse=True)
+def reset_config(server):
+    server.configure(fill_ratio=1.0, reject_rate=0.0, error_rate=0.0)
+    yield
+
+
+def make_gateway(exchange, base_url=None):
+    if exchange == 'mexc':
+        return MexcGateway(API_KEY, SECRET, base_url=base_url)
+    if exchange == 'bitget':
+        return BitgetGateway(API_KEY, SECRET, PASSPHRASE, base_url=base_url)
+    return GateioGateway(API_KEY, SECRET, base_url=base_url)
+
+
+@pytest.fixture
+def gateway(server, request):
+    gateway = make_gateway(request.param, server.gateway_urls()[request.param])
+    gateway.sync_clock(samples=1)
+    yield gateway
+    gateway.stop()
+
+
+def mock_order(server, exchange, order_id):
+    return server.accounts[exchange].orders[str(order_id)]
+
+
+# ---- 서명 ----
+
+def test_mexc_signature():
+    gateway = make_gateway('mexc')
+    method, path, body, headers = gateway.build_order('XRP_USDT', 'sell', 30, False, 'oid1')
+    expected = hmac.new(SECRET.encode(), (API_KEY + headers['Request-Time']).encode() + body,
+                        hashlib.sha256).hexdigest()
+    assert (method, path) == ('POST', '/api/v1/private/order/submit')
+    assert headers['ApiKey'] == API_KEY
+    assert headers['Signature'] == expected
+    assert json.loads(body) == {'symbol': 'XRP_USDT', 'price': 0, 'type': 5, 'openType': 2, 'leverage': 1,
+                                'side': 3, 'vol': 30, 'externalOid': 'oid1'}
+
+
+def test_bitget_signature():
+    gateway = make_gateway('bitget')
+    method, path, body, headers = gateway.build_order('XRPUSDT', 'buy', 12.5, True, 'oid2')
+    payload = headers['ACCESS-TIMESTAMP'].encode() + b'POST' + path.encode() + body
+    expected = base64.b64encode(hmac.new(SECRET.encode(), payload, hashlib.sha256).digest()).decode()
+    assert headers['ACCESS-SIGN'] == expected
+    assert headers['ACCESS-PASSPHRASE'] == PASSPHRASE
+    assert json.loads(body)['size'] == '12.5'
+    assert json.loads(body)['reduceOnly'] == 'YES'
+
+
+def test_gateio_signature():
+    gateway = make_gateway('gateio')
+    method, path, body, headers = gateway.build_order('XRP_USDT', 'sell', 3, False, 'oid3')
+    payload = f"POST\n{path}\n\n{hashlib.sha512(body).hexdigest()}\n{headers['Timestamp']}"
+    expected = hmac.new(SECRET.encode(), payload.encode(), hashlib.sha512).hexdigest()
+    assert headers['SIGN'] == expected
+    assert json.loads(body)['size'] == -3
+
+
+@pytest.mark.parametrize('exchange', EXCHANGES)
+def test_query_signature(exchange):
+    gateway = make_gateway(exchange)
+    market_id = gateway.market_id(SYMBOL)
+    method, path, body, headers = gateway.build_query(market_id, '123')
+    assert method == 'GET' and body == b''
+    if exchange == 'mexc':
+        expected = hmac.new(SECRET.encode(), (API_KEY + headers['Request-Time']).encode(), hashlib.sha256).hexdigest()
+        assert headers['Signature'] == expected
+    elif exchange == 'bitget':
+        payload = f"{headers['ACCESS-TIMESTAMP']}GET{path}".encode()
+        expected = base64.b64encode(hmac.new(SECRET.encode(), payload, hashlib.sha256).digest()).decode()
+        assert headers['ACCESS-SIGN'] == expected
+    else:
+        payload = f"GET\n{path}\n\n{hashlib.sha512(b'').hexdigest()}\n{headers['Timestamp']}"
+        assert headers['SIGN'] == hmac.new(SECRET.encode(), payload.encode(), hashlib.sha512).hexdigest()
+
+
+# ---- 수량 정밀도 ----
+
+def test_floor_to_step():
+    assert floor_to_step(2.7, 1.0) == 2
+    assert floor_to_step(0.3, 0.1) == 0.3
+    assert floor_to_step(0.0004, 0.001) == 0.0
+    assert floor_to_step(1.23456789, None) == 1.23456789
+    assert format_amount(floor_to_step(0.7, 0.1)) == '0.7'
+
+
+@pytest.mark.parametrize('gateway', ['mexc', 'gateio'], indirect=True)
+def test_whole_contract_venues_floor_amount(server, gateway):
+    result = gateway.submit(SYMBOL, 'buy', 2.7)
+    assert result['amount'] == 2
+    assert mock_order(server, gateway.exchange, result['id'])['amount'] == 2
+
+
+@pytest.mark.parametrize('gateway', ['bitget'], indirect=True)
+def test_amount_step_is_applied(server, gateway):
+    result = gateway.submit(SYMBOL, 'buy', 12.345, amount_step=0.1)
+    assert result['amount'] == 12.3
+    assert mock_order(server, 'bitget', result['id'])['amount'] == pytest.approx(12.3)
+
+
+@pytest.mark.parametrize('gateway', EXCHANGES, indirect=True)
+def test_zero_amount_rejected_before_signing(server, gateway):
+    requests_before = server.stats[gateway.exchange]['requests']
+    with pytest.raises(OrderGatewayError):
+        gateway.submit(SYMBOL, 'sell', 0.4, amount_step=1.0)
+    assert server.stats[gateway.exchange]['requests'] == requests_before
+
+
+# ---- 체결 상태 (IOC) ----
+
+def order_fill(gateway, result):
+    return result['fill'] or gateway.fetch_fill(SYMBOL, result['id'])
+
+
+@pytest.mark.parametrize('gateway', EXCHANGES, indirect=True)
+def test_filled_order(server, gateway):
+    result = gateway.submit(SYMBOL, 'buy', 3)
+    fill = order_fill(gateway, result)
+    order = mock_order(server, gateway.exchange, result['id'])
+    assert fill['status'] == 'closed'
+    assert fill['filled'] == pytest.approx(3)
+    assert fill['average'] == pytest.approx(order['price'], rel=1e-6)
+
+
+@pytest.mark.parametrize('gateway', EXCHANGES, indirect=True)
+def test_unfilled_ioc_order_is_canceled(server, gateway):
+    server.configure(gateway.exchange, fill_ratio=0.0)
+    result = gateway.submit(SYMBOL, 'sell', 5)
+    fill = order_fill(gateway, result)
+    assert fill['status'] == 'canceled'
+    assert fill['filled'] == 0
+    assert fill['average'] is None
+
+
+@pytest.mark.parametrize('gateway', EXCHANGES, indirect=True)
+def test_partially_filled_ioc_order(server, gateway):
+    book = server.books[gateway.exchange][gateway.market_id(SYMBOL)]
+    available = sum(size for _, size in book.levels('asks'))
+    server.configure(gateway.exchange, fill_ratio=0.5)
+    amount = int(available)  # 호가 잔량의 절반만 체결 가능
+    result = gateway.submit(SYMBOL, 'buy', amount)
+    fill = order_fill(gateway, result)
+    order = mock_order(server, gateway.exchange, result['id'])
+    # Bitget 은 남은 수량이 취소된 IOC 주문도 partially_filled 로 응답 (처리 중과 구분 불가)
+    assert fill['status'] == ('open' if gateway.exchange == 'bitget' else 'canceled')
+    assert 0 < fill['filled'] < amount
+    assert fill['filled'] == pytest.approx(order['filled'], abs=1)
+
+
+@pytest.mark.parametrize('gateway', EXCHANGES, indirect=True)
+def test_rejected_order_raises(server, gateway):
+    server.configure(gateway.exchange, reject_rate=1.0)
+    with pytest.raises(OrderGatewayError) as error:
+        gateway.submit(SYMBOL, 'buy', 1)
+    assert error.value.response is not None
@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from market_data import DEFAULT_PAIRS
+
+logger = logging.getLogger(__name__)
+
+# 저장 형식이 바뀌면 올림 (각 파티션의 meta.json 에 기록)
+STORE_VERSION = 1
+
+
+def book_schema(depth: int) -> List[Tuple[str, int]]:
+    """호가/시세 스트림의 컬럼 (이름, 값 개수)"""
+    return [('ts', 1), ('last', 1), ('bid_px', depth), ('bid_sz', depth), ('ask_px', depth), ('ask_sz', depth)]
+
+
+GAP_SCHEMA = [('ts', 1), ('gap', 1), ('price1', 1), ('price2', 1)]
+
+
+def stream_key(name: str, symbol: str) -> str:
+    """파일 경로에 쓰는 스트림 이름 (예: mexc__XRP-USDT)"""
+    return f"{name}__{symbol.replace('/', '-').replace(':', '-')}"
+
+
+class ColumnBuffer:
+    """한 스트림의 메모리 버퍼. 컬럼별로 미리 할당한 배열에 행을 채웁니다."""
+
+    __slots__ = ('schema', 'columns', 'count')
+
+    def __init__(self, schema: List[Tuple[str, int]], capacity: int):
+        self.schema = schema
+        self.columns = {
+            name: np.zeros((capacity, width) if width > 1 else capacity, dtype=np.float64)
+            for name, width in schema
+        }
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.columns['ts'])
+
+    def append(self, values: Dict[str, Any]):
+        for name, column in self.columns.items():
+            column[self.count] = values[name]
+        self.count += 1
+
+
+class TickStore:
+    """(거래소, 코인) 별 시세/호가와 거래소 쌍별 가격차를 저장하는 로컬 시계열 저장소
+
+    <root>/<kind>/<YYYY-MM-DD>/<stream>/<column>.f64 형태의 컬럼별 파일에
+    float64 값을 이어 붙이기만 합니다 (UTC 날짜로 분할). 쓰기는 메모리 버퍼에
+    모았다가 flush_interval 또는 buffer_size 마다 한 번에 추가하므로 각 값은
+    디스크에 한 번만 기록됩니다. 읽기는 np.memmap 으로 파일을 매핑하고 ts 에
+    대한 이진 탐색으로 구간을 잘라냅니다. retention_days 보다 오래된 날짜
+    파티션은 날짜가 바뀔 때마다 삭제합니다 (0 이면 삭제하지 않음).
+    """
+
+    def __init__(self, root: Optional[str] = None, depth: int = 5, buffer_size: int = 4096,
+                 flush_interval: float = 1.0, retention_days: Optional[int] = None):
+        self.root = root or os.environ.get('TICK_STORE_DIR', 'data/ticks')
+        self.retention_days = (retention_days if retention_days is not None
+                               else int(os.environ.get('TICK_STORE_RETENTION_DAYS', '7')))
+        self.depth = depth
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.schemas = {'book': book_schema(depth), 'gap': GAP_SCHEMA}
+
+        self._buffers: Dict[Tuple[str, str, str], ColumnBuffer] = {}  # (kind, day, stream)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pruned_day: Optional[str] = None
+        self.stats = {'rows_buffered': 0, 'rows_written': 0, 'bytes_written': 0, 'flushes': 0,
+                      'partitions_pruned': 0}
+
+    # ---- 쓰기 ----
+
+    def record(self, kind: str, stream: str, values: Dict[str, Any]):
+        """한 행을 버퍼에 추가합니다. values 에는 스키마의 모든 컬럼이 있어야 합니다."""
+        day = datetime.fromtimestamp(values['ts'], timezone.utc).strftime('%Y-%m-%d')
+        key = (kind, day, stream)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = ColumnBuffer(self.schemas[kind], self.buffer_size)
+            buffer.append(values)
+            self.stats['rows_buffered'] += 1
+            full = buffer.count >= buffer.capacity
+        if full:
+            self.flush()
+
+    def record_book(self, exchange: str, symbol: str, orderbook, ticker: Dict[str, Any],
+                    ts: Optional[float] = None):
+        """호가창 상위 depth 단계와 최근 체결가를 기록합니다. 빈 단계는 0 으로 채웁니다."""
+        values = {'ts': ts or time.time(), 'last': float(ticker.get('last') or 0)}
+        for side, prefix in (('bids', 'bid'), ('asks', 'ask')):
+            levels = np.zeros((self.depth, 2))
+            top = np.asarray(orderbook[side], dtype=np.float64)[:self.depth]
+            if len(top):
+                levels[:len(top)] = top[:, :2]
+            values[f'{prefix}_px'] = levels[:, 0]
+            values[f'{prefix}_sz'] = levels[:, 1]
+        self.record('book', stream_key(exchange, symbol), values)
+
+    def record_gap(self, pair: str, symbol: str, gap: float, price1: float, price2: float,
+                   ts: Optional[float] = None):
+        """거래소 쌍의 가격차(%)를 기록합니다. pair 예: 'mexc-bitget'"""
+        self.record('gap', stream_key(pair, symbol),
+                    {'ts': ts or time.time(), 'gap': gap, 'price1': price1, 'price2': price2})
+
+    def attach(self, market_data, pairs: Optional[List[Tuple[str, str]]] = None):
+        """시세 캐시 갱신마다 호가와 거래소 쌍 가격차를 기록하도록 연결합니다."""
+        pairs = pairs or DEFAULT_PAIRS
+
+        def on_update(exchange: str, symbol: str):
+            try:
+                snapshot = market_data.get_snapshot(exchange, symbol)
+                if not snapshot:
+                    return
+                now = time.time()
+                self.record_book(exchange, symbol, snapshot['orderbook'], snapshot['ticker'], now)
+                for exchange1, exchange2 in pairs:
+                    if exchange not in (exchange1, exchange2):
+                        continue
+                    snapshot1 = market_data.get_snapshot(exchange1, symbol)
+                    snapshot2 = market_data.get_snapshot(exchange2, symbol)
+                    if not snapshot1 or not snapshot2:
+                        continue
+                    price1 = float(snapshot1['ticker']['last'])
+                    price2 = float(snapshot2['ticker']['last'])
+                    self.record_gap(f"{exchange1}-{exchange2}", symbol,
+                                    (price1 - price2) / price2 * 100, price1, price2, now)
+            except Exception as e:
+                logger.error(f"Failed to record tick for {exchange} {symbol}: {e}")
+
+        market_data.add_listener(on_update)
+
+    def start(self):
+        """주기적으로 버퍼를 디스크에 기록하는 스레드를 시작합니다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-store-flush', daemon=True)
+        self._thread.start()
+        logger.info(f"Tick store writing to {self.root}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        self._prune_daily()
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Tick store flush failed: {e}")
+            self._prune_daily()
+
+    def _prune_daily(self):
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        if self._pruned_day == today:
+            return
+        self._pruned_day = today
+        try:
+            self.prune()
+        except Exception as e:
+            logger.error(f"Tick store prune failed: {e}")
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """보관 기간(retention_days)이 지난 날짜 파티션을 삭제하고 삭제한 수를 반환합니다."""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = (datetime.fromtimestamp(now or time.time(), timezone.utc).date()
+                  - timedelta(days=self.retention_days)).isoformat()
+        removed = 0
+        for kind in self.schemas:
+            base = os.path.join(self.root, kind)
+            if not os.path.isdir(base):
+                continue
+            for day in os.listdir(base):
+                if day < cutoff:
+                    shutil.rmtree(os.path.join(base, day), ignore_errors=True)
+                    removed += 1
+        if removed:
+            self.stats['partitions_pruned'] += removed
+            logger.info(f"Pruned {removed} tick store partitions older than {cutoff}")
+        return removed
+
+    def flush(self):
+        """버퍼의 행을 컬럼 파일 끝에 추가합니다."""
+        with self._flush_lock:
+            # 잠금 안에서는 채워진 부분만 복사하고 버퍼는 재사용
+            today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            with self._lock:
+                pending = []
+                for key, buffer in list(self._buffers.items()):
+                    if not buffer.count:
+                        if key[1] < today:
+                            del self._buffers[key]  # 지난 날짜 버퍼 정리
+                        continue
+                    chunks = {name: column[:buffer.count].tobytes() for name, column in buffer.columns.items()}
+                    pending.append((key, buffer.schema, buffer.count, chunks))
+                    buffer.count = 0
+
+            for (kind, day, stream), schema, count, chunks in pending:
+                directory = os.path.join(self.root, kind, day, stream)
+                self._ensure_partition(directory, schema)
+                for name, data in chunks.items():
+                    with open(os.path.join(directory, f"{name}.f64"), 'ab') as f:
+                        f.write(data)
+                    self.stats['bytes_written'] += len(data)
+                self.stats['rows_written'] += count
+            if pending:
+                self.stats['flushes'] += 1
+
+    def _ensure_partition(self, directory: str, schema: List[Tuple[str, int]]):
+        meta_path = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_path):
+            return
+        os.makedirs(directory, exist_ok=True)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STORE_VERSION, 'columns': dict(schema)}, f)
+
+    # ---- 읽기 ----
+
+    def streams(self, kind: str, day: Optional[str] = None) -> List[str]:
+        """저장된 스트림 이름 목록"""
+        base = os.path.join(self.root, kind)
+        if not os.path.isdir(base):
+            return []
+        days = [day] if day else sorted(os.listdir(base))
+        names = set()
+        for partition in days:
+            path = os.path.join(base, partition)
+            if os.path.isdir(path):
+                names.update(os.listdir(path))
+        return sorted(names)
+
+    def _open_partition(self, directory: str) -> Optional[Dict[str, np.ndarray]]:
+        """한 날짜 파티션의 컬럼들을 읽기 전용 memmap 으로 엽니다."""
+        meta_path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            widths = json.load(f)['columns']
+
+        columns = {}
+        for name, width in widths.items():
+            path = os.path.join(directory, f"{name}.f64")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            rows = size // (8 * width)
+            if rows == 0:
+                return None
+            data = np.memmap(path, dtype=np.float64, mode='r', shape=(rows * width,))
+            columns[name] = data.reshape(rows, width) if width > 1 else data
+
+        # 기록 도중 중단된 경우를 대비해 가장 짧은 컬럼 길이에 맞춤
+        rows = min(len(column) for column in columns.values())
+        return {name: column[:rows] for name, column in columns.items()}
+
+    def read(self, kind: str, stream: str, start: float, end: float,
+             columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """[start, end) 구간의 행을 컬럼별 배열로 반환합니다.
+
+        하루 안의 구간이면 memmap 의 슬라이스(복사 없음)를, 여러 날에 걸치면
+        이어 붙인 배열을 반환합니다.
+        """
+        self.flush()
+        parts: List[Dict[str, np.ndarray]] = []
+        day = datetime.fromtimestamp(start, timezone.utc).date()
+        last_day = datetime.fromtimestamp(end, timezone.utc).date()
+        while day <= last_day:
+            partition = self._open_partition(os.path.join(self.root, kind, day.isoformat(), stream))
+            day += timedelta(days=1)
+            if partition is None:
+                continue
+            ts = partition['ts']
+            lo, hi = np.searchsorted(ts, start), np.searchsorted(ts, end)
+            if hi > lo:
+                parts.append({name: column[lo:hi] for name, column in partition.items()
+                              if columns is None or name in columns or name == 'ts'})
+
+        if not parts:
+            widths = dict(self.schemas[kind])
+            return {name: np.empty((0, widths[name]) if widths[name] > 1 else 0)
+                    for name in widths if columns is None or name in columns or name == 'ts'}
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def downsample(self, kind: str, stream: str, start: float, end: float, interval: float,
+                   column: str) -> Dict[str, np.ndarray]:
+        """interval 초 단위 구간별 시작/최고/최저/마지막 값과 건수를 반환합니다 (차트용)."""
+        data = self.read(kind, stream, start, end, [column])
+        ts, values = data['ts'], data[column]
+        if values.ndim > 1:
+            values = values[:, 0]  # 호가 컬럼은 최우선 호가 사용
+        if not len(ts):
+            empty = np.empty(0)
+            return {'ts': empty, 'open': empty, 'high': empty, 'low': empty, 'close': empty,
+                    'count': np.empty(0, dtype=np.int64)}
+
+        buckets = np.floor(ts / interval).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(ts)] - 1
+        return {
+            'ts': buckets[starts] * float(interval),
+            'open': values[starts],
+            'high': np.maximum.reduceat(values, starts),
+            'low': np.minimum.reduceat(values, starts),
+            'close': values[ends],
+            'count': ends - starts + 1
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = sum(buffer.count for buffer in self._buffers.values())
+        return {**self.stats, 'buffered': buffered, 'root': self.root, 'retention_days': self.retention_days}
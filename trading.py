@@ -2,15 +2,51 @@ import os
 import logging
 import ccxt
 import time
-import hmac
-import hashlib
-import requests
-from typing import Optional, Dict, Any, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+from typing import Optional, Dict, Any, Tuple, List, Callable, Union
 from datetime import datetime
+from account_config import AccountConfigCache
+from markets_cache import MarketsCache
+from depth import order_sizing
+from orderbook import OrderBook
+from symbol_universe import SymbolUniverse
+from metrics import ExchangeMetrics
+from position_ledger import PositionLedger
+from order_gateway import build_gateway, OrderGatewayError
+from mock_client import point_client, venue_url
+from rate_limiter import RateLimitScheduler, PRIORITY_ORDER, PRIORITY_MARKET_DATA, PRIORITY_ACCOUNT
 
 logger = logging.getLogger(__name__)
 
+# 프로세스 전체에서 공유하는 TradingExecutor
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_trading_executor() -> 'TradingExecutor':
+    """프로세스 전체에서 하나의 TradingExecutor 를 생성/반환합니다."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = TradingExecutor()
+        return _shared_executor
+
+
 class TradingExecutor:
+    EXCHANGE_NAMES = {
+        'mexc': 'MEXC',
+        'gateio': 'Gate.io',
+        'bitget': 'Bitget'
+    }
+
+    # 선물 시장가(taker) 수수료율
+    TAKER_FEES = {
+        'mexc': 0.0002,
+        'gateio': 0.0005,
+        'bitget': 0.0006
+    }
+
     def __init__(self):
         try:
             # Initialize exchanges
@@ -20,8 +56,7 @@ class TradingExecutor:
             self.mexc = ccxt.mexc({
                 'apiKey': os.environ.get('MEXC_API_KEY'),
                 'secret': os.environ.get('MEXC_API_SECRET'),
-                'enableRateLimit': True,
-                'rateLimit': 20,  # 최소 delay를 20ms로 설정
+                'enableRateLimit': True,  # 요청 간격은 RateLimitScheduler 가 관리
                 'options': {
                     'defaultType': 'future'
                 }
@@ -31,8 +66,7 @@ class TradingExecutor:
             self.gateio = ccxt.gateio({
                 'apiKey': os.environ.get('GATEIO_API_KEY'),
                 'secret': os.environ.get('GATEIO_API_SECRET'),
-                'enableRateLimit': True,
-                'rateLimit': 20,  # 최소 delay를 20ms로 설정
+                'enableRateLimit': True,  # 요청 간격은 RateLimitScheduler 가 관리
                 'options': {
                     'defaultType': 'future'
                 }
@@ -43,8 +77,7 @@ class TradingExecutor:
                 'apiKey': os.environ.get('BITGET_API_KEY'),
                 'secret': os.environ.get('BITGET_API_SECRET'),
                 'password': os.environ.get('BITGET_PASSPHRASE'),
-                'enableRateLimit': True,
-                'rateLimit': 20,  # 최소 delay를 20ms로 설정
+                'enableRateLimit': True,  # 요청 간격은 RateLimitScheduler 가 관리
                 'options': {
                     'defaultType': 'swap',
                     'defaultSubType': 'linear',
@@ -52,35 +85,206 @@ class TradingExecutor:
                 }
             })
 
-            self.initialized_exchanges = []
+            # 로컬 가상 거래소(mock_exchange_server.py)로 모든 요청을 보냄 (MOCK_EXCHANGE_URL)
+            self.mock_url = os.environ.get('MOCK_EXCHANGE_URL')
+            if self.mock_url:
+                logger.warning(f"Using mock exchange server at {self.mock_url}")
+                for exchange, client in (('mexc', self.mexc), ('gateio', self.gateio), ('bitget', self.bitget)):
+                    point_client(client, exchange, self.mock_url)
+
+            # 모든 거래소 요청을 거래소별 토큰 버킷과 우선순위(주문 > 시세 > 잔액/대시보드)로 조절
+            self.rate_limiter = RateLimitScheduler()
+            # 거래소 호출별 지연시간/오류/응답 크기 (/api/metrics)
+            self.metrics = ExchangeMetrics()
+            for exchange, client in (('mexc', self.mexc), ('gateio', self.gateio), ('bitget', self.bitget)):
+                self.rate_limiter.install(client, exchange)
+                self.metrics.install(client, exchange)
+
+            # 여러 거래소/코인 조회를 병렬로 실행하기 위한 스레드 풀
+            self._fetch_pool = ThreadPoolExecutor(max_workers=12, thread_name_prefix='exchange-fetch')
+            # 주문은 시세 조회와 별도의 풀에서 실행하여 대기하지 않도록 함
+            self._order_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='order-leg')
+
+            # 시장가 주문을 ccxt 대신 직접 서명해 보내는 거래소별 게이트웨이 (ORDER_GATEWAY_ENABLED=1)
+            self.gateways = {}
+            self._test_gateways = {}
+            self._test_gateways_lock = threading.Lock()
+            if os.environ.get('ORDER_GATEWAY_ENABLED') == '1':
+                self.gateways = {exchange: self._build_gateway(exchange) for exchange in self.EXCHANGE_NAMES}
+                for gateway in self.gateways.values():
+                    gateway.start()
+
+            # 이미 적용된 마진 모드/레버리지 캐시
+            self.account_config = AccountConfigCache({
+                'mexc': self.mexc,
+                'gateio': self.gateio,
+                'bitget': self.bitget
+            })
 
-            # Initialize each exchange separately
-            if self._initialize_mexc():
-                self.initialized_exchanges.append('MEXC')
-            if self._initialize_gateio():
-                self.initialized_exchanges.append('Gate.io')
-            if self._initialize_bitget():
-                self.initialized_exchanges.append('Bitget')
+            # 마켓 메타데이터 로컬 캐시 (load_markets 다운로드 생략, 가상 거래소 마켓은 따로 저장)
+            self.markets_cache = MarketsCache(
+                os.path.join(os.environ.get('MARKETS_CACHE_DIR', '.cache/markets'), 'mock') if self.mock_url else None
+            )
 
-            if not self.initialized_exchanges:
+            # 공통 심볼 <-> 거래소 심볼 인덱스 (거래소 초기화/마켓 갱신 시 다시 만듦)
+            self.universe = SymbolUniverse()
+            self.markets_cache.add_listener(
+                lambda exchange_id, client: self.universe.add_exchange(exchange_id, client.markets))
+
+            # 체결 알림을 받는 콜백 (잔액 캐시 무효화, 체결 기록)
+            self._fill_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+            # (거래소, 코인) 별 포지션 장부 (체결로 갱신, 주기적으로 거래소 스냅샷과 대조)
+            self.positions = PositionLedger(
+                self,
+                reconcile_interval=float(os.environ.get('POSITION_RECONCILE_INTERVAL', '60')),
+                max_notional=float(os.environ['MAX_SYMBOL_NOTIONAL']) if os.environ.get('MAX_SYMBOL_NOTIONAL') else None,
+                max_skew=float(os.environ['MAX_INVENTORY_SKEW']) if os.environ.get('MAX_INVENTORY_SKEW') else None
+            )
+            self.add_fill_listener(self.positions.apply_fill)
+
+            self.initialized_exchanges = []
+            self._ready = {exchange: threading.Event() for exchange in self.EXCHANGE_NAMES}
+            self._init_done = {exchange: threading.Event() for exchange in self.EXCHANGE_NAMES}
+
+            # 거래소별로 병렬 초기화하고, 초기화가 끝난 거래소부터 바로 사용 가능으로 표시
+            init_pool = ThreadPoolExecutor(max_workers=len(self.EXCHANGE_NAMES), thread_name_prefix='exchange-init')
+            futures = [
+                init_pool.submit(self._initialize_exchange, exchange, initializer)
+                for exchange, initializer in (
+                    ('mexc', self._initialize_mexc),
+                    ('gateio', self._initialize_gateio),
+                    ('bitget', self._initialize_bitget)
+                )
+            ]
+            init_pool.shutdown(wait=False)
+            self.markets_cache.start_background_refresh()
+            self.positions.start()
+
+            # 최소 한 거래소가 준비될 때까지만 대기
+            if not any(future.result() for future in as_completed(futures)):
                 logger.error("No exchanges were initialized")
                 raise Exception("Failed to initialize exchanges")
 
-            logger.info(f"Successfully initialized {len(self.initialized_exchanges)} exchange clients")
+            logger.info(f"Exchange clients ready: {', '.join(self.initialized_exchanges)} "
+                        f"(remaining exchanges continue initializing in background)")
 
         except Exception as e:
             logger.error(f"Failed to initialize exchange clients: {str(e)}")
             raise
 
+    def _initialize_exchange(self, exchange: str, initializer) -> bool:
+        """거래소 하나를 초기화하고 준비 상태를 표시합니다."""
+        try:
+            if initializer():
+                self.universe.add_exchange(exchange, self._client(exchange).markets)
+                self.initialized_exchanges.append(self.EXCHANGE_NAMES[exchange])
+                self._ready[exchange].set()
+                logger.info(f"{self.EXCHANGE_NAMES[exchange]} is ready")
+                return True
+            return False
+        finally:
+            self._init_done[exchange].set()
+
+    def _build_gateway(self, exchange: str):
+        return build_gateway(exchange, venue_url(self.mock_url, exchange) if self.mock_url else None)
+
+    def _test_gateway(self, exchange: str):
+        """테스트 주문용 게이트웨이 (게이트웨이를 켜지 않은 경우, 처음 한 번 만들고 시각을 맞춰 재사용)"""
+        with self._test_gateways_lock:
+            gateway = self._test_gateways.get(exchange)
+            if gateway is None:
+                gateway = self._test_gateways[exchange] = self._build_gateway(exchange)
+                gateway.sync_clock()
+            return gateway
+
+    def _client(self, exchange: str):
+        clients = {
+            'mexc': self.mexc,
+            'gateio': self.gateio,
+            'bitget': self.bitget
+        }
+        if exchange not in clients:
+            raise ValueError(f"Invalid exchange: {exchange}")
+        return clients[exchange]
+
+    def market_symbol(self, exchange: str, symbol: str) -> str:
+        """공통 심볼('XRP/USDT')을 거래소의 USDT 무기한 선물 심볼로 변환합니다."""
+        return self.universe.market_symbol(exchange, symbol)
+
+    def contract_size(self, exchange: str, symbol: str) -> float:
+        """주문 수량 1 이 나타내는 코인 수 (공통 심볼 또는 거래소 심볼)"""
+        market = self.universe.market(exchange, self.universe.canonical(exchange, symbol))
+        return market['contract_size'] if market else 1.0
+
+    def order_amount(self, exchange: str, symbol: str, amount: float) -> float:
+        """주문 계약 수를 거래소 수량 정밀도로 내림합니다. 최소 단위보다 작으면 0 을 반환합니다."""
+        client = self._client(exchange)
+        market_symbol = self.market_symbol(exchange, self.universe.canonical(exchange, symbol))
+        if market_symbol not in (client.markets or {}):
+            return amount
+        try:
+            return float(client.amount_to_precision(market_symbol, amount))
+        except ccxt.InvalidOrder:
+            return 0.0
+
+    def amount_precision(self, exchange: str, symbol: str) -> Optional[float]:
+        """주문 수량(계약 수)의 최소 단위를 반환합니다 (모르면 None)."""
+        try:
+            client = self._client(exchange)
+            market = client.markets[self.market_symbol(exchange, self.universe.canonical(exchange, symbol))]
+            step = market['precision']['amount']
+            if step is None:
+                return None
+            if client.precisionMode != ccxt.TICK_SIZE:
+                step = 10 ** -step  # 소수 자릿수로 표기하는 거래소
+            return float(step)
+        except Exception as e:
+            logger.warning(f"Unknown amount precision for {symbol} on {exchange}: {e}")
+            return None
+
+    def lot_size(self, exchange: str, symbol: str) -> float:
+        """최소 주문 단위를 코인 수로 반환합니다 (계약 크기 x 수량 정밀도, 모르면 0)."""
+        step = self.amount_precision(exchange, symbol)
+        return step * self.contract_size(exchange, symbol) if step else 0.0
+
+    def request_budget(self, exchange: str, interval: float, utilization: float = 0.5) -> int:
+        """interval 초 동안 보낼 수 있는 시세 요청 수 (공개 API 한도의 utilization 비율만 사용)"""
+        return self.rate_limiter.budget(exchange, interval, 'public', utilization)
+
+    def is_ready(self, exchange: str) -> bool:
+        """거래소 초기화가 끝나 사용 가능한지 확인합니다."""
+        return exchange in self._ready and self._ready[exchange].is_set()
+
+    def wait_ready(self, exchange: str, timeout: Optional[float] = None) -> bool:
+        """거래소 초기화가 끝날 때까지 기다리고, 사용 가능 여부를 반환합니다."""
+        if exchange not in self._ready:
+            return False
+        self._init_done[exchange].wait(timeout)
+        return self._ready[exchange].is_set()
+
+    def get_readiness(self) -> Dict[str, str]:
+        """거래소별 초기화 상태('ready', 'initializing', 'failed')를 반환합니다."""
+        readiness = {}
+        for exchange, name in self.EXCHANGE_NAMES.items():
+            if self._ready[exchange].is_set():
+                readiness[name] = 'ready'
+            elif self._init_done[exchange].is_set():
+                readiness[name] = 'failed'
+            else:
+                readiness[name] = 'initializing'
+        return readiness
+
     def _initialize_mexc(self):
         """MEXC 초기화"""
         try:
             logger.info("Testing MEXC API connection...")
             start_time = time.time()
 
-            # Load markets first
+            # Load markets first (로컬 캐시가 있으면 캐시 사용)
             logger.info("Loading MEXC markets...")
-            self.mexc.load_markets()
+            with self.metrics.measure('mexc', 'load_markets'):
+                self.markets_cache.warm_start(self.mexc, 'mexc')
             logger.info("MEXC markets loaded successfully")
 
             # Test futures market access with detailed options
@@ -96,7 +300,8 @@ class TradingExecutor:
 
             # Test ticker fetch with proper options
             symbol = 'XRP/USDT'
-            ticker = self.mexc.fetch_ticker(symbol)
+            with self.metrics.measure('mexc', 'fetch_ticker', symbol):
+                ticker = self.mexc.fetch_ticker(symbol)
             logger.info(f"MEXC futures ticker response for {symbol}: {ticker}")
 
             if ticker and ticker.get('last'):
@@ -117,8 +322,13 @@ class TradingExecutor:
             logger.info("Testing Gate.io API connection...")
             start_time = time.time()
 
+            # Load markets (로컬 캐시가 있으면 캐시 사용)
+            with self.metrics.measure('gateio', 'load_markets'):
+                self.markets_cache.warm_start(self.gateio, 'gateio')
+
             # Test ticker fetch
-            ticker = self.gateio.fetch_ticker('XRP/USDT')
+            with self.metrics.measure('gateio', 'fetch_ticker', 'XRP/USDT'):
+                ticker = self.gateio.fetch_ticker('XRP/USDT')
             logger.info(f"Gate.io ticker response: {ticker}")
 
             if ticker and ticker.get('last'):
@@ -139,13 +349,15 @@ class TradingExecutor:
             logger.info("Testing Bitget API connection...")
             start_time = time.time()
 
-            # Load markets first
-            self.bitget.load_markets()
+            # Load markets first (로컬 캐시가 있으면 캐시 사용)
+            with self.metrics.measure('bitget', 'load_markets'):
+                self.markets_cache.warm_start(self.bitget, 'bitget')
             logger.info("Bitget markets loaded")
 
             # Test ticker fetch
             symbol = 'XRP/USDT:USDT'  # USDT-margined contract
-            ticker = self.bitget.fetch_ticker(symbol)
+            with self.metrics.measure('bitget', 'fetch_ticker', symbol):
+                ticker = self.bitget.fetch_ticker(symbol)
             logger.info(f"Bitget ticker response: {ticker}")
 
             if ticker and ticker.get('last'):
@@ -163,54 +375,137 @@ class TradingExecutor:
     def fetch_ticker(self, exchange: str, symbol: str) -> Dict[str, Any]:
         """거래소의 시세 정보를 가져옵니다."""
         try:
-            exchange_map = {
-                'mexc': self.mexc,
-                'gateio': self.gateio,
-                'bitget': self.bitget
-            }
-
-            if exchange not in exchange_map:
-                logger.error(f"Invalid exchange: {exchange}")
-                return {'last': 0}
-
-            logger.info(f"Fetching ticker for {symbol} from {exchange}...")
-            start_time = time.time()
-
-            if exchange == 'bitget':
-                symbol = f"{symbol.split('/')[0]}/USDT:USDT"
-
-            ticker = exchange_map[exchange].fetch_ticker(symbol)
-            logger.info(f"Ticker fetched in {(time.time() - start_time)*1000:.2f}ms")
-            return ticker
+            return self._fetch_raw(exchange, symbol, 'ticker')  # 지연시간은 self.metrics 에 기록
 
         except Exception as e:
             logger.error(f"Failed to fetch ticker for {exchange} {symbol}: {e}")
             return {'last': 0}
 
-    def fetch_order_book(self, exchange: str, symbol: str, limit: int = 5) -> Dict[str, Any]:
+    def fetch_order_book(self, exchange: str, symbol: str, limit: int = 5) -> OrderBook:
         """거래소의 호가창 데이터를 가져옵니다."""
         try:
-            exchange_map = {
-                'mexc': self.mexc,
-                'gateio': self.gateio,
-                'bitget': self.bitget
-            }
-
-            if exchange not in exchange_map:
-                logger.error(f"Invalid exchange: {exchange}")
-                return {'asks': [], 'bids': []}
-
-            if exchange == 'bitget':
-                symbol = f"{symbol.split('/')[0]}/USDT:USDT"  # USDT-margined contract
-                return exchange_map[exchange].fetch_order_book(symbol)
-            else:
-                return exchange_map[exchange].fetch_order_book(symbol, limit=limit)
+            return self._fetch_raw(exchange, symbol, 'orderbook', limit)
 
         except Exception as e:
             logger.error(f"Failed to fetch order book for {exchange} {symbol}: {e}")
-            return {'asks': [], 'bids': []}
+            return OrderBook(symbol)
+
+    def _fetch_raw(self, exchange: str, symbol: str, kind: str, limit: int = 5) -> Any:
+        """예외 처리 없이 시세('ticker') 또는 호가('orderbook', OrderBook)를 조회합니다."""
+        client = self._client(exchange)
+        if not self.is_ready(exchange):
+            raise RuntimeError(f"{exchange} is not ready")
+
+        market_symbol = self.market_symbol(exchange, symbol)
+
+        with self.rate_limiter.context(PRIORITY_MARKET_DATA, 'public'):
+            if kind == 'ticker':
+                with self.metrics.measure(exchange, 'fetch_ticker', symbol):
+                    return client.fetch_ticker(market_symbol)
+            if kind == 'orderbook':
+                with self.metrics.measure(exchange, 'fetch_order_book', symbol):
+                    if exchange == 'bitget':
+                        raw = client.fetch_order_book(market_symbol)
+                    else:
+                        raw = client.fetch_order_book(market_symbol, limit=limit)
+                return OrderBook.from_ccxt(raw, symbol)
+        raise ValueError(f"Invalid fetch kind: {kind}")
+
+    def fetch_tickers(self, exchange: str, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """한 거래소의 여러 코인 시세를 한 번의 요청(fetch_tickers)으로 조회합니다.
+
+        결과는 공통 심볼을 키로 하며, 거래소에 없는 코인은 포함되지 않습니다.
+        """
+        client = self._client(exchange)
+        if not self.is_ready(exchange):
+            raise RuntimeError(f"{exchange} is not ready")
+
+        market_symbols = [self.market_symbol(exchange, symbol) for symbol in symbols
+                          if self.universe.market(exchange, symbol)]
+        if not market_symbols:
+            return {}
+        with self.rate_limiter.context(PRIORITY_MARKET_DATA, 'public'), \
+                self.metrics.measure(exchange, 'fetch_tickers', '*'):
+            tickers = client.fetch_tickers(market_symbols)
+        wanted = set(symbols)
+        result = {}
+        for market_symbol, ticker in tickers.items():
+            symbol = self.universe.canonical(exchange, market_symbol)
+            if symbol in wanted:
+                result[symbol] = ticker
+        return result
+
+    def fetch_all_tickers(self, symbols: List[str], exchanges: List[str],
+                          timeout: Optional[float] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """거래소별 fetch_tickers 를 병렬로 실행합니다. 실패한 거래소는 빈 dict 입니다."""
+        futures = {exchange: self._fetch_pool.submit(self.fetch_tickers, exchange, symbols)
+                   for exchange in exchanges if self.is_ready(exchange)}
+        wait(list(futures.values()), timeout=timeout)
+
+        results: Dict[str, Dict[str, Dict[str, Any]]] = {exchange: {} for exchange in exchanges}
+        for exchange, future in futures.items():
+            if not future.done():
+                future.cancel()
+                logger.error(f"Timed out fetching {len(symbols)} tickers from {exchange}")
+            elif future.exception() is not None:
+                logger.error(f"Failed to fetch tickers from {exchange}: {future.exception()}")
+            else:
+                results[exchange] = future.result()
+        return results
 
-    def execute_order(self, exchange: str, symbol: str, side: str, amount: float, leverage: int = 1) -> Optional[Dict[str, Any]]:
+    def fetch_batch(self, fetch_requests: List[Tuple[str, str, str]], limit: int = 5,
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """(거래소, 코인, 종류) 요청 목록을 병렬로 조회합니다.
+
+        결과는 요청 순서대로 반환되며, 각 항목에 개별 지연시간(latency_ms)과
+        오류(error)가 포함됩니다. timeout 안에 끝나지 않은 요청은 오류로 표시됩니다.
+        """
+        def run(exchange: str, symbol: str, kind: str) -> Tuple[Any, float]:
+            start_time = time.time()
+            data = self._fetch_raw(exchange, symbol, kind, limit)
+            return data, (time.time() - start_time) * 1000
+
+        batch_start = time.time()
+        futures = [self._fetch_pool.submit(run, *request) for request in fetch_requests]
+        wait(futures, timeout=timeout)
+
+        results = []
+        for (exchange, symbol, kind), future in zip(fetch_requests, futures):
+            result = {
+                'exchange': exchange,
+                'symbol': symbol,
+                'kind': kind,
+                'data': None,
+                'latency_ms': None,
+                'error': None
+            }
+            if not future.done():
+                future.cancel()
+                result['error'] = 'timeout'
+            elif future.exception() is not None:
+                result['error'] = str(future.exception())
+                logger.error(f"Failed to fetch {kind} for {exchange} {symbol}: {result['error']}")
+            else:
+                result['data'], result['latency_ms'] = future.result()
+            results.append(result)
+
+        logger.debug(f"Batch of {len(fetch_requests)} fetches completed in {(time.time() - batch_start)*1000:.2f}ms")
+        return results
+
+    def prewarm_account_config(self, symbols: List[str], exchanges: Optional[List[str]] = None, leverage: int = 1):
+        """주문 전에 마진 모드와 레버리지를 미리 적용해 둡니다 (백그라운드 실행)."""
+        for exchange in exchanges or list(self.EXCHANGE_NAMES):
+            for symbol in symbols:
+                symbol = self.market_symbol(exchange, symbol)
+                self._order_pool.submit(self._prewarm, exchange, symbol, leverage)
+
+    def _prewarm(self, exchange: str, symbol: str, leverage: int):
+        with self.rate_limiter.context(PRIORITY_ACCOUNT, 'private'), \
+                self.metrics.measure(exchange, 'account_config', symbol):
+            self.account_config.ensure(exchange, symbol, 'cross', leverage)
+
+    def execute_order(self, exchange: str, symbol: str, side: str, amount: float, leverage: int = 1,
+                      params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """Execute order on specified exchange"""
         try:
             exchange_map = {
@@ -223,93 +518,248 @@ class TradingExecutor:
                 logger.error(f"Invalid exchange: {exchange}")
                 return None
 
-            start_time = time.time()
-
-            # Handle Bitget futures symbol format
-            if exchange == 'bitget':
-                symbol = f"{symbol.split('/')[0]}/USDT:USDT"
-                logger.info(f"Adjusted symbol for Bitget: {symbol}")
+            if not self.wait_ready(exchange, timeout=10):
+                logger.error(f"{exchange} is not ready, order rejected")
+                return None
 
-            # Set margin mode to cross and leverage
-            try:
-                # Set margin mode to cross
-                if exchange == 'gateio':
-                    exchange_map[exchange].set_margin_mode('cross', symbol)
-                elif exchange == 'bitget':
-                    # Bitget uses different parameter names
-                    params = {
-                        'marginCoin': 'USDT',
-                        'marginMode': 'cross'
-                    }
-                    exchange_map[exchange].set_margin_mode('cross', symbol, params)
-
-                # Set leverage
-                exchange_map[exchange].set_leverage(leverage, symbol)
-                logger.info(f"Set cross mode and leverage {leverage}x for {symbol} on {exchange}")
-            except Exception as e:
-                logger.error(f"Failed to set margin mode or leverage on {exchange}: {e}")
-                # Continue with order anyway
-
-            # Execute market order
-            order = exchange_map[exchange].create_order(
-                symbol=symbol,
-                type='market',
-                side=side,
-                amount=amount
-            )
+            start_time = time.time()
 
-            order_time = (time.time() - start_time) * 1000
+            # 공통 심볼을 거래소 선물 심볼로 변환
+            symbol = self.market_symbol(exchange, symbol)
+
+            with self.rate_limiter.context(PRIORITY_ORDER, 'private'):
+                # Set margin mode to cross and leverage (이미 적용된 경우 생략)
+                if not params or not params.get('reduceOnly'):
+                    with self.metrics.measure(exchange, 'account_config', symbol):
+                        self.account_config.ensure(exchange, symbol, 'cross', leverage)  # 실패해도 주문은 계속 진행
+
+                # Execute market order
+                sent_at = time.time()
+                gateway_timings = None
+                with self.metrics.measure(exchange, 'create_order', symbol):
+                    if exchange in self.gateways:
+                        order, gateway_timings = self._submit_via_gateway(exchange, symbol, side, amount, params)
+                        sent_at = order['timestamp'] / 1000
+                        acked_at = order['lastUpdateTimestamp'] / 1000  # 체결 상태 조회 시간 제외
+                    else:
+                        order = exchange_map[exchange].create_order(
+                            symbol=symbol,
+                            type='market',
+                            side=side,
+                            amount=amount,
+                            params=params or {}
+                        )
+                        acked_at = time.time()
+
+            self._notify_fill(exchange, symbol, side, amount, order, bool(params and params.get('reduceOnly')), acked_at)
+            order_time = (acked_at - start_time) * 1000
             logger.info(f"Order executed on {exchange}: {side} {amount} {symbol}")
             return {
                 'order': order,
                 'times': {
-                    'total_ms': order_time
+                    'total_ms': order_time,
+                    'sent_at': sent_at,
+                    'acked_at': acked_at,
+                    'round_trip_ms': (acked_at - sent_at) * 1000,
+                    'gateway': gateway_timings
                 }
             }
 
         except Exception as e:
             logger.error(f"Failed to execute order on {exchange}: {e}")
+            self.account_config.invalidate(exchange, symbol)
             return None
 
-    def execute_simultaneous_orders(self, mexc_symbol: str, bitget_symbol: str, mexc_side: str, bitget_side: str, amount: float) -> Tuple[bool, str]:
-        """두 거래소에 동시에 주문을 실행합니다."""
+    def _submit_via_gateway(self, exchange: str, symbol: str, side: str, amount: float,
+                            params: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """게이트웨이로 시장가 주문을 보내고 (ccxt 주문 형태, 구간별 시간(µs)) 을 반환합니다.
+
+        주문 응답에 체결 상태가 없는 거래소(MEXC, Bitget)는 주문을 조회해 체결 수량과
+        평균가를 채우며, 전혀 체결되지 않은 IOC 주문은 OrderGatewayError 로 실패 처리합니다.
+        """
+        gateway = self.gateways[exchange]
+        canonical = self.universe.canonical(exchange, symbol)
+        # ccxt throttle 을 거치지 않으므로 요청 한도 토큰을 직접 가져옴
+        self.rate_limiter.acquire(exchange, 'private', PRIORITY_ORDER)
+        market_id = self.universe.market_id(exchange, canonical) or symbol
+        result = gateway.submit(market_id, side, amount, reduce_only=bool(params and params.get('reduceOnly')),
+                                amount_step=self.amount_precision(exchange, canonical))
+        fill = result['fill']
+        if fill is None:
+            self.rate_limiter.acquire(exchange, 'private', PRIORITY_ORDER)
+            fill = gateway.fetch_fill(market_id, result['id'])
+        if fill['filled'] <= 0:
+            raise OrderGatewayError(f"{exchange} IOC order {result['id']} was not filled ({fill['status']})",
+                                    response=result['response'], timings=result['timings'])
+        order = {
+            'id': result['id'],
+            'clientOrderId': result['client_oid'],
+            'symbol': symbol,
+            'type': 'market',
+            'side': side,
+            'amount': result['amount'],
+            'filled': fill['filled'],
+            'remaining': max(0.0, result['amount'] - fill['filled']),
+            'average': fill['average'],
+            'price': fill['average'],
+            'status': fill['status'],
+            'timestamp': result['sent_at'] * 1000,
+            'lastUpdateTimestamp': result['acked_at'] * 1000,
+            'info': result['response']
+        }
+        return order, result['timings']
+
+    def execute_simultaneous_orders(self, symbol1: str, symbol2: str, side1: str, side2: str,
+                                    amount: Union[float, Dict[str, float]], deadline: float = 5.0,
+                                    price: Optional[float] = None, exchange1: str = 'mexc',
+                                    exchange2: str = 'bitget') -> Tuple[bool, str, Dict[str, Any]]:
+        """두 거래소(기본 MEXC, Bitget)에 동시에 주문을 실행합니다.
+
+        두 주문은 병렬로 전송되며, deadline(초) 안에 응답을 받지 못한 주문은 실패로
+        간주합니다. 한쪽만 체결된 경우 체결된 주문을 reduce-only 반대 주문으로
+        청산(헤지)합니다. 세 번째 반환값에 각 주문의 전송/응답 시각과 두 주문 간
+        시간차(skew)가 포함됩니다. 주문 전에 포지션 장부로 노출 한도를 확인하며,
+        price 는 한도 계산에 쓰는 현재가입니다 (없으면 장부의 최근 체결가).
+        amount 는 거래소별 주문 계약 수 {exchange: 계약 수} 이며, 숫자 하나를 주면
+        양쪽에 같은 계약 수로 주문합니다. 각 수량은 거래소 정밀도로 내림하며,
+        내림 후 0 인 주문이 있으면 어느 쪽도 주문하지 않습니다.
+        """
+        amounts = amount if isinstance(amount, dict) else {exchange1: amount, exchange2: amount}
+        legs = {
+            exchange1: {'symbol': symbol1, 'side': side1, 'amount': amounts[exchange1]},
+            exchange2: {'symbol': symbol2, 'side': side2, 'amount': amounts[exchange2]}
+        }
+        report: Dict[str, Any] = {'legs': {}, 'skew_ms': None, 'ack_skew_ms': None, 'unwound': []}
+
         try:
-            # MEXC와 Bitget에 주문 실행
-            mexc_order = self.execute_order('mexc', mexc_symbol, mexc_side, amount, leverage=1)
-            bitget_order = self.execute_order('bitget', bitget_symbol, bitget_side, amount, leverage=1)
-
-            # 두 주문이 모두 성공했는지 확인
-            if mexc_order and bitget_order:
-                logger.info("Successfully executed orders on both exchanges")
-                return True, "성공: 양쪽 거래소 주문 완료"
-            else:
-                # 주문 실패 시 취소 시도
-                if mexc_order:
-                    try:
-                        self.mexc.cancel_order(mexc_order['order']['id'], mexc_symbol)
-                        logger.info("Cancelled MEXC order after Bitget order failed")
-                    except Exception as e:
-                        logger.error(f"Failed to cancel MEXC order: {e}")
-
-                if bitget_order:
-                    try:
-                        self.bitget.cancel_order(bitget_order['order']['id'], bitget_symbol)
-                        logger.info("Cancelled Bitget order after MEXC order failed")
-                    except Exception as e:
-                        logger.error(f"Failed to cancel Bitget order: {e}")
-
-                return False, "실패: 주문 실패 후 취소 처리됨"
+            for exchange, leg in legs.items():
+                leg['amount'] = self.order_amount(exchange, leg['symbol'], leg['amount'])
+                if leg['amount'] <= 0:
+                    logger.warning(f"Order amount for {leg['symbol']} on {exchange} is below the minimum lot")
+                    return False, f"실패: {self.EXCHANGE_NAMES[exchange]} 주문 수량이 최소 단위보다 작습니다", report
+
+            # 주문 전 노출 한도 확인 (로컬 포지션 장부만 조회, 수량은 계약 수)
+            allowed, reason = self.positions.check_order([
+                (exchange, self.universe.canonical(exchange, leg['symbol']), leg['side'], leg['amount'],
+                 self.contract_size(exchange, leg['symbol']))
+                for exchange, leg in legs.items()
+            ], price)
+            if not allowed:
+                logger.warning(f"Orders rejected by exposure check: {reason}")
+                return False, f"실패: {reason}", report
+
+            futures = {
+                exchange: self._order_pool.submit(self.execute_order, exchange, leg['symbol'], leg['side'], leg['amount'], 1)
+                for exchange, leg in legs.items()
+            }
+            wait(futures.values(), timeout=deadline)
+
+            results = {}
+            for exchange, future in futures.items():
+                if not future.done():
+                    report['legs'][exchange] = {'status': 'timeout'}
+                    continue
+                results[exchange] = future.result()
+                report['legs'][exchange] = self._leg_report(results[exchange])
+
+            if all(report['legs'][exchange]['status'] == 'filled' for exchange in legs):
+                times1 = results[exchange1]['times']
+                times2 = results[exchange2]['times']
+                report['skew_ms'] = abs(times1['sent_at'] - times2['sent_at']) * 1000
+                report['ack_skew_ms'] = abs(times1['acked_at'] - times2['acked_at']) * 1000
+                logger.info(f"Successfully executed orders on both exchanges "
+                            f"(skew {report['skew_ms']:.2f}ms, ack skew {report['ack_skew_ms']:.2f}ms)")
+                return True, "성공: 양쪽 거래소 주문 완료", report
+
+            pending = [future for future in futures.values() if not future.done()]
+            if pending:
+                # 마감 이후 응답이 오면 그때 한쪽 체결 여부를 판단하여 청산
+                logger.error(f"Order deadline of {deadline}s exceeded, reconciling legs in background")
+                remaining = {'count': len(pending)}
+                remaining_lock = threading.Lock()
+
+                def on_done(_future):
+                    # 두 주문이 동시에 끝나면 콜백도 서로 다른 스레드에서 동시에 실행됨
+                    with remaining_lock:
+                        remaining['count'] -= 1
+                        last = remaining['count'] == 0
+                    if last:
+                        late_results = {ex: f.result() for ex, f in futures.items()}
+                        for ex, result in late_results.items():
+                            report['legs'][ex] = self._leg_report(result)
+                        self._unwind_single_leg(legs, late_results, report)
+
+                for future in pending:
+                    future.add_done_callback(on_done)
+                return False, f"실패: 주문 응답 지연 ({deadline}초 초과), 미체결 주문 확인 후 청산 예정", report
+
+            self._unwind_single_leg(legs, results, report)
+            if report['unwound']:
+                return False, f"실패: 한쪽 주문 실패로 {', '.join(report['unwound'])} 포지션 청산", report
+            return False, "실패: 양쪽 거래소 주문 실패", report
 
         except Exception as e:
             logger.error(f"Error in simultaneous order execution: {e}")
-            return False, f"오류 발생: {str(e)}"
+            return False, f"오류 발생: {str(e)}", report
+
+    def _leg_report(self, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not result:
+            return {'status': 'failed'}
+        return {
+            'status': 'filled',
+            'order_id': result['order'].get('id'),
+            'sent_at': result['times']['sent_at'],
+            'acked_at': result['times']['acked_at'],
+            'round_trip_ms': result['times']['round_trip_ms']
+        }
+
+    def _unwind_single_leg(self, legs: Dict[str, Dict[str, Any]], results: Dict[str, Optional[Dict[str, Any]]],
+                           report: Dict[str, Any]):
+        """한쪽 주문만 체결된 경우 체결된 주문을 시장가 반대 주문으로 청산합니다."""
+        filled = [exchange for exchange, result in results.items() if result]
+        if len(filled) != 1:
+            return
+
+        exchange = filled[0]
+        leg = legs[exchange]
+        order = results[exchange]['order']
+        amount = order.get('filled') or order.get('amount')
+        unwind_side = 'sell' if leg['side'] == 'buy' else 'buy'
+
+        for attempt in range(3):
+            unwind = self.execute_order(exchange, leg['symbol'], unwind_side, amount, 1, params={'reduceOnly': True})
+            if unwind:
+                logger.info(f"Unwound {exchange} leg: {unwind_side} {amount} {leg['symbol']}")
+                report['unwound'].append(exchange)
+                return
+            logger.error(f"Failed to unwind {exchange} leg (attempt {attempt + 1}/3)")
+        logger.error(f"Could not unwind {exchange} leg, manual intervention required: {leg['side']} {amount} {leg['symbol']}")
+
+    def _ledger_position(self, exchange: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """포지션 장부의 포지션을 ccxt fetch_position 형태(side, contracts, unrealizedPnl)로 반환합니다."""
+        symbol = self.universe.canonical(exchange, symbol)
+        position = self.positions.get_position(exchange, symbol)
+        if not position or not position['quantity']:
+            return None
+        mark = self.positions.last_price(symbol) or position['entry_price']
+        return {
+            'side': position['side'],
+            'contracts': abs(position['quantity']) / self.contract_size(exchange, symbol),
+            'unrealizedPnl': (mark - position['entry_price']) * position['quantity']
+        }
 
     def close_positions(self, mexc_symbol: str, bitget_symbol: str, amount: float) -> Tuple[bool, str]:
         """두 거래소의 포지션을 동시에 종료합니다."""
         try:
-            # MEXC와 Bitget의 현재 포지션 확인
-            mexc_position = self.mexc.fetch_position(mexc_symbol)
-            bitget_position = self.bitget.fetch_position(bitget_symbol)
+            # MEXC와 Bitget의 현재 포지션 확인 (포지션 장부에 없을 때만 거래소에 조회)
+            mexc_position = self._ledger_position('mexc', mexc_symbol)
+            bitget_position = self._ledger_position('bitget', bitget_symbol)
+            if not mexc_position or not bitget_position:
+                with self.rate_limiter.context(PRIORITY_ORDER, 'private'):
+                    with self.metrics.measure('mexc', 'fetch_position', mexc_symbol):
+                        mexc_position = self.mexc.fetch_position(self.market_symbol('mexc', mexc_symbol))
+                    with self.metrics.measure('bitget', 'fetch_position', bitget_symbol):
+                        bitget_position = self.bitget.fetch_position(self.market_symbol('bitget', bitget_symbol))
 
             if not mexc_position or not bitget_position:
                 return False, "포지션 정보를 가져올 수 없음"
@@ -334,7 +784,7 @@ class TradingExecutor:
             }
 
             # 동시에 종료 주문 실행
-            success, message = self.execute_simultaneous_orders(
+            success, message, _ = self.execute_simultaneous_orders(
                 mexc_symbol, bitget_symbol,
                 mexc_side, bitget_side,
                 amount
@@ -358,23 +808,51 @@ class TradingExecutor:
             logger.error(f"Error closing positions: {e}")
             return False, f"포지션 종료 중 오류 발생: {str(e)}"
 
-    def calculate_tradable_amount(self, exchange1_orderbook: dict, exchange2_orderbook: dict) -> float:
-        """두 거래소의 호가창을 비교하여 거래 가능한 금액을 계산합니다."""
+    def calculate_tradable_amount(self, exchange1_orderbook: OrderBook, exchange2_orderbook: OrderBook, gap: float = 0.0,
+                                  min_edge_pct: float = 0.0, exchange1: str = 'mexc', exchange2: str = 'bitget',
+                                  symbol: Optional[str] = None, safety_margin: float = 1.0) -> Dict[str, float]:
+        """두 거래소의 호가창을 비교하여 거래소별 주문 수량(계약 수)을 계산합니다.
+
+        gap 이 양수면 exchange1 에서 매도/exchange2 에서 매수, 음수면 반대 방향으로
+        호가를 여러 단계 따라가며, 수수료 반영 후 기대 수익률이 min_edge_pct(%)
+        이상인 최대 수량의 safety_margin 비율을 양쪽 최소 주문 단위로 내림합니다.
+        symbol 은 계약 크기와 주문 단위를 찾는 데 쓰며, 반환값은
+        {exchange1: 계약 수, exchange2: 계약 수} 입니다 (거래 불가 시 빈 dict).
+        """
         try:
-            # 각 거래소의 매수/매도 첫 호가 물량 계산
-            sell_amount1 = float(exchange1_orderbook['asks'][0][0]) * float(exchange1_orderbook['asks'][0][1])
-            buy_amount1 = float(exchange1_orderbook['bids'][0][0]) * float(exchange1_orderbook['bids'][0][1])
-            sell_amount2 = float(exchange2_orderbook['asks'][0][0]) * float(exchange2_orderbook['asks'][0][1])
-            buy_amount2 = float(exchange2_orderbook['bids'][0][0]) * float(exchange2_orderbook['bids'][0][1])
-
-            # 가장 작은 거래 가능 금액 반환
-            min_amount = min(sell_amount1, buy_amount1, sell_amount2, buy_amount2)
-            logger.info(f"Calculated tradable amount: {min_amount:.2f} USDT")
-            return min_amount
+            sizing = self.calculate_depth_sizing(exchange1_orderbook, exchange2_orderbook, gap, min_edge_pct,
+                                                 exchange1, exchange2, symbol, safety_margin)
+            logger.info(f"Calculated tradable amount: {sizing['order_size']:.4f} coins "
+                        f"({sizing['order_notional']:.2f} USDT, {exchange1} {sizing['amount1']:g} / "
+                        f"{exchange2} {sizing['amount2']:g} contracts, edge {sizing['edge_pct']:.4f}%)")
+            if sizing['order_size'] <= 0:
+                return {}
+            return {exchange1: sizing['amount1'], exchange2: sizing['amount2']}
 
         except Exception as e:
             logger.error(f"Failed to calculate tradable amount: {e}")
-            return 0.0
+            return {}
+
+    def calculate_depth_sizing(self, exchange1_orderbook: OrderBook, exchange2_orderbook: OrderBook, gap: float = 0.0,
+                               min_edge_pct: float = 0.0, exchange1: str = 'mexc', exchange2: str = 'bitget',
+                               symbol: Optional[str] = None, safety_margin: float = 1.0) -> Dict[str, Any]:
+        """호가창 깊이를 반영한 거래 수량, 양쪽 예상 체결가(VWAP), 기대 수익률을 계산합니다.
+
+        호가 수량은 거래소별 계약 수이므로 symbol 의 계약 크기로 코인 수로 맞춰 계산하며,
+        amount1/amount2 에 거래소별 주문 계약 수가 담깁니다.
+        """
+        contract_size1 = self.contract_size(exchange1, symbol) if symbol else 1.0
+        contract_size2 = self.contract_size(exchange2, symbol) if symbol else 1.0
+        lot_size = max(self.lot_size(exchange1, symbol), self.lot_size(exchange2, symbol)) if symbol else 0.0
+        sizing = order_sizing(exchange1_orderbook, exchange2_orderbook, gap, min_edge_pct,
+                              self.TAKER_FEES.get(exchange1, 0.0), self.TAKER_FEES.get(exchange2, 0.0),
+                              contract_size1, contract_size2, safety_margin, lot_size)
+        if sizing.pop('buy_leg') == 2:
+            # exchange1 이 비쌈: exchange2 에서 매수, exchange1 에서 매도
+            sizing['buy_exchange'], sizing['sell_exchange'] = exchange2, exchange1
+        else:
+            sizing['buy_exchange'], sizing['sell_exchange'] = exchange1, exchange2
+        return sizing
 
     def process_tradingview_alert(self, alert_data: dict) -> dict:
         """Process TradingView webhook alert"""
@@ -396,204 +874,120 @@ class TradingExecutor:
                 'error': str(e)
             }
 
-    def fetch_balance(self) -> dict:
-        """모든 거래소의 잔액 정보를 가져옵니다."""
-        try:
-            balances = {}
-
-            # MEXC 잔액
+    # 거래소별 USDT 선물 잔액 조회 파라미터
+    BALANCE_PARAMS = {
+        'mexc': {'type': 'swap', 'settle': 'USDT', 'subType': 'linear'},
+        'gateio': {'type': 'swap'},
+        'bitget': {'type': 'swap'}
+    }
+
+    def fetch_exchange_balance(self, exchange: str) -> Dict[str, float]:
+        """한 거래소의 USDT 잔액(total/free/used)을 조회합니다 (가장 낮은 요청 우선순위). 실패하면 예외가 발생합니다."""
+        with self.rate_limiter.context(PRIORITY_ACCOUNT, 'private'), \
+                self.metrics.measure(exchange, 'fetch_balance'):
+            balance = self._client(exchange).fetch_balance(params=self.BALANCE_PARAMS[exchange])
+
+        usdt = balance.get('USDT') if isinstance(balance, dict) else None
+        if not isinstance(usdt, dict):
+            raise ValueError(f"USDT balance not found in {exchange} response")
+        return {
+            'USDT': float(usdt.get('total') or 0),
+            'free': float(usdt.get('free') or 0),
+            'used': float(usdt.get('used') or 0)
+        }
+
+    def fetch_balance(self, timeout: float = 10.0) -> dict:
+        """모든 거래소의 USDT 잔액을 병렬로 가져옵니다. 실패한 거래소는 0 으로 채우고 'error' 에 사유를 남깁니다."""
+        futures = {exchange: self._fetch_pool.submit(self.fetch_exchange_balance, exchange)
+                   for exchange in self.EXCHANGE_NAMES}
+        wait(futures.values(), timeout=timeout)
+
+        balances = {}
+        for exchange, future in futures.items():
+            name = self.EXCHANGE_NAMES[exchange]
             try:
-                logger.info("Attempting to fetch MEXC balance...")
-                futures_options = {
-                    'type': 'swap',    # Use swap for futures trading
-                    'settle': 'USDT',   # USDT-settled contracts
-                    'subType': 'linear'  # Linear contracts
-                }
-                mexc_balance = self.mexc.fetch_balance(params=futures_options)
-                logger.info(f"Raw MEXC balance response: {mexc_balance}")
-
-                # USDT 잔액 정보 추출
-                balances['MEXC'] = {
-                    'USDT': 0,
-                    'free': 0,
-                    'used': 0,
-                    'dailyPnL': 0.0,
-                    'monthlyPnL': 0.0
-                }
-
-                if isinstance(mexc_balance, dict):
-                    # info 필드가 있는 경우
-                    if 'info' in mexc_balance:
-                        logger.info(f"MEXC balance info field: {mexc_balance['info']}")
-
-                    # USDT 잔액이 있는 경우
-                    if 'USDT' in mexc_balance:
-                        usdt_balance = mexc_balance['USDT']
-                        if isinstance(usdt_balance, dict):
-                            balances['MEXC'] = {
-                                'USDT': usdt_balance.get('total', 0),
-                                'free': usdt_balance.get('free', 0),
-                                'used': usdt_balance.get('used', 0),
-                                'dailyPnL': 0.0,  # 임시 데이터
-                                'monthlyPnL': 0.0  # 임시 데이터
-                            }
-                            logger.info(f"MEXC balance formatted successfully: {balances['MEXC']}")
-                        else:
-                            logger.warning(f"Unexpected USDT balance format: {usdt_balance}")
-                    else:
-                        logger.warning("USDT balance not found in MEXC response")
-                else:
-                    logger.warning(f"Unexpected MEXC balance response type: {type(mexc_balance)}")
-
-            except Exception as e:
-                logger.error(f"Failed to fetch MEXC balance: {str(e)}", exc_info=True)
-                logger.info("Using default values for MEXC balance")
-                balances['MEXC'] = {
-                    'USDT': 0,
-                    'free': 0,
-                    'used': 0,
-                    'dailyPnL': 0,
-                    'monthlyPnL': 0
-                }
-
-            # Gate.io 잔액
-            try:
-                gateio_balance = self.gateio.fetch_balance({'type': 'swap'})
-                balances['Gate.io'] = {
-                    'USDT': gateio_balance['USDT']['total'],
-                    'free': gateio_balance['USDT']['free'],
-                    'used': gateio_balance['USDT']['used'],
-                    'dailyPnL': -0.2,  # 임시 데이터
-                    'monthlyPnL': 1.8   # 임시 데이터
-                }
-                logger.info(f"Gate.io balance fetched: {balances['Gate.io']}")
+                if not future.done():
+                    raise TimeoutError(f"no response in {timeout}s")
+                balances[name] = future.result()
+                logger.debug(f"{name} balance fetched: {balances[name]}")
             except Exception as e:
-                logger.error(f"Failed to fetch Gate.io balance: {e}")
-                balances['Gate.io'] = {'USDT': 0, 'free': 0, 'used': 0, 'dailyPnL': 0, 'monthlyPnL': 0}
-
-            # Bitget 잔액
+                logger.error(f"Failed to fetch {name} balance: {e}")
+                balances[name] = {'USDT': 0, 'free': 0, 'used': 0, 'error': str(e)}
+        return balances
+
+    def fetch_positions(self, exchange: str) -> List[Dict[str, Any]]:
+        """열린 USDT 무기한 선물 포지션을 공통 심볼과 코인 단위 수량(롱 +)으로 조회합니다 (가장 낮은 요청 우선순위)."""
+        with self.rate_limiter.context(PRIORITY_ACCOUNT, 'private'), \
+                self.metrics.measure(exchange, 'fetch_positions'):
+            # Gate.io 클라이언트의 기본 종류(future)는 만기 선물이므로 무기한 선물을 지정
+            positions = self._client(exchange).fetch_positions(params={'type': 'swap'} if exchange == 'gateio' else {})
+
+        result = []
+        for position in positions:
+            contracts = float(position.get('contracts') or 0)
+            if not contracts:
+                continue
+            symbol = self.universe.canonical(exchange, position['symbol'])
+            contract_size = float(position.get('contractSize') or self.contract_size(exchange, symbol))
+            result.append({
+                'symbol': symbol,
+                'quantity': contracts * contract_size * (-1 if position.get('side') == 'short' else 1),
+                'entry_price': float(position.get('entryPrice') or 0),
+                'mark_price': float(position.get('markPrice') or 0)
+            })
+        return result
+
+    def fetch_order(self, exchange: str, symbol: str, order_id: str) -> Dict[str, Any]:
+        """주문 상태(체결 평균가, 수수료 등)를 조회합니다 (가장 낮은 요청 우선순위)."""
+        with self.rate_limiter.context(PRIORITY_ACCOUNT, 'private'), \
+                self.metrics.measure(exchange, 'fetch_order', symbol):
+            return self._client(exchange).fetch_order(order_id, self.market_symbol(exchange, symbol))
+
+    # ---- 체결 알림 ----
+
+    def add_fill_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """주문이 체결(응답)될 때마다 callback(fill) 을 호출합니다. 주문 스레드에서 호출되므로 빨리 반환해야 합니다."""
+        self._fill_listeners.append(callback)
+
+    def _notify_fill(self, exchange: str, market_symbol: str, side: str, amount: float,
+                     order: Dict[str, Any], reduce_only: bool, acked_at: float):
+        if not self._fill_listeners:
+            return
+        symbol = self.universe.canonical(exchange, market_symbol)
+        market = self.universe.market(exchange, symbol)
+        price = order.get('average') or order.get('price')
+        fee = (order.get('fee') or {}).get('cost')
+        fill = {
+            'ts': acked_at,
+            'exchange': exchange,
+            'symbol': symbol,
+            'side': side,
+            'amount': float(order.get('filled') or amount),
+            'contract_size': market['contract_size'] if market else 1.0,
+            'price': float(price) if price else None,
+            'fee': float(fee) if fee is not None else None,
+            'order_id': order.get('id'),
+            'reduce_only': reduce_only
+        }
+        for callback in self._fill_listeners:
             try:
-                bitget_balance = self.bitget.fetch_balance({'type': 'swap'})
-                balances['Bitget'] = {
-                    'USDT': bitget_balance['USDT']['total'],
-                    'free': bitget_balance['USDT']['free'],
-                    'used': bitget_balance['USDT']['used'],
-                    'dailyPnL': 0.8,  # 임시 데이터
-                    'monthlyPnL': 3.5  # 임시 데이터
-                }
-                logger.info(f"Bitget balance fetched: {balances['Bitget']}")
+                callback(fill)
             except Exception as e:
-                logger.error(f"Failed to fetch Bitget balance: {e}")
-                balances['Bitget'] = {'USDT': 0, 'free': 0, 'used': 0, 'dailyPnL': 0, 'monthlyPnL': 0}
-
-            return balances
-
-        except Exception as e:
-            logger.error(f"Failed to fetch balances: {e}")
-            return {}
+                logger.error(f"Fill listener failed for {exchange} {symbol}: {e}")
 
     def test_single_order(self, exchange: str, symbol: str, side: str, amount: float) -> Optional[Dict[str, Any]]:
-        """단일 거래소에 테스트 주문을 실행합니다."""
+        """단일 거래소에 테스트 주문을 실행합니다 (주문 게이트웨이 사용, 구간별 시간 포함)."""
         try:
-            # MEXC 선물 거래 설정
-            if exchange == 'mexc':
-                try:
-                    # MEXC API 설정 확인
-                    api_key = os.environ.get('MEXC_API_KEY')
-                    secret_key = os.environ.get('MEXC_API_SECRET')
-                    logger.info(f"MEXC API Key exists: {bool(api_key)}, Secret exists: {bool(secret_key)}")
-
-                    # 올바른 선물 심볼 형식
-                    futures_symbol = "XRP_USDT"  # 올바른 선물 심볼 형식
-                    logger.info(f"Attempting to place order on MEXC futures for {futures_symbol}")
-
-                    # 현재 타임스탬프 생성
-                    timestamp = str(int(time.time() * 1000))
-
-                    # API 요청 파라미터 설정
-                    params = {
-                        "symbol": futures_symbol,
-                        "vol": amount,           # USDT 기준 주문량
-                        "price": 0,              # 시장가 주문
-                        "side": 1,               # 1: 매수(Long)
-                        "type": 1,               # 1: 시장가 주문
-                        "openType": 2,           # 1: Isolated, 2: Cross
-                        "leverage": 1,           # 1배 레버리지
-                        "positionType": 1,       # 1: Long, 2: Short
-                        "api_key": api_key,      # API Key 추가
-                        "req_time": timestamp,   # 요청 시간 추가
-                    }
-
-                    logger.info(f"MEXC order parameters: {params}")
-
-                    # 서명 생성
-                    query_string = "&".join([f"{key}={params[key]}" for key in sorted(params.keys())])
-                    signature = hmac.new(
-                        secret_key.encode(),
-                        query_string.encode(),
-                        hashlib.sha256
-                    ).hexdigest()
-                    params["sign"] = signature
-
-                    # 요청 헤더 설정
-                    headers = {
-                        "Content-Type": "application/json"
-                    }
-
-                    # API 요청 실행
-                    response = requests.post(
-                        "https://contract.mexc.com/api/v1/private/order/submit",
-                        json=params,
-                        headers=headers
-                    )
-
-                    # 응답 데이터 확인
-                    response_data = response.json()
-                    logger.info(f"MEXC order response: {response_data}")
-
-                    if response.status_code == 200 and response_data.get('success'):
-                        return {'order': response_data}
-                    else:
-                        logger.error(f"MEXC order failed: {response_data}")
-                        return None
-
-                except Exception as e:
-                    logger.error(f"Failed to execute test order on MEXC: {str(e)}")
-                    if hasattr(e, 'response'):
-                        logger.error(f"MEXC API response: {e.response}")
-                    return None
-
-            elif exchange == 'gateio':
-                try:
-                    self.gateio.set_margin_mode('cross', symbol)
-                    self.gateio.set_leverage(1, symbol)
-                    logger.info(f"Set cross mode and 1x leverage for {symbol} on Gate.io")
-                    order = self.execute_order(exchange, symbol, side, amount, leverage=1)
-                    if order:
-                        logger.info(f"Test order executed successfully on Gate.io: {side} {amount} {symbol}")
-                        return order
-                except Exception as e:
-                    logger.error(f"Failed to execute test order on Gate.io: {e}")
-                    return None
-            elif exchange == 'bitget':
-                try:
-                    params = {
-                        'marginCoin': 'USDT',
-                        'marginMode': 'cross'
-                    }
-                    self.bitget.set_margin_mode('cross', symbol, params)
-                    self.bitget.set_leverage(1, symbol)
-                    logger.info(f"Set cross mode and 1x leverage for {symbol} on Bitget")
-                    order = self.execute_order(exchange, symbol, side, amount, leverage=1)
-                    if order:
-                        logger.info(f"Test order executed successfully on Bitget: {side} {amount} {symbol}")
-                        return order
-                except Exception as e:
-                    logger.error(f"Failed to execute test order on Bitget: {e}")
-                    return None
-            else:
-                return None
-
+            gateway = self.gateways.get(exchange) or self._test_gateway(exchange)
+            result = gateway.submit(symbol, side, amount, amount_step=self.amount_precision(exchange, symbol))
+            logger.info(f"Test order executed on {exchange}: {side} {amount} {symbol} "
+                        f"(serialize {result['timings']['serialize_us']:.0f}us, "
+                        f"network {result['timings']['network_us']:.0f}us)")
+            return {'order': result['response'], 'timings': result['timings']}
+
+        except OrderGatewayError as e:
+            logger.error(f"Test order rejected on {exchange}: {e}")
+            return None
         except Exception as e:
-            logger.error(f"Failed to execute test order: {e}")
-            return None
\ No newline at end of file
+            logger.error(f"Failed to execute test order on {exchange}: {e}")
+            return None
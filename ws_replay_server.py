@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayServer:
+    """MarketStream 이 기록한 JSONL 메시지를 재생하는 로컬 WebSocket/REST 서버
+
+    /ws/<exchange> 로 접속한 클라이언트가 첫 구독 메시지를 보내면 해당 거래소의
+    기록된 메시지를 원래 간격(speed 배속)으로 전송하고, /rest/<exchange>/<path>
+    요청에는 기록된 REST 스냅샷을 순서대로 응답합니다.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], speed: float = 1.0):
+        self.speed = speed
+        self.messages: Dict[str, List[Tuple[float, Any]]] = {}
+        self.snapshots: Dict[Tuple[str, str], List[Any]] = {}
+        self._snapshot_index: Dict[Tuple[str, str], int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        for record in records:
+            exchange = record['exchange']
+            if record.get('path'):
+                self.snapshots.setdefault((exchange, record['path']), []).append(record['message'])
+            else:
+                self.messages.setdefault(exchange, []).append((record.get('ts', 0.0), record['message']))
+
+        self.app = web.Application()
+        self.app.router.add_get('/ws/{exchange}', self._handle_ws)
+        self.app.router.add_get('/rest/{exchange}/{path:.*}', self._handle_rest)
+
+    @classmethod
+    def load(cls, path: str, speed: float = 1.0) -> 'ReplayServer':
+        """JSONL 기록 파일에서 서버를 생성합니다."""
+        with open(path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        logger.info(f"Loaded {len(records)} replay records from {path}")
+        return cls(records, speed)
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        exchange = request.match_info['exchange']
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        subscribed = asyncio.Event()
+        sender = asyncio.ensure_future(self._send_messages(ws, exchange, subscribed))
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                if message.data == 'ping':
+                    await ws.send_str('pong')
+                    continue
+                try:
+                    payload = json.loads(message.data)
+                except ValueError:
+                    continue
+                if payload.get('method') == 'ping':
+                    await ws.send_str(json.dumps({'channel': 'pong'}))
+                elif payload.get('channel') == 'futures.ping':
+                    await ws.send_str(json.dumps({'channel': 'futures.pong'}))
+                else:
+                    subscribed.set()
+        finally:
+            sender.cancel()
+        return ws
+
+    async def _send_messages(self, ws: web.WebSocketResponse, exchange: str, subscribed: asyncio.Event):
+        await subscribed.wait()
+        previous_ts = None
+        for ts, message in self.messages.get(exchange, []):
+            if previous_ts is not None and self.speed > 0:
+                await asyncio.sleep(max(0.0, ts - previous_ts) / self.speed)
+            previous_ts = ts
+            if ws.closed:
+                return
+            await ws.send_str(message if isinstance(message, str) else json.dumps(message))
+
+    async def _handle_rest(self, request: web.Request) -> web.Response:
+        exchange = request.match_info['exchange']
+        path = '/' + request.match_info['path']
+        if request.query_string:
+            path = f"{path}?{request.query_string}"
+
+        key = (exchange, path)
+        snapshots = self.snapshots.get(key)
+        if not snapshots:
+            return web.json_response({'error': f'No recorded snapshot for {path}'}, status=404)
+
+        index = self._snapshot_index.get(key, 0)
+        self._snapshot_index[key] = index + 1
+        return web.json_response(snapshots[min(index, len(snapshots) - 1)])
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> str:
+        """서버를 시작하고 base URL 을 반환합니다. port=0 이면 빈 포트를 사용합니다."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://{host}:{port}"
+        logger.info(f"Replay server listening on {base_url}")
+        return base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    def start_in_thread(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """별도 스레드에서 서버를 실행하고 base URL 을 반환합니다."""
+        ready = threading.Event()
+        result: Dict[str, str] = {}
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            result['url'] = self._loop.run_until_complete(self.start(host, port))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='replay-server', daemon=True)
+        self._thread.start()
+        ready.wait(timeout=10)
+        return result['url']
+
+    def stop_thread(self):
+        """start_in_thread 로 시작한 서버를 중지합니다."""
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='Replay recorded exchange WebSocket streams')
+    parser.add_argument('recording', help='MarketStream record_path 로 기록한 JSONL 파일')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--speed', type=float, default=1.0, help='재생 배속 (0 이면 지연 없이 전송)')
+    args = parser.parse_args()
+
+    server = ReplayServer.load(args.recording, args.speed)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start(args.host, args.port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        loop.run_until_complete(server.stop())